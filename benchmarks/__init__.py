@@ -0,0 +1,11 @@
+"""Benchmarks for the chainreport converter
+
+Run them from the repository root, e.g. python -m benchmarks.convert_benchmark"""
+
+import os
+import sys
+
+# The converter modules import each other relative to the src folder (like the app and the script do)
+SRC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
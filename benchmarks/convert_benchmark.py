@@ -0,0 +1,117 @@
+"""End-to-end throughput benchmark of ChainreportConverter.convert for every parser
+
+Example:
+    python -m benchmarks.convert_benchmark --sizes 1000,10000,100000 --parsers hi-csv,nexo
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+
+from benchmarks.generators import EXPORTS
+from chainreport_converter import ChainreportConverter
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Scaling exponents above this value are reported as superlinear (e.g. quadratic regressions)
+DEFAULT_MAX_EXPONENT = 1.2
+
+def run_conversion(parsertype, input_file, output_file):
+    """Convert one file and return the converter statistics (executed in a fresh process)"""
+    converter = ChainreportConverter(parsertype, input_file, output_file)
+    converter.convert()
+    return json.loads(json.dumps(converter.statistics))
+
+def generate_input(name, size, workdir, seed=0):
+    """Generate the input file for the benchmark, already generated files are reused"""
+    _, suffix, writer = EXPORTS[name]
+    input_file = os.path.join(workdir, f"{name}-{size}-{seed}{suffix}")
+    if not os.path.exists(input_file):
+        writer(input_file + ".tmp", size, seed)
+        os.replace(input_file + ".tmp", input_file)
+    return input_file
+
+def benchmark_conversion(name, size, workdir, seed=0):
+    """Run one conversion in a separate process and return the measured values"""
+    parsertype = EXPORTS[name][0]
+    input_file = generate_input(name, size, workdir, seed)
+    output_file = os.path.join(workdir, f"{name}-{size}-{seed}.chainreport.csv")
+    # A fresh process per run keeps the peak memory of the runs independent from each other
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        statistics = pool.apply(run_conversion, (parsertype, input_file, output_file))
+    os.remove(output_file)
+    return {
+        "parser": name,
+        "rows": size,
+        "seconds": statistics["elapsed_seconds"],
+        "rows_per_second": statistics["rows_per_second"],
+        "microseconds_per_row": statistics["elapsed_seconds"] / size * 1e6,
+        "peak_memory_bytes": statistics["process_peak_rss_bytes"]
+    }
+
+def scaling_exponents(results):
+    """Return the exponent k of time ~ rows^k between consecutive sizes (1.0 is linear)"""
+    exponents = []
+    for smaller, larger in zip(results, results[1:]):
+        if smaller["seconds"] > 0 and larger["rows"] > smaller["rows"]:
+            exponents.append(math.log(larger["seconds"] / smaller["seconds"]) /
+                             math.log(larger["rows"] / smaller["rows"]))
+    return exponents
+
+def format_result(result):
+    """Return one result as table row"""
+    peak_memory = result["peak_memory_bytes"]
+    peak_memory = f"{peak_memory / 2**20:9.1f}" if peak_memory is not None else f"{'n/a':>9}"
+    return (f"{result['parser']:<9} {result['rows']:>10} {result['seconds']:>9.3f} "
+            f"{result['rows_per_second']:>11.0f} {result['microseconds_per_row']:>9.2f} {peak_memory}")
+
+def main(argv=None):
+    """Command line entry point"""
+    argument_parser = argparse.ArgumentParser(description='Conversion throughput benchmark')
+    argument_parser.add_argument('--parsers', default=",".join(EXPORTS),
+                                 help='Comma separated benchmark names: ' + ", ".join(EXPORTS))
+    argument_parser.add_argument('--sizes', default=",".join(str(size) for size in DEFAULT_SIZES),
+                                 help='Comma separated row counts (up to 10000000)')
+    argument_parser.add_argument('--seed', type=int, default=0, help='Seed of the input generators')
+    argument_parser.add_argument('--workdir', help='Folder for the generated inputs (kept for later runs)')
+    argument_parser.add_argument('--max-exponent', type=float, default=DEFAULT_MAX_EXPONENT,
+                                 help='Largest scaling exponent still accepted as linear')
+    argument_parser.add_argument('--fail-on-superlinear', action='store_true',
+                                 help='Exit with 1 if any parser scales worse than --max-exponent')
+    argument_parser.add_argument('--json', metavar='FILE', help='Write all results as JSON file')
+    args = argument_parser.parse_args(argv)
+
+    sizes = sorted(int(float(size)) for size in args.sizes.split(","))
+    names = args.parsers.split(",")
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        workdir = args.workdir or temporary_directory
+        os.makedirs(workdir, exist_ok=True)
+        print(f"{'parser':<9} {'rows':>10} {'seconds':>9} {'rows/s':>11} {'us/row':>9} {'peak MiB':>9}")
+        all_results = {}
+        superlinear = []
+        for name in names:
+            results = []
+            for size in sizes:
+                results.append(benchmark_conversion(name, size, workdir, args.seed))
+                print(format_result(results[-1]), flush=True)
+            exponents = scaling_exponents(results)
+            if exponents:
+                verdict = "linear" if max(exponents) <= args.max_exponent else "SUPERLINEAR"
+                print(f"{name}: scaling exponents " + ", ".join(f"{exponent:.2f}" for exponent in exponents) +
+                      " -> " + verdict)
+                if verdict != "linear":
+                    superlinear.append(name)
+            all_results[name] = {"results": results, "scaling_exponents": exponents}
+
+    if args.json:
+        with open(args.json, 'w', encoding="utf-8") as json_output:
+            json.dump(all_results, json_output, indent=2)
+    if superlinear and args.fail_on_superlinear:
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
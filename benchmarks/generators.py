@@ -0,0 +1,222 @@
+"""Deterministic generators for synthetic but realistic exchange exports of every supported parser"""
+
+import csv
+import random
+from datetime import datetime, timedelta
+
+START_DATE = datetime(2019, 1, 1)
+END_DATE = datetime(2025, 1, 1)
+
+HI_CSV_HEADER = ['Date', 'Description', 'Received Amount', 'Received Currency', 'Sent Amount',
+                 'Sent Currency', 'Fee Amount', 'Fee Currency', 'TxHash']
+NEXO_CSV_HEADER = ['Transaction', 'Type', 'Input Currency', 'Input Amount', 'Output Currency',
+                   'Output Amount', 'USD Equivalent', 'Details', 'Date / Time (UTC)']
+PLUTUS_CSV_HEADER = ['id', 'createdAt', 'type', 'reward_plu_value', 'statement_id', 'description']
+COINBASE_CSV_HEADER = ['ID', 'Timestamp', 'Transaction Type', 'Asset', 'Quantity Transacted', 'Price Currency',
+                       'Price at Transaction', 'Subtotal', 'Total (inclusive of fees and/or spread)',
+                       'Fees and/or Spread', 'Notes']
+COINBASE_PREAMBLE = ['', 'Transactions', 'User,benchmark,0000']
+
+CURRENCIES = ['BTC', 'ETH', 'USDT', 'HI', 'SOL', 'ADA']
+
+def _amount(rng, maximum=1000.0):
+    """Return a random amount with a realistic number of decimals"""
+    return f"{rng.uniform(0.0001, maximum):.{rng.choice([2, 4, 8])}f}"
+
+def _next_timestamp(rng, current, descending):
+    """Return the next strictly ordered timestamp after a random gap"""
+    gap = timedelta(minutes=rng.randint(1, 30))
+    return current - gap if descending else current + gap
+
+def hi_events(count, seed=0):
+    """Yield (timestamp, description, signed amount, currency, txhash) tuples of a Hi account, newest first.
+    Trades are split into two legs and withdrawals are sometimes cancelled, like in the real statement."""
+    rng = random.Random(seed)
+    timestamp = END_DATE
+    produced = 0
+    while produced < count:
+        timestamp = _next_timestamp(rng, timestamp, descending=True)
+        choice = rng.random()
+        txhash = f"0x{rng.getrandbits(64):016x}"
+        if choice < 0.35:
+            events = [(timestamp, 'HI rebate', _amount(rng, 5), 'HI', txhash)]
+        elif choice < 0.50:
+            events = [(timestamp, 'Card consume', "-" + _amount(rng, 100), 'EUR', txhash)]
+        elif choice < 0.60:
+            events = [(timestamp, 'Crypto staking yields', _amount(rng, 2), 'HI', txhash)]
+        elif choice < 0.70:
+            events = [(timestamp, 'Crypto deposit', _amount(rng), rng.choice(CURRENCIES), txhash)]
+        elif choice < 0.78:
+            events = [(timestamp, 'Vault HI daily release', _amount(rng, 10), 'HI', txhash)]
+        elif choice < 0.90:
+            events = [(timestamp, 'buy Vault HI', _amount(rng), 'HI', txhash),
+                      (timestamp, 'buy HI paid', "-" + _amount(rng, 100), 'USDT', txhash)]
+        elif choice < 0.97:
+            currency = rng.choice(CURRENCIES)
+            amount = _amount(rng)
+            events = [(timestamp, 'Crypto withdraw', "-" + amount, currency, txhash)]
+            if rng.random() < 0.2:
+                events.append((timestamp, 'Crypto cancel withdraw', amount, currency, txhash))
+        else:
+            events = [(timestamp, 'HI referrer reward', _amount(rng, 50), 'HI', txhash)]
+        for event in events[:count - produced]:
+            produced += 1
+            yield event
+
+# Descriptions of the Hi csv export differ slightly from the pdf statement
+HI_CSV_DESCRIPTIONS = {'Crypto staking yields': 'Crypto staking yields （HI）'}
+HI_PDF_DESCRIPTIONS = {'Crypto staking yields': 'Crypto staking yields HI'}
+
+def hi_csv_rows(count, seed=0):
+    """Yield the rows of a Hi csv export"""
+    for timestamp, description, amount, currency, txhash in hi_events(count, seed):
+        description = HI_CSV_DESCRIPTIONS.get(description, description)
+        date = timestamp.strftime('%Y-%m-%d %H:%M UTC')
+        if amount.startswith("-"):
+            yield [date, description, '', '', amount[1:], currency, '', '', txhash]
+        else:
+            yield [date, description, amount, currency, '', '', '', '', txhash]
+
+def hi_pdf_lines(count, seed=0):
+    """Yield the transaction lines of a Hi pdf statement (as extracted from the pdf text)"""
+    for timestamp, description, amount, currency, _ in hi_events(count, seed):
+        description = HI_PDF_DESCRIPTIONS.get(description, description)
+        yield timestamp.strftime('%Y-%m-%d %H:%M UTC') + " " + description + " " + amount + " " + currency
+
+def nexo_csv_rows(count, seed=0):
+    """Yield the rows of a Nexo csv export, newest first"""
+    rng = random.Random(seed)
+    timestamp = END_DATE
+    for index in range(count):
+        timestamp = _next_timestamp(rng, timestamp, descending=True)
+        date = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        transaction = f"NXT{seed:02d}{index:010d}"
+        choice = rng.random()
+        if choice < 0.45:
+            row = ['Interest', 'NEXO', _amount(rng, 2), 'NEXO', '', 'approved / Interest']
+        elif choice < 0.55:
+            row = ['Exchange Cashback', 'BTC', _amount(rng, 0.01), 'BTC', '', 'approved / Cashback']
+        elif choice < 0.70:
+            currency = rng.choice(CURRENCIES)
+            row = ['Exchange', 'USDT', _amount(rng), currency, _amount(rng), 'approved / Exchange USDT to ' + currency]
+        elif choice < 0.80:
+            row = ['Deposit To Exchange', 'EUR', _amount(rng), 'EUR', '', 'approved / Deposit']
+        elif choice < 0.88:
+            row = ['Withdrawal', 'ETH', _amount(rng, 5), 'ETH', '', 'approved / Withdrawal']
+        elif choice < 0.96:
+            row = ['Locking Term Deposit', 'NEXO', _amount(rng), 'NEXO', '', 'approved / Term Deposit']
+        else:
+            row = ['Referral Bonus', 'NEXO', _amount(rng, 50), 'NEXO', '', 'approved / Referral']
+        kind, input_currency, input_amount, output_currency, output_amount, details = row
+        yield [transaction, kind, input_currency, input_amount, output_currency, output_amount or input_amount,
+               '$' + _amount(rng), details, date]
+
+def plutus_csv_rows(count, seed=0):
+    """Yield the rows of a Plutus rewards export, newest first"""
+    rng = random.Random(seed)
+    timestamp = END_DATE
+    for index in range(count):
+        timestamp = _next_timestamp(rng, timestamp, descending=True)
+        date = timestamp.strftime('%Y-%m-%dT%H:%M:%S.') + f"{rng.randint(0, 999):03d}Z"
+        kind = 'DAILY_REBATE_DISTRIBUTION' if rng.random() < 0.9 else 'REBATE_BONUS'
+        yield [f"{seed:02d}{index:010d}", date, kind, _amount(rng, 20), f"st-{rng.getrandbits(48):012x}",
+               rng.choice(['Tesco', 'Amazon', 'Netflix', 'Spotify', 'Lidl'])]
+
+def coinbase_csv_rows(count, seed=0):
+    """Yield the rows of a Coinbase export, oldest first"""
+    rng = random.Random(seed)
+    timestamp = START_DATE
+    kinds = ['Buy', 'Buy', 'Staking Income', 'Staking Income', 'Staking Income', 'Deposit', 'Send', 'Receive']
+    for _ in range(count):
+        timestamp = _next_timestamp(rng, timestamp, descending=False)
+        kind = rng.choice(kinds)
+        asset = rng.choice(['BTC', 'ETH', 'SOL', 'ADA'])
+        subtotal = _amount(rng, 500)
+        yield [f"{rng.getrandbits(96):024x}", timestamp.strftime('%Y-%m-%d %H:%M:%S UTC'), kind, asset,
+               _amount(rng, 3), 'EUR', _amount(rng, 40000), subtotal, subtotal, _amount(rng, 5),
+               kind + " " + asset]
+
+def write_csv(filename, header, rows, delimiter=",", preamble=None):
+    """Write the generated rows (streaming) into a csv file"""
+    with open(filename, 'w', newline='', encoding="utf-8") as csv_output:
+        for line in preamble or []:
+            csv_output.write(line + "\n")
+        writer = csv.writer(csv_output, delimiter=delimiter)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+def _pdf_escape(text):
+    """Escape a text for a pdf string object"""
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def write_pdf(filename, lines, lines_per_page=60):
+    """Write the lines as a simple text pdf (one line per text row, like the Hi statement)"""
+    offsets = {}
+    page_ids = []
+
+    with open(filename, 'wb') as pdf_output:
+        def write_object(object_id, content):
+            offsets[object_id] = pdf_output.tell()
+            pdf_output.write(f"{object_id} 0 obj\n".encode("latin-1") + content + b"\nendobj\n")
+
+        def write_page(page_lines):
+            object_id = 4 + 2 * len(page_ids)
+            stream = ("BT /F1 7 Tf 9 TL 30 810 Td\n" +
+                      "".join("(" + _pdf_escape(line) + ") Tj T*\n" for line in page_lines) + "ET").encode("latin-1")
+            write_object(object_id, f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream +
+                         b"\nendstream")
+            write_object(object_id + 1, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {object_id} 0 R >>"
+                         .encode("latin-1"))
+            page_ids.append(object_id + 1)
+
+        pdf_output.write(b"%PDF-1.4\n")
+        write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+        page_lines = ["Hi statement (benchmark)", "Date Description Amount Currency"]
+        for line in lines:
+            page_lines.append(line)
+            if len(page_lines) >= lines_per_page:
+                write_page(page_lines)
+                page_lines = []
+        if page_lines or not page_ids:
+            write_page(page_lines)
+        kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+        write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("latin-1"))
+
+        xref_offset = pdf_output.tell()
+        object_count = max(offsets) + 1
+        pdf_output.write(f"xref\n0 {object_count}\n0000000000 65535 f \n".encode("latin-1"))
+        for object_id in range(1, object_count):
+            pdf_output.write(f"{offsets[object_id]:010d} 00000 n \n".encode("latin-1"))
+        pdf_output.write(f"trailer\n<< /Size {object_count} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n"
+                         .encode("latin-1"))
+
+def write_hi_csv(filename, count, seed=0):
+    """Write a Hi csv export with count rows"""
+    write_csv(filename, HI_CSV_HEADER, hi_csv_rows(count, seed))
+
+def write_hi_pdf(filename, count, seed=0):
+    """Write a Hi pdf statement with count transaction lines"""
+    write_pdf(filename, hi_pdf_lines(count, seed))
+
+def write_nexo_csv(filename, count, seed=0):
+    """Write a Nexo csv export with count rows"""
+    write_csv(filename, NEXO_CSV_HEADER, nexo_csv_rows(count, seed))
+
+def write_plutus_csv(filename, count, seed=0):
+    """Write a Plutus rewards csv export with count rows"""
+    write_csv(filename, PLUTUS_CSV_HEADER, plutus_csv_rows(count, seed), delimiter="|")
+
+def write_coinbase_csv(filename, count, seed=0):
+    """Write a Coinbase csv export with count rows (including the 3 preamble lines)"""
+    write_csv(filename, COINBASE_CSV_HEADER, coinbase_csv_rows(count, seed), preamble=COINBASE_PREAMBLE)
+
+# Benchmark name: (parser type of the ChainreportConverter, file suffix, writer function)
+EXPORTS = {
+    "hi-csv": ("Hi", ".csv", write_hi_csv),
+    "hi-pdf": ("Hi", ".pdf", write_hi_pdf),
+    "nexo": ("Nexo", ".csv", write_nexo_csv),
+    "plutus": ("Plutus", ".csv", write_plutus_csv),
+    "coinbase": ("Coinbase", ".csv", write_coinbase_csv)
+}
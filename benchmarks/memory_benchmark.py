@@ -0,0 +1,126 @@
+"""Memory benchmark of every parser with tracemalloc on generated inputs of increasing size
+
+Reports the peak of the traced memory, the bytes per input row, the top allocation sites close
+to the peak and whether the peak stays flat while the input grows (streaming conversion). Example:
+    python -m benchmarks.memory_benchmark --sizes 1000,10000,100000 --top 5
+"""
+
+import argparse
+import linecache
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import tracemalloc
+
+from benchmarks.convert_benchmark import generate_input
+from benchmarks.generators import EXPORTS
+from chainreport_converter import ChainreportConverter
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+# The peak of the largest input may exceed the peak of the smallest one by this factor and still count as flat
+DEFAULT_FLAT_FACTOR = 2.0
+SAMPLE_INTERVAL = 0.005
+
+def _format_site(statistic):
+    """Return an allocation site as 'file:line (size, count) code'"""
+    frame = statistic.traceback[0]
+    code = linecache.getline(frame.filename, frame.lineno).strip()
+    return (f"{os.path.basename(frame.filename)}:{frame.lineno} "
+            f"{statistic.size / 1024:.1f} KiB in {statistic.count} blocks: {code}")
+
+def measure_memory(parsertype, input_file, output_file, top=0, options=None):
+    """Convert one file under tracemalloc and return the peak memory and the top allocation sites at the peak"""
+    snapshots = []
+    stop_event = threading.Event()
+
+    def sample():
+        # Keep the snapshot of the highest traced memory seen so far (taking a snapshot is expensive)
+        highest = 0
+        while not stop_event.wait(SAMPLE_INTERVAL):
+            current = tracemalloc.get_traced_memory()[0]
+            if current > highest * 1.1:
+                highest = current
+                snapshots[:] = [tracemalloc.take_snapshot()]
+
+    tracemalloc.start()
+    sampler = threading.Thread(target=sample, daemon=True) if top else None
+    try:
+        if sampler:
+            sampler.start()
+        converter = ChainreportConverter(parsertype, input_file, output_file, options)
+        converter.convert()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        stop_event.set()
+        if sampler:
+            sampler.join()
+        tracemalloc.stop()
+
+    top_sites = []
+    if snapshots:
+        snapshot = snapshots[0].filter_traces([tracemalloc.Filter(False, tracemalloc.__file__),
+                                               tracemalloc.Filter(False, threading.__file__),
+                                               tracemalloc.Filter(False, "<frozen importlib.*>")])
+        top_sites = [_format_site(statistic) for statistic in snapshot.statistics('lineno')[:top]]
+    return {"rows": converter.statistics["input_linecount"],
+            "peak_memory_bytes": peak_memory,
+            "top_sites": top_sites}
+
+def benchmark_memory(name, size, workdir, top=0, options=None):
+    """Measure the memory of one conversion (with the converter options) in a fresh process"""
+    input_file = generate_input(name, size, workdir)
+    output_file = os.path.join(workdir, f"{name}-{size}.memory.csv")
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        result = pool.apply(measure_memory, (EXPORTS[name][0], input_file, output_file, top, options))
+    os.remove(output_file)
+    result["bytes_per_row"] = result["peak_memory_bytes"] / size
+    return result
+
+def is_flat(results, flat_factor):
+    """Return True if the peak memory of the largest input stays within flat_factor of the smallest input"""
+    return results[-1]["peak_memory_bytes"] <= results[0]["peak_memory_bytes"] * flat_factor
+
+def main(argv=None):
+    """Command line entry point"""
+    argument_parser = argparse.ArgumentParser(description='Conversion memory benchmark (tracemalloc)')
+    argument_parser.add_argument('--parsers', default=",".join(EXPORTS),
+                                 help='Comma separated benchmark names: ' + ", ".join(EXPORTS))
+    argument_parser.add_argument('--sizes', default=",".join(str(size) for size in DEFAULT_SIZES),
+                                 help='Comma separated row counts')
+    argument_parser.add_argument('--top', type=int, default=5,
+                                 help='Number of allocation sites shown for the largest input')
+    argument_parser.add_argument('--flat-factor', type=float, default=DEFAULT_FLAT_FACTOR,
+                                 help='Accepted growth of the peak memory from the smallest to the largest input')
+    argument_parser.add_argument('--fail-on-growth', action='store_true',
+                                 help='Exit with 1 if the memory of any parser is not flat')
+    argument_parser.add_argument('--pdf-streaming', action='store_true',
+                                 help='Convert pdf statements with the pdf_streaming option')
+    argument_parser.add_argument('--workdir', help='Folder for the generated inputs (kept for later runs)')
+    args = argument_parser.parse_args(argv)
+
+    sizes = sorted(int(float(size)) for size in args.sizes.split(","))
+    growing = []
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        workdir = args.workdir or temporary_directory
+        os.makedirs(workdir, exist_ok=True)
+        for name in args.parsers.split(","):
+            results = []
+            for size in sizes:
+                top = args.top if size == sizes[-1] else 0
+                results.append(benchmark_memory(name, size, workdir, top, {"pdf_streaming": args.pdf_streaming}))
+                print(f"{name:<9} {size:>10} rows {results[-1]['peak_memory_bytes'] / 2**20:>9.2f} MiB peak "
+                      f"{results[-1]['bytes_per_row']:>10.1f} bytes/row", flush=True)
+            flat = is_flat(results, args.flat_factor)
+            print(f"{name}: memory " + ("flat" if flat else "GROWS with the input size"))
+            for site in results[-1]["top_sites"]:
+                print("    " + site)
+            if not flat:
+                growing.append(name)
+    if growing and args.fail_on_growth:
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
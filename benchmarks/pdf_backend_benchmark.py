@@ -0,0 +1,80 @@
+"""Throughput and line accuracy of the installed pdf text extraction backends on generated Hi statements
+
+The accuracy is the share of the generated transaction lines which the Hi pdf parser finds unchanged
+in the extracted text, a correct backend reaches 1.0. Example:
+    python -m benchmarks.pdf_backend_benchmark --rows 10000 --backends PyPDF2,PyMuPDF
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.generators import hi_pdf_lines, write_pdf
+from chainreport_parser.hi_parser_pdf import HiParserPdf
+from chainreport_pdf_backends import available_backends, open_backend
+
+DEFAULT_ROWS = 10000
+DEFAULT_REPEAT = 3
+
+def extract_lines(backend_name, filename):
+    """Return the transaction lines found in the pdf and the seconds spent for the text extraction"""
+    start = time.perf_counter()
+    document = open_backend(backend_name, filename)
+    texts = [document.page_text(index) for index in range(document.page_count())]
+    document.close()
+    seconds = time.perf_counter() - start
+    return [record.line for text in texts for record in HiParserPdf.scan_page(text)], seconds
+
+def line_accuracy(expected_lines, extracted_lines):
+    """Return the share of the expected lines found in the extracted lines"""
+    if not expected_lines:
+        return 1.0
+    found = Counter(expected_lines) & Counter(extracted_lines)
+    return sum(found.values()) / len(expected_lines)
+
+def benchmark_backend(backend_name, filename, expected_lines, repeat=DEFAULT_REPEAT):
+    """Return the throughput (best of repeat) and the accuracy of one backend"""
+    best_seconds = float("inf")
+    for _ in range(repeat):
+        extracted_lines, seconds = extract_lines(backend_name, filename)
+        best_seconds = min(best_seconds, seconds)
+    return {"backend": backend_name,
+            "seconds": best_seconds,
+            "lines_per_second": len(expected_lines) / best_seconds if best_seconds else 0.0,
+            "accuracy": line_accuracy(expected_lines, extracted_lines)}
+
+def fastest_correct(results):
+    """Return the name of the fastest backend with full accuracy, None if no backend is correct"""
+    correct = [result for result in results if result["accuracy"] == 1.0]
+    if not correct:
+        return None
+    return max(correct, key=lambda result: result["lines_per_second"])["backend"]
+
+def main(argv=None):
+    """Command line entry point"""
+    argument_parser = argparse.ArgumentParser(description='Pdf text extraction backend benchmark')
+    argument_parser.add_argument('--backends', default=",".join(available_backends()),
+                                 help='Comma separated backends, default: all installed (' +
+                                 ", ".join(available_backends()) + ')')
+    argument_parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='Transaction lines of the statement')
+    argument_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                                 help='Runs per backend, the fastest one is used')
+    args = argument_parser.parse_args(argv)
+
+    expected_lines = list(hi_pdf_lines(args.rows))
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        filename = os.path.join(workdir, "hi-statement.pdf")
+        write_pdf(filename, expected_lines)
+        for backend_name in args.backends.split(","):
+            results.append(benchmark_backend(backend_name, filename, expected_lines, args.repeat))
+            print(f"{backend_name:<10} {results[-1]['lines_per_second']:>10.0f} lines/s "
+                  f"{results[-1]['accuracy']:>8.2%} accuracy", flush=True)
+    print("Fastest correct backend: " + str(fastest_correct(results)))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
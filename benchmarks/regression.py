@@ -0,0 +1,126 @@
+"""Performance regression gate: compare the conversion benchmarks with the committed baseline
+
+The throughput is normalized with a calibration loop, so the baseline can be compared on
+machines of different speed. The peak memory is measured with tracemalloc and does not depend
+on the machine. Examples:
+    python -m benchmarks.regression                     # compare, exit code 1 on a regression
+    python -m benchmarks.regression --update-baseline   # store the current numbers as baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.convert_benchmark import benchmark_conversion
+from benchmarks.memory_benchmark import benchmark_memory
+from benchmarks.generators import EXPORTS
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_ROWS = 20000
+DEFAULT_REPEAT = 3
+# Accepted relative loss of normalized throughput and relative growth of peak memory
+DEFAULT_THROUGHPUT_TOLERANCE = 0.25
+DEFAULT_MEMORY_TOLERANCE = 0.20
+
+def _calibration_workload():
+    """Pure python work similar to the conversion (string splitting, dictionary access, formatting)"""
+    columns = ["Date", "Description", "Amount", "Currency"]
+    checksum = 0
+    for index in range(100000):
+        row = dict(zip(columns, f"2023-01-{index % 28 + 1:02d},Crypto deposit,{index}.5,BTC".split(",")))
+        checksum += len(row["Amount"].replace(".", ",")) + (row["Description"] in columns)
+    return checksum
+
+def calibrate(repeat=5):
+    """Return the number of calibration workloads per second of this machine (best of repeat)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _calibration_workload()
+        best = min(best, time.perf_counter() - start)
+    return 1.0 / best
+
+def run_benchmarks(names, rows, repeat, workdir):
+    """Return the normalized throughput and the peak memory per benchmark name"""
+    calibration = calibrate()
+    results = {}
+    for name in names:
+        rows_per_second = max(benchmark_conversion(name, rows, workdir)["rows_per_second"]
+                              for _ in range(repeat))
+        peak_memory = benchmark_memory(name, rows, workdir)["peak_memory_bytes"]
+        results[name] = {"rows_per_second": rows_per_second,
+                         "normalized_rows_per_second": rows_per_second / calibration,
+                         "peak_memory_bytes": peak_memory}
+    return {"rows": rows, "calibration": calibration, "parsers": results}
+
+def compare(current, baseline, throughput_tolerance, memory_tolerance):
+    """Return the list of regression messages (empty if everything is within the tolerance)"""
+    regressions = []
+    for name, result in current["parsers"].items():
+        reference = baseline["parsers"].get(name)
+        if reference is None:
+            continue
+        throughput_ratio = result["normalized_rows_per_second"] / reference["normalized_rows_per_second"]
+        if throughput_ratio < 1 - throughput_tolerance:
+            regressions.append(f"{name}: normalized throughput dropped to {throughput_ratio:.0%} of the baseline")
+        memory_ratio = result["peak_memory_bytes"] / reference["peak_memory_bytes"]
+        if memory_ratio > 1 + memory_tolerance:
+            regressions.append(f"{name}: peak memory grew to {memory_ratio:.0%} of the baseline")
+    return regressions
+
+def main(argv=None):
+    """Command line entry point"""
+    argument_parser = argparse.ArgumentParser(description='Conversion performance regression gate')
+    argument_parser.add_argument('--parsers', default=",".join(EXPORTS),
+                                 help='Comma separated benchmark names: ' + ", ".join(EXPORTS))
+    argument_parser.add_argument('--rows', type=int, help='Rows per benchmark (default: rows of the baseline)')
+    argument_parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                                 help='Runs per benchmark, the fastest one is used')
+    argument_parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline JSON file')
+    argument_parser.add_argument('--throughput-tolerance', type=float, default=DEFAULT_THROUGHPUT_TOLERANCE,
+                                 help='Accepted relative loss of the normalized rows per second')
+    argument_parser.add_argument('--memory-tolerance', type=float, default=DEFAULT_MEMORY_TOLERANCE,
+                                 help='Accepted relative growth of the peak memory')
+    argument_parser.add_argument('--update-baseline', action='store_true',
+                                 help='Store the current results as new baseline')
+    args = argument_parser.parse_args(argv)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as baseline_input:
+            baseline = json.load(baseline_input)
+    rows = args.rows or (baseline["rows"] if baseline else DEFAULT_ROWS)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        current = run_benchmarks(args.parsers.split(","), rows, args.repeat, workdir)
+
+    for name, result in current["parsers"].items():
+        print(f"{name:<9} {result['rows_per_second']:>10.0f} rows/s "
+              f"{result['normalized_rows_per_second']:>10.0f} normalized "
+              f"{result['peak_memory_bytes'] / 2**20:>8.1f} MiB peak")
+
+    if args.update_baseline:
+        if baseline:
+            # Keep the baseline of the parsers which were not part of this run
+            current["parsers"] = dict(baseline["parsers"], **current["parsers"])
+        with open(args.baseline, 'w', encoding="utf-8") as baseline_output:
+            json.dump(current, baseline_output, indent=2, sort_keys=True)
+            baseline_output.write("\n")
+        print("Baseline written to " + args.baseline)
+        return 0
+
+    if baseline is None:
+        print("No baseline found, create one with --update-baseline")
+        return 1
+    if baseline["rows"] != rows:
+        print(f"Warning: the baseline was measured with {baseline['rows']} rows, this run used {rows} rows")
+    regressions = compare(current, baseline, args.throughput_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Assembly of chainreport transactions from several input lines (multiline trades, cancelled withdrawals)"""
+
+import datetime
+import operator
+from collections import deque, namedtuple
+
+# Maximum number of open trade legs, older legs are given up as unmatched
+DEFAULT_TRADE_WINDOW = 64
+
+class TradePairer():
+    """Pair the two legs of a trade (received and sent part) by their timestamp instead of their position.
+
+    Open legs are indexed by timestamp and direction, so a leg finds its counterpart in O(1) even if other
+    lines or other trades are in between. The currency is no part of the key, the two legs of a trade always
+    have different currencies. Of several open counterparts in the same minute the one with the same order id is
+    taken, without order ids the oldest one. At most window legs are kept open, legs without counterpart are
+    handed to unmatched_leg."""
+
+    def __init__(self, unmatched_leg, window=DEFAULT_TRADE_WINDOW):
+        self.unmatched_leg = unmatched_leg
+        self.window = window
+        # (date, received, sequence) -> leg, in the order of arrival
+        self.open_legs = {}
+        # (date, received) -> sequences of the open legs with this key
+        self.open_keys = {}
+        self.sequence = 0
+
+    def add(self, leg):
+        """Add a trade leg, return (first leg, second leg) if it completes a trade, else None"""
+        date = leg.get_date_string()
+        received = bool(leg.get_received_amount())
+        if (date, not received) in self.open_keys:
+            return self._take_counterpart(date, not received, leg.get_order_id()), leg
+
+        self.sequence += 1
+        self.open_legs[(date, received, self.sequence)] = leg
+        self.open_keys.setdefault((date, received), deque()).append(self.sequence)
+        if len(self.open_legs) > self.window:
+            self.unmatched_leg(self._remove_oldest())
+        return None
+
+    def _take_counterpart(self, date, received, order_id):
+        """Remove and return the open leg of the key with the same order id, else the oldest one"""
+        counterparts = self.open_keys[(date, received)]
+        sequence = counterparts[0]
+        if order_id and len(counterparts) > 1:
+            sequence = next((candidate for candidate in counterparts
+                             if self.open_legs[(date, received, candidate)].get_order_id() == order_id), sequence)
+        counterparts.remove(sequence)
+        if not counterparts:
+            del self.open_keys[(date, received)]
+        return self.open_legs.pop((date, received, sequence))
+
+    def _remove_oldest(self):
+        """Remove and return the oldest open leg"""
+        key = next(iter(self.open_legs))
+        date, received, _ = key
+        self.open_keys[(date, received)].popleft()
+        if not self.open_keys[(date, received)]:
+            del self.open_keys[(date, received)]
+        return self.open_legs.pop(key)
+
+    def flush(self):
+        """Hand the legs which are still open (at the end of the input) to unmatched_leg"""
+        for leg in self.open_legs.values():
+            self.unmatched_leg(leg)
+        self.open_legs = {}
+        self.open_keys = {}
+
+# Time a withdrawal waits for its cancel (and a cancel for its withdrawal)
+DEFAULT_CANCEL_WINDOW_MINUTES = 1440
+
+def date_minutes(date_string):
+    """Return the minutes since 0001-01-01 of a chainreport date string (dd.mm.YYYY HH:MM),
+    None for an empty or malformed date"""
+    try:
+        return (datetime.date(int(date_string[6:10]), int(date_string[3:5]), int(date_string[:2])).toordinal() *
+                1440 + int(date_string[11:13]) * 60 + int(date_string[14:16]))
+    except (TypeError, ValueError):
+        return None
+
+def normalized_amount(amount):
+    """Return the unsigned amount, an empty string for a missing or zero amount"""
+    amount = amount.strip().lstrip("-")
+    return amount if amount.strip("0,.") else ""
+
+class WithdrawalMatcher():
+    """Pair withdrawals with their cancels by currency and amount within a time window.
+
+    Withdrawals and cancels wait in an index keyed by currency and amount until their counterpart arrives
+    (in either order) or until the input moved on by more than window minutes. A missing or zero amount (some
+    exports show a zero amount) matches any amount of the same currency. A cancelled withdrawal is dropped,
+    a withdrawal without cancel is released.
+
+    Items are (chainreport row, input line) pairs. The items behind a waiting withdrawal are held back, so a
+    released withdrawal keeps its place: the output queue gets the items in the order of the input, each with
+    a flag telling if it is a released withdrawal. The dates of the items advance the time window. Items without
+    valid date leave the window unchanged, such a withdrawal or cancel only takes a waiting counterpart and does
+    not wait itself."""
+
+    # Date column of the chainreport rows
+    DATE_FIELD = 'Zeitpunkt'
+
+    def __init__(self, window_minutes=DEFAULT_CANCEL_WINDOW_MINUTES):
+        self.window = window_minutes
+        # Items in the order of the input behind the oldest waiting withdrawal, withdrawals as [item, released] slots
+        self.held = deque()
+        # (item, released withdrawal) pairs ready to be written
+        self.output = deque()
+        # sequence -> (minutes, index keys, slot or cancel) of the waiting withdrawals and cancels
+        self.waiting = {}
+        # (is cancel, currency, amount) and (is cancel, currency) -> sequences of the waiting entries
+        self.index = {}
+        self.sequence = 0
+
+    def add_item(self, item):
+        """Queue an item which is no withdrawal, behind the waiting withdrawals"""
+        if self.waiting:
+            self.advance(date_minutes(item[0][self.DATE_FIELD]))
+        self._queue(item)
+
+    def _queue(self, item):
+        """Queue the item behind the held items"""
+        if self.held:
+            self.held.append(item)
+        else:
+            self.output.append((item, False))
+
+    def add_withdrawal(self, item):
+        """Drop the withdrawal if its cancel is waiting, else let it wait for the cancel"""
+        withdrawal = item[1]
+        currency = withdrawal.get_sent_currency()
+        amount = normalized_amount(withdrawal.get_sent_amount())
+        minutes = date_minutes(item[0][self.DATE_FIELD])
+        self.advance(minutes)
+        if self._take(True, currency, amount) is not None:
+            return
+        if minutes is None:
+            self._queue(item)
+            return
+        slot = [item, None]
+        self.held.append(slot)
+        self._wait(False, minutes, (currency, amount), slot)
+
+    def add_cancel(self, cancel):
+        """Drop the waiting withdrawal the cancel (input line) belongs to, else let the cancel wait for it"""
+        currency = cancel.get_received_currency()
+        amount = normalized_amount(cancel.get_received_amount())
+        minutes = date_minutes(cancel.get_date_string())
+        self.advance(minutes)
+        slot = self._take(False, currency, amount)
+        if slot is None:
+            if minutes is not None:
+                self._wait(True, minutes, (currency, amount), cancel)
+            return
+        slot[1] = False
+        self._drain()
+
+    def advance(self, minutes):
+        """Give up the waiting entries more than window minutes away and release their withdrawals,
+        minutes None (no valid date) leaves the window unchanged"""
+        if minutes is None:
+            return
+        while self.waiting:
+            sequence = next(iter(self.waiting))
+            if abs(minutes - self.waiting[sequence][0]) <= self.window:
+                break
+            item = self._remove(sequence)
+            if isinstance(item, list):
+                item[1] = True
+        self._drain()
+
+    def flush(self):
+        """Release all waiting withdrawals and queue the held items (at the end of the input)"""
+        for item in self.waiting.values():
+            if isinstance(item[2], list):
+                item[2][1] = True
+        self.waiting = {}
+        self.index = {}
+        self._drain()
+
+    def _wait(self, is_cancel, minutes, key, item):
+        """Index a withdrawal slot or a cancel until its counterpart arrives"""
+        self.sequence += 1
+        keys = ((is_cancel,) + key, (is_cancel, key[0]))
+        self.waiting[self.sequence] = (minutes, keys, item)
+        for index_key in keys:
+            self.index.setdefault(index_key, deque()).append(self.sequence)
+
+    def _take(self, is_cancel, currency, amount):
+        """Remove and return the oldest waiting entry with the currency and amount, entries without amount match
+        any amount of the currency"""
+        keys = ((is_cancel, currency, amount), (is_cancel, currency, "")) if amount else ((is_cancel, currency),)
+        for key in keys:
+            if key in self.index:
+                return self._remove(self.index[key][0])
+        return None
+
+    def _remove(self, sequence):
+        """Remove the waiting entry from the index and return its withdrawal slot or cancel"""
+        _, keys, item = self.waiting.pop(sequence)
+        for key in keys:
+            sequences = self.index[key]
+            sequences.remove(sequence)
+            if not sequences:
+                del self.index[key]
+        return item
+
+    def _drain(self):
+        """Move the held items to the output up to the next withdrawal which still waits for its cancel"""
+        while self.held:
+            front = self.held[0]
+            if isinstance(front, list):
+                if front[1] is None:
+                    return
+                self.held.popleft()
+                if front[1]:
+                    self.output.append((front[0], True))
+            else:
+                self.held.popleft()
+                self.output.append((front, False))
+
+# Reports of the assembly stage: skipped_line(line), unmatched_leg(line) and released_withdrawal(line)
+AssemblyEvents = namedtuple("AssemblyEvents", "skipped_line unmatched_leg released_withdrawal")
+
+class TransactionAssembler():
+    """Streaming assembly stage from parsed input lines to chainreport rows, shared by all input paths.
+
+    The stage skips the lines to ignore, combines the two legs of a trade (parsers with TWO_LINE_TRADES) and
+    drops cancelled withdrawals. It yields (chainreport row, input line) pairs in the order of the input, either
+    for a whole stream (assemble) or pushed line by line (feed, then finish at the end of the input).
+
+    row_builder turns input lines into chainreport rows: output_row(line) and trade_row(first leg, second leg).
+    The input lines are parser objects or parsed records of the parser, anything with the parser getters.
+    The steps check_if_skip_line, output_row and trade_row are attributes and assemble calls feed and finish of the
+    instance, so all of them can be replaced (e.g. timed).
+    With reverse the lines come from the last to the first, the legs of a trade are still combined in input order."""
+
+    def __init__(self, parser, row_builder, events, window_minutes=DEFAULT_CANCEL_WINDOW_MINUTES):
+        self.events = events
+        self.reverse = False
+        self.check_if_skip_line = operator.methodcaller("check_if_skip_line")
+        self.output_row = row_builder.output_row
+        self.trade_row = row_builder.trade_row
+        self.trades = parser.TRADETRANSACTION if parser.TWO_LINE_TRADES else ()
+        self.withdrawals = parser.WITHDRAWTRANSACTION if parser.CANCELTRANSACTION else ()
+        self.cancels = parser.CANCELTRANSACTION
+        self.trade_pairer = TradePairer(events.unmatched_leg)
+        self.matcher = WithdrawalMatcher(window_minutes)
+
+    def assemble(self, lines, reverse=False):
+        """Yield the (chainreport row, input line) pairs of all parsed input lines"""
+        self.reverse = reverse
+        for line in lines:
+            yield from self.feed(line)
+        yield from self.finish()
+
+    def feed(self, line):
+        """Yield the (chainreport row, input line) pairs completed by the parsed input line"""
+        if self.check_if_skip_line(line):
+            self.events.skipped_line(line)
+            return
+        matcher = self.matcher
+        description = line.get_description()
+        if description in self.trades:
+            trade = self.trade_pairer.add(line)
+            if trade is None:
+                return
+            first, second = (trade[1], trade[0]) if self.reverse else trade
+            item = (self.trade_row(first, second), first)
+        elif description in self.withdrawals:
+            matcher.add_withdrawal((self.output_row(line), line))
+            yield from self._released()
+            return
+        elif description in self.cancels:
+            matcher.add_cancel(line)
+            yield from self._released()
+            return
+        else:
+            item = (self.output_row(line), line)
+
+        # Nothing waits for a cancel (the usual case), the item is passed on directly
+        if not matcher.waiting:
+            yield item
+            return
+        matcher.add_item(item)
+        yield from self._released()
+
+    def finish(self):
+        """Yield the pairs still held back at the end of the input and report the unmatched trade legs"""
+        self.matcher.flush()
+        yield from self._released()
+        self.trade_pairer.flush()
+
+    def _released(self):
+        """Yield the items of the matcher output, report the released withdrawals once they were written"""
+        output = self.matcher.output
+        while output:
+            item, released_withdrawal = output.popleft()
+            yield item
+            if released_withdrawal:
+                self.events.released_withdrawal(item[1])
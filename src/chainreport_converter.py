@@ -1,24 +1,78 @@
 """Main Module to parse csv files and create a chainreport compatible version."""
 
 import csv
-from PyPDF2 import PdfReader
+import os
+import time
+from collections import Counter
+from itertools import islice
 
 from chainreport_parser.hi_parser_csv import HiParserCsv
 from chainreport_parser.hi_parser_pdf import HiParserPdf
 from chainreport_parser.plutus_parser_csv import PlutusParserCsv
 from chainreport_parser.nexo_parser_csv import NexoParserCsv
 from chainreport_parser.coinbase import CoinbaseParserCsv
+from chainreport_timing import StageTimer
+from chainreport_profiling import ConversionProfiler
+from chainreport_statistics import get_process_peak_rss
+from chainreport_incremental import IncrementalState, sortable_date
+from chainreport_discovery import UnknownDescriptions
+from chainreport_events import DEFAULT_LOG_LIMIT, EventLog
+from chainreport_dedupe import DedupeIndex, row_key
+from chainreport_sort import DEFAULT_MEMORY_BUDGET, ExternalSorter
+from chainreport_reverse import csv_fieldnames, reversed_csv_rows
+from chainreport_filter import build_row_filter
+from chainreport_page_search import PageDates, find_page_span
+from chainreport_pdf_backends import DEFAULT_BACKEND, open_backend
+from chainreport_assembly import DEFAULT_CANCEL_WINDOW_MINUTES, AssemblyEvents, TransactionAssembler
+from chainreport_overrides import overrides_file, reloading_batch_parser
 
 class ChainreportConverter():
     """Main Class handling the csv files (open, close) and the conversion of the content"""
-    def __init__(self, parsertype, inputfile, outputfile):
+
+    DEFAULT_OPTIONS = {
+        "timing": False,    # Measure the time spent per conversion stage
+        "profile": False,   # Write a cProfile and a sampled stack profile next to the output
+        "incremental": False,   # Append only the new transactions to an earlier converted file
+        "dedupe_index": None,   # Index file of the account to skip rows converted from overlapping exports
+        "sort": False,          # Write the rows in time order (external sort, spills runs to temporary files)
+        "sort_memory": DEFAULT_MEMORY_BUDGET,   # Memory budget of the sort in bytes
+        "chronological": False, # Read newest first inputs backwards to write the oldest transaction first
+        "date_from": None,      # Keep only transactions from this date on (YYYY, YYYY-MM or YYYY-MM-DD)
+        "date_to": None,        # Keep only transactions up to this date (inclusive)
+        "currencies": None,     # Keep only transactions with one of these (upper case) currencies
+        "pdf_backend": DEFAULT_BACKEND, # Library used to extract the text of pdf statements
+        "pdf_streaming": False, # Load one pdf page at a time and release it afterwards (flat memory)
+        "cancel_window_minutes": DEFAULT_CANCEL_WINDOW_MINUTES, # Time a withdrawal waits for its cancel
+        "description_overrides": None,  # JSON file with additional description mappings, reloaded on change
+        "log_limit": DEFAULT_LOG_LIMIT, # Errors and warnings logged per category, the others are only counted
+        "error_file": None              # File getting every error and warning event as JSON line
+    }
+    # Number of transactions at the beginning of the input used to detect the time order
+    ORDER_DETECTION_LINES = 50
+    # Number of input lines handed to the parser at once (parse_batch). The input rows and the records of a batch are
+    # held in memory together, larger batches gain no throughput but raise the peak memory
+    BATCH_SIZE = 16
+
+    def __init__(self, parsertype, inputfile, outputfile, options=None):
         super().__init__()
+        self.options = dict(self.DEFAULT_OPTIONS)
+        if options:
+            self.options.update(options)
+        self.stage_timer = StageTimer(self.options["timing"])
+        self.incremental_state = None
+        self.dedupe_index = None
         self.statistics = {
             "input_linecount": 0,
             "output_linecount": 0, 
             "warnings": 0,
             "errors": 0,
-            "ignored": 0
+            "ignored": 0,
+            "already_converted": 0,
+            "duplicates": 0,
+            "filtered": 0,
+            "transaction_types": Counter(),
+            "currencies": Counter(),
+            "skipped_descriptions": Counter()
         }
         self.chainreport_filename = outputfile
         self.input_filename = inputfile
@@ -58,151 +112,221 @@ class ChainreportConverter():
     TRANS_FEE_CURRENCY_CR = 'Währung Transaktionsgebühr'
     ORDERID_CR = 'Oder-ID der Exchange'
     DESCRIPTION_CR = 'Beschreibung'
-
-    def write_row(self, csv_writer, input_line, _logging_callback):
-        """Write the row into the csv file"""
-        csv_writer.writerow({self.DATESTRING_CR: input_line.get_date_string(),
-                             self.TRANSACTIONTYP_CR: input_line.get_transaction_type(),
-                             self.RECEIVED_AMOUNT_CR: input_line.get_received_amount(),
-                             self.RECEIVED_CURRENCY_CR: input_line.get_received_currency(),
-                             self.SENT_AMOUNT_CR: input_line.get_sent_amount(),
-                             self.SENT_CURRENCY_CR: input_line.get_sent_currency(),
-                             self.TRANS_FEE_AMOUNT_CR: input_line.get_transaction_fee_amount(),
-                             self.TRANS_FEE_CURRENCY_CR: input_line.get_transaction_fee_currency(),
-                             self.ORDERID_CR: input_line.get_order_id(),
-                             self.DESCRIPTION_CR: input_line.get_description()})
+    FIELDNAMES_CR = [DATESTRING_CR, TRANSACTIONTYP_CR,
+                     RECEIVED_AMOUNT_CR, RECEIVED_CURRENCY_CR,
+                     SENT_AMOUNT_CR, SENT_CURRENCY_CR,
+                     TRANS_FEE_AMOUNT_CR, TRANS_FEE_CURRENCY_CR,
+                     ORDERID_CR, DESCRIPTION_CR]
+    DELIMITER_CR = ';'
+
+    def output_row(self, input_line):
+        """Return the chainreport row of the input line"""
+        return {self.DATESTRING_CR: input_line.get_date_string(),
+                self.TRANSACTIONTYP_CR: input_line.get_transaction_type(),
+                self.RECEIVED_AMOUNT_CR: input_line.get_received_amount(),
+                self.RECEIVED_CURRENCY_CR: input_line.get_received_currency(),
+                self.SENT_AMOUNT_CR: input_line.get_sent_amount(),
+                self.SENT_CURRENCY_CR: input_line.get_sent_currency(),
+                self.TRANS_FEE_AMOUNT_CR: input_line.get_transaction_fee_amount(),
+                self.TRANS_FEE_CURRENCY_CR: input_line.get_transaction_fee_currency(),
+                self.ORDERID_CR: input_line.get_order_id(),
+                self.DESCRIPTION_CR: input_line.get_description()}
+
+    def write_rows(self, csv_writer, items, events):
+        """Write the assembled (chainreport row, input line) pairs. The rows without known transaction type are
+        grouped by their description and logged once as report at the end, the error file gets all of them"""
+        unknown_descriptions = UnknownDescriptions()
+        # The timer hands back the unchanged function, if the timing is disabled
+        write_output_row = self.stage_timer.wrap("write", self.write_output_row)
+        for output_row, input_line in items:
+            if write_output_row(csv_writer, output_row) and output_row[self.TRANSACTIONTYP_CR] == 'ERROR':
+                self.statistics["errors"] += 1
+                unknown_descriptions.add(output_row[self.DESCRIPTION_CR], output_row[self.DATESTRING_CR],
+                                         self.statistics["output_linecount"], input_line.get_input_string())
+                events.write("unknown_description", self.statistics["output_linecount"],
+                             "The description is unknown.", input_line)
+        self.statistics["unknown_descriptions"] = unknown_descriptions.as_dict()
+        if events.logging_callback and unknown_descriptions:
+            events.logging_callback(unknown_descriptions.summary())
+
+    def write_output_row(self, csv_writer, output_row):
+        """Write the chainreport row into the csv file,
+        return False if it was already written by an earlier (incremental or overlapping) conversion.
+        Only written rows advance the incremental state, filtered rows are converted by a later run without filter"""
+        if (self.incremental_state and self.incremental_state.filter_known and
+                not self.incremental_state.is_new(output_row[self.DATESTRING_CR], output_row[self.ORDERID_CR])):
+            self.statistics["already_converted"] += 1
+            return False
+        if self.options["currencies"] and not self.options["currencies"].intersection(
+                (output_row[self.RECEIVED_CURRENCY_CR], output_row[self.SENT_CURRENCY_CR],
+                 output_row[self.TRANS_FEE_CURRENCY_CR])):
+            # Assembled trades and parsers without raw currency columns are filtered here
+            self.statistics["filtered"] += 1
+            return False
+        if self.dedupe_index and not self.dedupe_index.add(row_key(output_row[self.ORDERID_CR],
+                                                                   list(output_row.values()))):
+            self.statistics["duplicates"] += 1
+            return False
+        csv_writer.writerow(output_row)
+        if self.incremental_state:
+            self.incremental_state.add(output_row[self.DATESTRING_CR], output_row[self.ORDERID_CR])
+        self.count_output_row(output_row)
+        return True
+
+    def count_output_row(self, output_row):
+        """Update the statistics for a written chainreport row"""
         self.statistics["output_linecount"] += 1
-        if input_line.get_transaction_type() == 'ERROR':
-            self.log_error(input_line.get_input_string(), _logging_callback)
-
-    def log_error(self, linedata, _logging_callback):
-        """Log the error via callback and update statistics"""
+        self.statistics["transaction_types"][output_row[self.TRANSACTIONTYP_CR]] += 1
+        currencies = {output_row[self.RECEIVED_CURRENCY_CR],
+                      output_row[self.SENT_CURRENCY_CR],
+                      output_row[self.TRANS_FEE_CURRENCY_CR]}
+        for currency in currencies:
+            if currency:
+                self.statistics["currencies"][currency] += 1
+
+    def log_unmatched_leg(self, leg, events):
+        """Report a trade leg without counterpart to the event log and update statistics"""
         self.statistics["errors"] += 1
-        if _logging_callback:
-            _logging_callback("Please report line " + str(self.statistics["output_linecount"]) +
-                            "\n" + str(linedata) + "\nThis has to be fixed.")
-
-    def convert_pdf(self, csv_writer, _logging_callback = None):
-        """Convert the input pdf to a compatible chainreport file depending on the parser selection"""
-
-        reader = PdfReader(self.input_filename)
-        saved_linedata = None
-        saved_withdrawdata = None
-
-        for page in reader.pages:
-            text = page.extract_text().split("\n")
-            for line in text:
-                # Use the 20th century for selection, dont expect hi to be around after 2100 ;)
-                if line.startswith("20"):
-                    self.statistics["input_linecount"] += 1
-                    current_linedata = self.parser(line)
-
-                    if current_linedata.check_if_skip_line():
-                        self.statistics["ignored"] += 1
-                        continue
-
-                    # Combine the multiline trade transaction (if there is still a next line left)
-                    if (current_linedata.get_description() in self.parser.TRADETRANSACTION
-                            and self.parser == HiParserPdf):
-                        # Store current (first) line of the multiline transaction
-                        if not saved_linedata:
-                            saved_linedata = current_linedata
-                            continue
-                        # Or handle both lines and reset the saved_linedata
-                        self.handle_trade_transactions(csv_writer, saved_linedata, current_linedata)
-                        saved_linedata = None
-                        continue
-
-                    # Handle withdrawactions (store them first in case they get canceled later)
-                    if current_linedata.get_description() in self.parser.WITHDRAWTRANSACTION:
-                        if saved_withdrawdata:
-                            self.write_row(csv_writer, saved_withdrawdata, _logging_callback)
-                        saved_withdrawdata = current_linedata
-                        continue
-
-                    # Check cancel of the transaction first
-                    if current_linedata.get_description() in self.parser.CANCELTRANSACTION:
-                        saved_withdrawdata = None
-                        continue
-
-                    # If you ended up here, write data into the file
-                    self.write_row(csv_writer, current_linedata, _logging_callback)
-
-        # Write all stored lines at the end as well
-        if saved_withdrawdata:
-            self.write_row(csv_writer, saved_withdrawdata, _logging_callback)
-        if saved_linedata:
-            if _logging_callback:
-                _logging_callback("Please fix the line " + str(self.statistics["output_linecount"]) +
-                                        ". A multi-line transaction only had 1 line")
-            self.statistics["errors"] += 1
-
-    def convert_csv(self, csv_writer, _logging_callback):
-        """Convert the input csv to a compatible chainreport file depending on the parser selection"""
-
-        with open(self.input_filename, newline='', encoding="utf-8") as csvinput:
-            try:
-                for line in range(self.parser.SKIPINITIALLINES):
+        events.event("unmatched_leg", self.statistics["output_linecount"],
+                     "A multi-line transaction only had 1 line", leg)
+
+    def transaction_assembler(self, events):
+        """Return the assembly stage, reporting into the statistics and the event log"""
+        assembly_events = AssemblyEvents(skipped_line=self.count_skipped_line,
+                                         unmatched_leg=lambda leg: self.log_unmatched_leg(leg, events),
+                                         released_withdrawal=lambda line: self.log_warning(line, events))
+        assembler = TransactionAssembler(self.parser, self, assembly_events, self.options["cancel_window_minutes"])
+        # The timer hands back the unchanged functions, if the timing is disabled. The skip check is measured
+        # as classify, the rest of the assembly including the chainreport rows as assemble
+        assembler.check_if_skip_line = self.stage_timer.wrap("classify", assembler.check_if_skip_line)
+        assembler.feed = self.stage_timer.wrap_generator("assemble", assembler.feed)
+        assembler.finish = self.stage_timer.wrap_generator("assemble", assembler.finish)
+        return assembler
+
+    def count_skipped_line(self, linedata):
+        """Update the statistics for a skipped input line"""
+        self.statistics["ignored"] += 1
+        self.statistics["skipped_descriptions"][linedata.get_description()] += 1
+
+    def parsed_lines(self, lines):
+        """Yield the parsed records of the raw input lines, the lines are parsed in batches of BATCH_SIZE.
+        The parser binds the schema version of a csv export once, from the columns of the header (a short or
+        long first row has other columns), and again with the merged lookups whenever the description overrides
+        file changes."""
+        parse_batch = None
+        statistics = self.statistics
+        lines = iter(lines)
+        while True:
+            batch = list(islice(lines, self.BATCH_SIZE))
+            if not batch:
+                return
+            if parse_batch is None:
+                if self.inputtype != "csv":
+                    parse_batch = self.parser.parse_batch
+                else:
+                    fieldnames = csv_fieldnames(self.input_filename, self.parser.DELIMITER,
+                                                self.parser.SKIPINITIALLINES)
+                    if self.options["description_overrides"]:
+                        parse_batch = reloading_batch_parser(self.parser, fieldnames, overrides_file(
+                            os.path.abspath(self.options["description_overrides"])))
+                    else:
+                        parse_batch = self.parser.bind_schema(fieldnames)
+                # The timer hands back the unchanged parse_batch, if the timing is disabled
+                parse_batch = self.stage_timer.wrap("parse", parse_batch)
+            statistics["input_linecount"] += len(batch)
+            yield from parse_batch(batch)
+
+    def input_lines(self, reverse=False, resume=False):
+        """Yield the raw input lines (csv rows or pdf transaction records), with reverse from the last to the first.
+        With resume an incremental conversion continues behind the already converted csv rows."""
+        if self.inputtype == "csv":
+            if reverse:
+                yield from reversed_csv_rows(self.input_filename, self.parser.DELIMITER,
+                                             self.parser.SKIPINITIALLINES)
+                return
+            with open(self.input_filename, newline='', encoding="utf-8") as csvinput:
+                for _ in range(self.parser.SKIPINITIALLINES):
                     csvinput.readline()
-            except AttributeError:
-                # Expected behaviour for csv files without useless content in the first lines
-                _logging_callback("")
-
-            reader = csv.DictReader(csvinput, delimiter=self.parser.DELIMITER)
-
-            saved_linedata = None
-            saved_withdrawdata = None
-
-            for line in reader:
-                self.statistics["input_linecount"] += 1
-                current_linedata = self.parser(line)
-                if current_linedata.check_if_skip_line():
-                    self.statistics["ignored"] += 1
-                    continue
-
-                # Combine the multiline trade transaction (if there is still a next line left)
-                if (current_linedata.get_description() in self.parser.TRADETRANSACTION
-                        and self.parser in [HiParserCsv]):
-                    # Store current (first) line of the multiline transaction
-                    if not saved_linedata:
-                        saved_linedata = current_linedata
-                        continue
-                    # Or handle both lines and reset the saved_linedata
-                    self.handle_trade_transactions(csv_writer, saved_linedata, current_linedata)
-                    saved_linedata = None
-                    continue
-
-                # Handle withdrawactions (store them first in case they get canceled later)
-                if current_linedata.get_description() in self.parser.WITHDRAWTRANSACTION:
-                    if saved_withdrawdata:
-                        self.write_row(csv_writer, saved_withdrawdata, _logging_callback)
-                        self.log_warning(_logging_callback)
-                    saved_withdrawdata = current_linedata
-                    continue
-
-                # Check cancel of the transaction first
-                if current_linedata.get_description() in self.parser.CANCELTRANSACTION:
-                    saved_withdrawdata = None
+                reader = csv.DictReader(csvinput, delimiter=self.parser.DELIMITER)
+                if resume and self.incremental_state:
+                    self.skip_converted_prefix(csvinput, reader)
+                yield from reader
+            return
+        for page_text in self.pdf_page_texts(reverse):
+            # One scan over the page text yields the transaction records, the other lines are never split off
+            records = self.parser.scan_page(page_text)
+            yield from (reversed(list(records)) if reverse else records)
+
+    def pdf_page_texts(self, reverse=False):
+        """Yield the texts of the pdf pages, with a date range only of the pages found by a binary search"""
+        document = open_backend(self.options["pdf_backend"], self.input_filename, self.options["pdf_streaming"])
+        # The timer hands back the unchanged function, if the timing is disabled
+        extract_text = self.stage_timer.wrap("read", document.page_text)
+        page_count = document.page_count()
+        page_dates = PageDates(page_count, extract_text)
+        pages = range(page_count)
+        if self.options["date_from"] or self.options["date_to"]:
+            pages = find_page_span(page_dates, self.options["date_from"], self.options["date_to"])
+            self.statistics["skipped_pages"] = page_count - len(pages)
+        try:
+            for index in (reversed(pages) if reverse else pages):
+                # The pages probed by the search are extracted already
+                if index in page_dates.texts:
+                    yield page_dates.texts.pop(index)
+                else:
+                    yield extract_text(index)
+        finally:
+            document.close()
+
+    def filter_lines(self, lines):
+        """Return the raw input lines without the lines outside of the date range and currencies"""
+        accepts = build_row_filter(self.parser, self.inputtype, self.options,
+                                   self.parser.TRADETRANSACTION if self.parser.TWO_LINE_TRADES else ())
+        if accepts is None:
+            return lines
+        return (line for line in lines if accepts(line) or self.count_filtered_line())
+
+    def count_filtered_line(self):
+        """Count a raw input line dropped by the filter, return False to drop it"""
+        self.statistics["input_linecount"] += 1
+        self.statistics["filtered"] += 1
+        return False
+
+    def is_descending(self):
+        """Return True if the first transactions of the input are ordered newest first"""
+        first_date = last_date = None
+        checked_lines = 0
+        for line in self.input_lines():
+            try:
+                linedata = self.parser(line)
+                if linedata.check_if_skip_line():
                     continue
-
-                # If you ended up here, write data into the file
-                self.write_row(csv_writer, current_linedata, _logging_callback)
-
-        # Write all stored lines at the end as well
-        if saved_withdrawdata:
-            self.write_row(csv_writer, saved_withdrawdata, _logging_callback)
-            self.log_warning(_logging_callback)
-        if saved_linedata:
-            self.log_error(saved_linedata, _logging_callback)
-
-        csvinput.close()
-
-    def log_warning(self, _logging_callback):
+                date = sortable_date(linedata.get_date_string())
+            except (AttributeError, KeyError, ValueError):
+                continue
+            first_date = first_date or date
+            last_date = date
+            checked_lines += 1
+            if checked_lines >= self.ORDER_DETECTION_LINES:
+                break
+        return bool(first_date) and first_date > last_date
+
+    def skip_converted_prefix(self, csvinput, reader):
+        """Continue reading behind the already converted input, if the input still starts with it"""
+        resume_position = self.incremental_state.matching_prefix_length(self.input_filename)
+        if resume_position and reader.fieldnames:
+            # The header is read now, so jump directly behind the already converted rows
+            csvinput.seek(resume_position)
+            self.incremental_state.filter_known = False
+            self.statistics["resumed_at_byte"] = resume_position
+
+    def log_warning(self, linedata, events):
         """
-        Log a warning message if the amount is 0 in the export file.
+        Report a warning event if the amount is 0 in the export file.
 
         Parameters:
-        _logging_callback (function): A callback function to handle logging. If None, no logging is performed.
+        linedata (ChainreportParserInterface): The parsed input line of the warning.
+        events (EventLog): The event log of the conversion, which logs the first warnings via callback.
 
         Returns:
         None
@@ -210,35 +334,111 @@ class ChainreportConverter():
         Raises:
         None
 
-        The function checks if the parser is HiParserCsv and if a logging callback function is provided.
-        If both conditions are met, it logs a warning message indicating the line number where the amount is 0.
-        It also increments the warning count in the statistics dictionary.
+        The function checks if the parser is HiParserCsv. If it is, it reports a zero_amount event with the line
+        number where the amount is 0. It also increments the warning count in the statistics dictionary.
         """
         if self.parser == HiParserCsv:
-            if _logging_callback:
-                _logging_callback("Please fix the line " + str(self.statistics["output_linecount"]) +
-                                    ". The amount is 0 in the export file.")
+            events.event("zero_amount", self.statistics["output_linecount"],
+                         "The amount is 0 in the export file.", linedata)
             self.statistics["warnings"] += 1
 
 
+    def convert_input(self, csv_writer, _logging_callback):
+        """Convert the input: read the raw lines (newest first inputs backwards with chronological), parse them,
+        assemble the transactions and write the chainreport rows. Errors and warnings are reported to an event log,
+        which logs the first ones of every category and a summary of the others"""
+        reverse = self.options["chronological"] and self.is_descending()
+        if reverse:
+            self.statistics["reversed_input"] = True
+        lines = self.filter_lines(self.input_lines(reverse, resume=not reverse))
+        if self.inputtype == "csv":
+            lines = self.stage_timer.iterate("read", lines)
+        events = EventLog(_logging_callback, self.options["log_limit"], self.options["error_file"])
+        try:
+            assembler = self.transaction_assembler(events)
+            self.write_rows(csv_writer, assembler.assemble(self.parsed_lines(lines), reverse), events)
+        finally:
+            events.close()
+        self.statistics["events"] = events.as_dict()
+        if _logging_callback and events:
+            _logging_callback(events.summary())
+
+    def convert_sorted_input(self, csv_writer, _logging_callback):
+        """Convert the input into the csv writer, in time order through an external sort with the sort option"""
+        if not self.options["sort"]:
+            self.convert_input(csv_writer, _logging_callback)
+            return
+        # The sorter takes the rows instead of the writer and hands them over in time order at the end,
+        # its run files are removed also if the conversion fails
+        sorter = ExternalSorter(self.FIELDNAMES_CR, self.DATESTRING_CR, self.options["sort_memory"],
+                                os.path.dirname(os.path.abspath(self.chainreport_filename)))
+        try:
+            self.convert_input(sorter, _logging_callback)
+            csv_writer.writerows(sorter.sorted_rows())
+            self.statistics["sort_runs"] = sorter.spilled_runs
+        finally:
+            sorter.close()
+
+    def convert_file(self, _logging_callback = None):
+        """Create the chainreport file and fill it with the converted input file content"""
+        append = False
+        if self.options["incremental"]:
+            self.incremental_state = IncrementalState.load(self.chainreport_filename, self.parser.NAME)
+            if self.incremental_state:
+                append = True
+            else:
+                self.incremental_state = IncrementalState(
+                    IncrementalState.state_filename(self.chainreport_filename), self.parser.NAME)
+
+        # A missing or invalid overrides file fails before the chainreport file is touched
+        if self.options["description_overrides"]:
+            overrides_file(os.path.abspath(self.options["description_overrides"]))
+        if self.options["dedupe_index"]:
+            self.dedupe_index = DedupeIndex(self.options["dedupe_index"])
+
+        # The dedupe index is closed also if the conversion fails, it keeps the new keys of a completed one only
+        completed = False
+        try:
+            with open (self.chainreport_filename, 'a' if append else 'w', newline='',
+                       encoding="utf-8") as csvoutput:
+                writer = csv.DictWriter(csvoutput, delimiter=self.DELIMITER_CR, fieldnames=self.FIELDNAMES_CR)
+                if not append:
+                    writer.writeheader()
+                self.convert_sorted_input(writer, _logging_callback)
+                csvoutput.close()
+
+            if self.incremental_state:
+                self.incremental_state.save(self.input_filename)
+            completed = True
+        finally:
+            if self.dedupe_index:
+                self.dedupe_index.close(commit=completed)
+
     def convert(self, _logging_callback = None):
         """Main conversion function: 
         Convert the input file to a compatible chainreport file depending on the parser selection"""
 
-        with open (self.chainreport_filename, 'w', newline='', encoding="utf-8") as csvoutput:
-            fieldnames = [self.DATESTRING_CR, self.TRANSACTIONTYP_CR,
-                        self.RECEIVED_AMOUNT_CR, self.RECEIVED_CURRENCY_CR,
-                        self.SENT_AMOUNT_CR, self.SENT_CURRENCY_CR,
-                        self.TRANS_FEE_AMOUNT_CR, self.TRANS_FEE_CURRENCY_CR,
-                        self.ORDERID_CR, self.DESCRIPTION_CR ]
-            writer = csv.DictWriter(csvoutput, delimiter=';', fieldnames=fieldnames)
-            writer.writeheader()
-
-            if self.inputtype == "pdf":
-                self.convert_pdf(writer, _logging_callback)
-            elif self.inputtype == "csv":
-                self.convert_csv(writer, _logging_callback)
-            csvoutput.close()
+        start_time = time.perf_counter()
+        if self.options["profile"]:
+            profiler = ConversionProfiler(self.chainreport_filename)
+            profiler.run(self.convert_file, _logging_callback)
+            self.statistics["profile_files"] = profiler.write()
+        else:
+            self.convert_file(_logging_callback)
+
+        self.statistics["parser"] = self.parser.NAME
+        self.statistics["elapsed_seconds"] = time.perf_counter() - start_time
+        self.statistics["rows_per_second"] = (self.statistics["input_linecount"] /
+                                              self.statistics["elapsed_seconds"]
+                                              if self.statistics["elapsed_seconds"] else 0.0)
+        # Peak of the process lifetime, earlier conversions of the same process are included
+        self.statistics["process_peak_rss_bytes"] = get_process_peak_rss()
+        if self.stage_timer.enabled:
+            self.statistics["stages"] = self.stage_timer.as_dict()
+        if self.options["description_overrides"]:
+            # A failed reload keeps the overrides loaded before
+            self.statistics["overrides_error"] = overrides_file(
+                os.path.abspath(self.options["description_overrides"])).error
 
         if _logging_callback:
             _logging_callback("""
@@ -251,37 +451,28 @@ class ChainreportConverter():
             if self.statistics["errors"] != 0:
                 _logging_callback("""
             Number of Errors: """ + str(self.statistics["errors"]) + """ - Please report them""")
+            if self.statistics.get("overrides_error"):
+                _logging_callback("""
+            Description overrides not reloaded: """ + self.statistics["overrides_error"])
             _logging_callback("""
             For more details check here:
             https://github.com/nacrul-eth/chainreport-converter/wiki/HiParser/""" + self.parser.NAME + """
             ----------------------------------------------------------------------""")
 
-    def handle_trade_transactions(self, writer, current_linedata, next_linedata):
-        """Special handling for 2 line trade transactions with Hi"""
-        receive_amount = ""
-        receive_currency = ""
-        sent_amount = ""
-        sent_currency = ""
-
+    def trade_row(self, current_linedata, next_linedata):
+        """Return the chainreport row of a 2 line trade transaction (Hi)"""
         if current_linedata.get_received_amount():
-            receive_amount = current_linedata.get_received_amount()
-            receive_currency = current_linedata.get_received_currency()
-            sent_amount = next_linedata.get_sent_amount()
-            sent_currency = next_linedata.get_sent_currency()
+            received_linedata, sent_linedata = current_linedata, next_linedata
         else:
-            receive_amount = next_linedata.get_received_amount()
-            receive_currency = next_linedata.get_received_currency()
-            sent_amount = current_linedata.get_sent_amount()
-            sent_currency = current_linedata.get_sent_currency()
-
-        writer.writerow({self.DATESTRING_CR: current_linedata.get_date_string(),
-                                         self.TRANSACTIONTYP_CR: current_linedata.get_transaction_type(),
-                                         self.RECEIVED_AMOUNT_CR: receive_amount,
-                                         self.RECEIVED_CURRENCY_CR: receive_currency,
-                                         self.SENT_AMOUNT_CR: sent_amount,
-                                         self.SENT_CURRENCY_CR: sent_currency,
-                                         self.TRANS_FEE_AMOUNT_CR: current_linedata.get_transaction_fee_amount(),
-                                         self.TRANS_FEE_CURRENCY_CR: current_linedata.get_transaction_fee_currency(),
-                                         self.ORDERID_CR: current_linedata.get_order_id(),
-                                         self.DESCRIPTION_CR: current_linedata.get_description()})
-        self.statistics["output_linecount"] += 1
+            received_linedata, sent_linedata = next_linedata, current_linedata
+
+        return {self.DATESTRING_CR: current_linedata.get_date_string(),
+                self.TRANSACTIONTYP_CR: current_linedata.get_transaction_type(),
+                self.RECEIVED_AMOUNT_CR: received_linedata.get_received_amount(),
+                self.RECEIVED_CURRENCY_CR: received_linedata.get_received_currency(),
+                self.SENT_AMOUNT_CR: sent_linedata.get_sent_amount(),
+                self.SENT_CURRENCY_CR: sent_linedata.get_sent_currency(),
+                self.TRANS_FEE_AMOUNT_CR: current_linedata.get_transaction_fee_amount(),
+                self.TRANS_FEE_CURRENCY_CR: current_linedata.get_transaction_fee_currency(),
+                self.ORDERID_CR: current_linedata.get_order_id(),
+                self.DESCRIPTION_CR: current_linedata.get_description()}
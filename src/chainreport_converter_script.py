@@ -2,6 +2,9 @@
 
 import argparse
 from chainreport_converter import ChainreportConverter
+from chainreport_statistics import write_json, write_prometheus
+from chainreport_filter import parse_currencies, parse_date_bound
+from chainreport_pdf_backends import BACKENDS, DEFAULT_BACKEND
 
 # Parse Input
 parser = argparse.ArgumentParser(description='ChainReport converter command line tool')
@@ -18,6 +21,60 @@ parser.add_argument('input_file',
 parser.add_argument('output_file',
                     help='''The ChainReport filename (full path) -
                     Der Name für die ChainReport Datei (vollständiger Pfad)''')
+parser.add_argument('--timing', action='store_true',
+                    help='''Print the time spent per conversion stage -
+                    Zeige die benötigte Zeit pro Konvertierungsschritt''')
+parser.add_argument('--profile', action='store_true',
+                    help='''Write a pstats and a collapsed stack profile next to the output file -
+                    Schreibe ein pstats und ein collapsed stack Profil neben die ChainReport Datei''')
+parser.add_argument('--stats-json', metavar='FILE',
+                    help='''Write the conversion statistics as JSON file ('-' for stdout) -
+                    Schreibe die Statistik als JSON Datei ('-' für stdout)''')
+parser.add_argument('--prometheus', metavar='FILE',
+                    help='''Write the conversion statistics in the Prometheus text format -
+                    Schreibe die Statistik im Prometheus Textformat''')
+parser.add_argument('--incremental', action='store_true',
+                    help='''Append only the transactions which are new since the last conversion -
+                    Hänge nur die seit der letzten Konvertierung neuen Transaktionen an''')
+parser.add_argument('--dedupe-index', metavar='FILE',
+                    help='''Index file of the account, rows already converted from another export are skipped -
+                    Index Datei des Kontos, bereits aus einem anderen Export konvertierte Zeilen werden übersprungen''')
+parser.add_argument('--sort', action='store_true',
+                    help='''Write the transactions in time order (oldest first) -
+                    Schreibe die Transaktionen zeitlich sortiert (älteste zuerst)''')
+parser.add_argument('--sort-memory', metavar='MB', type=int, default=64,
+                    help='''Memory budget of the sort in MB, larger outputs are sorted via temporary files -
+                    Speicherbudget der Sortierung in MB, größere Ausgaben werden über temporäre Dateien sortiert''')
+parser.add_argument('--chronological', action='store_true',
+                    help='''Read newest first exports backwards and write the oldest transaction first -
+                    Lese Exporte mit der neuesten Transaktion zuerst rückwärts und schreibe die älteste zuerst''')
+parser.add_argument('--from', dest='date_from', metavar='DATE', type=parse_date_bound,
+                    help='''Convert only transactions from this date on (YYYY, YYYY-MM or YYYY-MM-DD) -
+                    Konvertiere nur Transaktionen ab diesem Datum (YYYY, YYYY-MM oder YYYY-MM-DD)''')
+parser.add_argument('--to', dest='date_to', metavar='DATE', type=parse_date_bound,
+                    help='''Convert only transactions up to this date (inclusive) -
+                    Konvertiere nur Transaktionen bis zu diesem Datum (einschließlich)''')
+parser.add_argument('--currency', metavar='LIST', type=parse_currencies,
+                    help='''Convert only transactions with one of these currencies (comma separated) -
+                    Konvertiere nur Transaktionen mit einer dieser Währungen (durch Komma getrennt)''')
+parser.add_argument('--pdf-backend', choices=list(BACKENDS), default=DEFAULT_BACKEND,
+                    help='''Library to extract the text of pdf statements (must be installed) -
+                    Bibliothek zum Auslesen des Texts von PDF Auszügen (muss installiert sein)''')
+parser.add_argument('--pdf-streaming', action='store_true',
+                    help='''Load one pdf page at a time, the memory stays flat for long statements -
+                    Lade jeweils nur eine PDF Seite, der Speicherbedarf bleibt auch bei langen Auszügen gleich''')
+parser.add_argument('--cancel-window', metavar='MINUTES', type=int, default=1440,
+                    help='''Time a withdrawal waits for its cancel, default 1440 (one day) -
+                    Zeit, die eine Auszahlung auf ihre Stornierung wartet, Standard 1440 (ein Tag)''')
+parser.add_argument('--description-overrides', metavar='FILE',
+                    help='''JSON file with additional description mappings, reloaded when it changes -
+                    JSON Datei mit zusätzlichen Zuordnungen der Beschreibungen, wird bei Änderungen neu geladen''')
+parser.add_argument('--log-limit', metavar='N', type=int, default=10,
+                    help='''Errors and warnings logged per category, the others are summarized at the end -
+                    Anzahl der Fehler und Warnungen pro Kategorie im Log, die übrigen werden am Ende zusammengefasst''')
+parser.add_argument('--error-file', metavar='FILE',
+                    help='''Write every error and warning as JSON line into this file -
+                    Schreibt jeden Fehler und jede Warnung als JSON Zeile in diese Datei''')
 args = parser.parse_args()
 
 # Definitions & variables
@@ -25,5 +82,30 @@ exchange_type = args.exchange_type
 input_filename = args.input_file
 chainreport_filename = args.output_file
 
-executor = ChainreportConverter(exchange_type, input_filename, chainreport_filename)
+executor = ChainreportConverter(exchange_type, input_filename, chainreport_filename,
+                                {"timing": args.timing,
+                                 "profile": args.profile,
+                                 "incremental": args.incremental,
+                                 "dedupe_index": args.dedupe_index,
+                                 "sort": args.sort,
+                                 "sort_memory": args.sort_memory * 1024 * 1024,
+                                 "chronological": args.chronological,
+                                 "date_from": args.date_from,
+                                 "date_to": args.date_to,
+                                 "currencies": args.currency,
+                                 "pdf_backend": args.pdf_backend,
+                                 "pdf_streaming": args.pdf_streaming,
+                                 "cancel_window_minutes": args.cancel_window,
+                                 "description_overrides": args.description_overrides,
+                                 "log_limit": args.log_limit,
+                                 "error_file": args.error_file})
 executor.convert()
+
+if args.timing:
+    print(executor.stage_timer.summary())
+if args.profile:
+    print("Profile written to: " + ", ".join(executor.statistics["profile_files"]))
+if args.stats_json:
+    write_json(executor.statistics, args.stats_json)
+if args.prometheus:
+    write_prometheus(executor.statistics, args.prometheus)
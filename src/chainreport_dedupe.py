@@ -0,0 +1,103 @@
+"""Persistent deduplication index to skip transactions already converted from an overlapping export"""
+
+import hashlib
+import math
+import sqlite3
+
+DEFAULT_CAPACITY = 1000000
+DEFAULT_ERROR_RATE = 0.001
+
+def row_key(order_id, values):
+    """Return the dedupe key of a chainreport row.
+
+    Rows with an order id of the exchange are identified by it (together with date, type and the received, sent
+    and fee amounts and currencies, as some exchanges reuse the id for related rows), all other rows by a hash of
+    the complete row. values are the chainreport row values in the order of the chainreport columns."""
+    if order_id:
+        return hashlib.blake2b(("id\x1f" + order_id + "\x1f" + "\x1f".join(values[:8])).encode("utf-8"),
+                               digest_size=16).digest()
+    return hashlib.blake2b(("row\x1f" + "\x1f".join(values)).encode("utf-8"), digest_size=16).digest()
+
+class BloomFilter():
+    """Bloom filter on a bytearray with double hashing of a blake2b digest"""
+
+    def __init__(self, size, hash_count, bits=None):
+        self.size = size
+        self.hash_count = hash_count
+        self.bits = bytearray(bits) if bits else bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=DEFAULT_ERROR_RATE):
+        """Return an empty filter sized for capacity keys with the given false positive rate"""
+        size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        hash_count = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hash_count)
+
+    def _positions(self, key):
+        """Return the bit positions of the key"""
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % self.size for index in range(self.hash_count)]
+
+    def add(self, key):
+        """Add the key (bytes) to the filter"""
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        """Return False if the key was never added, True if it was probably added"""
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class DedupeIndex():
+    """Keys of all converted rows of one account, stored in a sqlite file.
+
+    The bloom filter in front of the database answers most lookups of new rows without a database query,
+    only possible duplicates are checked in the database."""
+
+    def __init__(self, filename, capacity=DEFAULT_CAPACITY):
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS row_keys (key BLOB PRIMARY KEY) WITHOUT ROWID")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS bloom_filter "
+                                "(id INTEGER PRIMARY KEY CHECK (id = 0), capacity INTEGER, key_count INTEGER, "
+                                "size INTEGER, hash_count INTEGER, bits BLOB)")
+        stored = self.connection.execute("SELECT capacity, key_count, size, hash_count, bits "
+                                         "FROM bloom_filter").fetchone()
+        if stored:
+            self.capacity, self.key_count, size, hash_count, bits = stored
+            self.bloom_filter = BloomFilter(size, hash_count, bits)
+        else:
+            self.capacity = capacity
+            self.key_count = 0
+            self.bloom_filter = BloomFilter.for_capacity(capacity)
+
+    def add(self, key):
+        """Add the key, return True if it is new and False if it is a duplicate"""
+        if key in self.bloom_filter:
+            if self.connection.execute("SELECT 1 FROM row_keys WHERE key = ?", (key,)).fetchone():
+                return False
+        self.connection.execute("INSERT INTO row_keys (key) VALUES (?)", (key,))
+        self.bloom_filter.add(key)
+        self.key_count += 1
+        if self.key_count > self.capacity:
+            self._grow()
+        return True
+
+    def _grow(self):
+        """Rebuild the bloom filter with a larger capacity to keep the false positive rate low"""
+        self.capacity *= 4
+        self.bloom_filter = BloomFilter.for_capacity(self.capacity)
+        for (key,) in self.connection.execute("SELECT key FROM row_keys"):
+            self.bloom_filter.add(key)
+
+    def close(self, commit=True):
+        """Store the bloom filter and commit all new keys, without commit (failed conversion) they are discarded"""
+        if not commit:
+            self.connection.close()
+            return
+        self.connection.execute("INSERT OR REPLACE INTO bloom_filter VALUES (0, ?, ?, ?, ?, ?)",
+                                (self.capacity, self.key_count, self.bloom_filter.size,
+                                 self.bloom_filter.hash_count, bytes(self.bloom_filter.bits)))
+        self.connection.commit()
+        self.connection.close()
@@ -0,0 +1,72 @@
+"""Grouped occurrences with sampled rows, e.g. the descriptions without known transaction type to extend the mappings
+of the parsers"""
+
+import random
+
+# Number of sample rows kept per unknown description
+DEFAULT_SAMPLE_SIZE = 3
+# Number of unknown descriptions listed in the log summary, the others are only counted
+DEFAULT_LOGGED_DESCRIPTIONS = 20
+
+def _date_key(date_string):
+    """Return a sortable key of a chainreport date string (dd.mm.YYYY HH:MM)"""
+    return date_string[6:10] + date_string[3:5] + date_string[0:2] + date_string[10:]
+
+class OccurrenceReport():
+    """Occurrences of a conversion grouped by a key (e.g. the description).
+
+    Every key keeps at most sample_size sample rows, chosen by reservoir sampling (every occurrence has the same
+    chance to be a sample), so the memory and the logging cost do not grow with the number of occurrences."""
+
+    def __init__(self, sample_size=DEFAULT_SAMPLE_SIZE, seed=0):
+        self.sample_size = sample_size
+        # Fixed seed, the same input gives the same report
+        self.random = random.Random(seed)
+        # Occurrences per key: count, first and last date and the (line number, input row) samples, the
+        # input rows are converted to text only for the report
+        self.groups = {}
+
+    def __bool__(self):
+        return bool(self.groups)
+
+    def add(self, key, date_string, line, input_row):
+        """Count an occurrence of the key in the output line, return the number of its occurrences"""
+        occurrences = self.groups.get(key)
+        if occurrences is None:
+            occurrences = self.groups[key] = {"count": 0, "first": date_string,
+                                              "last": date_string, "samples": []}
+        occurrences["count"] += 1
+        if _date_key(date_string) < _date_key(occurrences["first"]):
+            occurrences["first"] = date_string
+        elif _date_key(date_string) > _date_key(occurrences["last"]):
+            occurrences["last"] = date_string
+        samples = occurrences["samples"]
+        if len(samples) < self.sample_size:
+            samples.append((line, input_row))
+        else:
+            position = self.random.randrange(occurrences["count"])
+            if position < self.sample_size:
+                samples[position] = (line, input_row)
+        return occurrences["count"]
+
+    def as_dict(self):
+        """Return the report as JSON serializable dictionary, the most frequent keys first"""
+        return {key: dict(occurrences, samples=[{"line": line, "input": str(input_row)}
+                                                for line, input_row in occurrences["samples"]])
+                for key, occurrences in sorted(self.groups.items(), key=lambda item: -item[1]["count"])}
+
+class UnknownDescriptions(OccurrenceReport):
+    """Descriptions without known transaction type of a conversion, see OccurrenceReport"""
+
+    def summary(self, logged_descriptions=DEFAULT_LOGGED_DESCRIPTIONS):
+        """Return the report as text for the log, limited to the most frequent descriptions"""
+        report = self.as_dict()
+        lines = ["Unknown descriptions (" + str(len(report)) + ") - Please report them:"]
+        for description, occurrences in list(report.items())[:logged_descriptions]:
+            lines.append("'" + str(description) + "': " + str(occurrences["count"]) + " lines from " +
+                         occurrences["first"] + " to " + occurrences["last"])
+            for sample in occurrences["samples"]:
+                lines.append("    line " + str(sample["line"]) + ": " + sample["input"])
+        if len(report) > logged_descriptions:
+            lines.append("... and " + str(len(report) - logged_descriptions) + " more descriptions")
+        return "\n".join(lines)
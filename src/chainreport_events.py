@@ -0,0 +1,68 @@
+"""Rate limited logging of the error and warning events of a conversion"""
+
+import json
+from chainreport_discovery import OccurrenceReport
+
+# Number of events per category handed to the logging callback, the others are only counted and sampled
+DEFAULT_LOG_LIMIT = 10
+# Buffer of the error file, the events are written in blocks instead of line by line
+ERROR_FILE_BUFFER_SIZE = 1 << 16
+
+class EventLog():
+    """Error and warning events of a conversion.
+
+    An event has a category (e.g. unmatched_leg), the output line, a message and the parsed input line. The first
+    limit events of a category are logged via the callback, the others are counted with reservoir samples and listed
+    in the summary. The optional error file gets every event as JSON line, in its own buffered stream."""
+
+    def __init__(self, logging_callback, limit=DEFAULT_LOG_LIMIT, error_filename=None):
+        self.logging_callback = logging_callback
+        self.limit = limit
+        self.events = OccurrenceReport()
+        self.error_output = None
+        if error_filename:
+            # Closed by close() at the end of the conversion
+            self.error_output = open(error_filename, 'w', encoding="utf-8",  # pylint: disable=consider-using-with
+                                     buffering=ERROR_FILE_BUFFER_SIZE)
+
+    def __bool__(self):
+        return bool(self.events)
+
+    def event(self, category, line, message, linedata):
+        """Count the event, log it if the category is still below the limit and write it into the error file"""
+        count = self.events.add(category, linedata.get_date_string(), line, linedata.get_input_string())
+        if self.logging_callback and count <= self.limit:
+            self.logging_callback("Please fix the line " + str(line) + ". " + message + "\n" +
+                                  str(linedata.get_input_string()))
+            if count == self.limit:
+                self.logging_callback("Further '" + category + "' events are only counted, see the summary")
+        self.write(category, line, message, linedata)
+
+    def write(self, category, line, message, linedata):
+        """Write the event into the error file, if there is one"""
+        if self.error_output:
+            self.error_output.write(json.dumps({"category": category, "line": line, "message": message,
+                                                "date": linedata.get_date_string(),
+                                                "input": str(linedata.get_input_string())}) + "\n")
+
+    def as_dict(self):
+        """Return the events per category (count, first and last date, samples) as JSON serializable dictionary"""
+        return self.events.as_dict()
+
+    def summary(self):
+        """Return the event counts per category as text for the log, with the samples of the categories which
+        were not logged completely"""
+        lines = ["Errors and warnings per category:"]
+        for category, occurrences in self.as_dict().items():
+            lines.append(category + ": " + str(occurrences["count"]) + " lines from " + occurrences["first"] +
+                         " to " + occurrences["last"])
+            if occurrences["count"] > self.limit:
+                for sample in occurrences["samples"]:
+                    lines.append("    line " + str(sample["line"]) + ": " + sample["input"])
+        return "\n".join(lines)
+
+    def close(self):
+        """Flush and close the error file"""
+        if self.error_output:
+            self.error_output.close()
+            self.error_output = None
@@ -0,0 +1,64 @@
+"""Date range and currency filters on the raw input rows, applied before the rows are parsed.
+
+All supported exports start their dates in ISO order (YYYY-MM-DD...), so the date range is a plain
+string comparison of the date prefix. Rows outside of the filter never create a parser object."""
+
+import re
+
+DATE_BOUND_PATTERN = re.compile(r'^\d{4}(-\d{2}(-\d{2})?)?$')
+
+def parse_date_bound(text):
+    """Return the date bound (YYYY, YYYY-MM or YYYY-MM-DD), raise ValueError for other formats"""
+    if not DATE_BOUND_PATTERN.match(text):
+        raise ValueError("Expected a date as YYYY, YYYY-MM or YYYY-MM-DD: " + text)
+    return text
+
+def parse_currencies(text):
+    """Return the set of upper case currencies of a comma separated list"""
+    return frozenset(currency.strip().upper() for currency in text.split(",") if currency.strip())
+
+def in_date_range(date, date_from, date_to):
+    """Return True if the ISO date string is within the inclusive bounds (None for an open bound)"""
+    if date_from and date[:len(date_from)] < date_from:
+        return False
+    if date_to and date[:len(date_to)] > date_to:
+        return False
+    return True
+
+def build_row_filter(parser, inputtype, options, paired_descriptions=()):
+    """Return a function telling if a raw input row (csv dictionary or pdf record) is kept, None without filters.
+
+    options holds date_from, date_to and currencies (set of upper case currencies), each None if not used.
+    Rows with a description in paired_descriptions (the legs of a multiline trade) pass the currency filter,
+    as both legs are needed for the trade, the assembled trade is filtered after parsing."""
+    date_from, date_to, currencies = options["date_from"], options["date_to"], options["currencies"]
+    if not (date_from or date_to or currencies):
+        return None
+    if inputtype == "pdf":
+        return _build_line_filter(date_from, date_to, currencies, paired_descriptions)
+
+    date_field = parser.DATE_FIELD
+    description_field = parser.DESCRIPTION_FIELD
+    currency_fields = parser.CURRENCY_FIELDS if currencies else []
+
+    def accepts(row):
+        if not in_date_range(row.get(date_field) or "", date_from, date_to):
+            return False
+        if currency_fields:
+            for field in currency_fields:
+                if (row.get(field) or "").strip().upper() in currencies:
+                    return True
+            return (row.get(description_field) or "").strip() in paired_descriptions
+        return True
+    return accepts
+
+def _build_line_filter(date_from, date_to, currencies, paired_descriptions):
+    """Return the filter for the transaction records of a pdf statement (HiPdfRecord)"""
+
+    def accepts(record):
+        if not in_date_range(record.date, date_from, date_to):
+            return False
+        if currencies:
+            return record.currency.upper() in currencies or record.description in paired_descriptions
+        return True
+    return accepts
@@ -0,0 +1,103 @@
+"""State of an incremental conversion, stored as compact JSON file next to the chainreport file"""
+
+import hashlib
+import json
+import os
+
+HASH_BLOCKSIZE = 1024 * 1024
+
+def hash_file_prefix(filename, length):
+    """Return the sha256 hex digest of the first length bytes of the file"""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as input_file:
+        remaining = length
+        while remaining > 0:
+            block = input_file.read(min(HASH_BLOCKSIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+def sortable_date(chainreport_date):
+    """Convert the chainreport date 'dd.mm.YYYY HH:MM' into the sortable form 'YYYY-mm-dd HH:MM'"""
+    return (chainreport_date[6:10] + "-" + chainreport_date[3:5] + "-" + chainreport_date[0:2] +
+            chainreport_date[10:16])
+
+class IncrementalState():
+    """Remember which part of an export was already converted.
+
+    The state holds the length and the hash of the already converted input (prefix), the timestamp
+    of the newest written transaction and the order ids written with that timestamp."""
+
+    def __init__(self, filename, parser_name, data=None):
+        self.filename = filename
+        self.data = {"parser": parser_name,
+                     "input_prefix_length": 0,
+                     "input_prefix_hash": "",
+                     "last_timestamp": "",
+                     "last_order_ids": []}
+        if data:
+            self.data.update(data)
+        self.last_order_ids = set(self.data["last_order_ids"])
+        # The newest transaction of the earlier conversion, the written transactions only update self.data
+        self.known_timestamp = self.data["last_timestamp"]
+        self.known_order_ids = frozenset(self.last_order_ids)
+        # Compare every transaction with the newest known one, unless the converted prefix was skipped
+        self.filter_known = self.has_converted()
+
+    @classmethod
+    def state_filename(cls, output_filename):
+        """Return the name of the state file belonging to the chainreport file"""
+        return output_filename + ".state.json"
+
+    @classmethod
+    def load(cls, output_filename, parser_name):
+        """Return the stored state of the chainreport file, or None if there is no usable state"""
+        filename = cls.state_filename(output_filename)
+        if not os.path.exists(filename) or not os.path.exists(output_filename):
+            return None
+        with open(filename, encoding="utf-8") as state_input:
+            data = json.load(state_input)
+        if data.get("parser") != parser_name:
+            return None
+        return cls(filename, parser_name, data)
+
+    def has_converted(self):
+        """Return True if the state belongs to an earlier conversion"""
+        return bool(self.data["input_prefix_hash"] or self.data["last_timestamp"])
+
+    def matching_prefix_length(self, input_filename):
+        """Return the length of the already converted input if the input still starts with it, else 0"""
+        length = self.data["input_prefix_length"]
+        if not length or os.path.getsize(input_filename) < length:
+            return 0
+        if hash_file_prefix(input_filename, length) != self.data["input_prefix_hash"]:
+            return 0
+        return length
+
+    def is_new(self, chainreport_date, order_id):
+        """Return True if the transaction is newer than the transactions of the earlier conversion"""
+        timestamp = sortable_date(chainreport_date)
+        if timestamp != self.known_timestamp:
+            return timestamp > self.known_timestamp
+        # Same minute as the newest known transaction, only a new order id identifies a new transaction
+        return bool(order_id) and order_id not in self.known_order_ids
+
+    def add(self, chainreport_date, order_id):
+        """Remember a written transaction"""
+        timestamp = sortable_date(chainreport_date)
+        if timestamp > self.data["last_timestamp"]:
+            self.data["last_timestamp"] = timestamp
+            self.last_order_ids = set()
+        if timestamp == self.data["last_timestamp"] and order_id:
+            self.last_order_ids.add(order_id)
+
+    def save(self, input_filename):
+        """Store the state with the complete input as converted prefix"""
+        self.data["input_prefix_length"] = os.path.getsize(input_filename)
+        self.data["input_prefix_hash"] = hash_file_prefix(input_filename, self.data["input_prefix_length"])
+        self.data["last_order_ids"] = sorted(self.last_order_ids)
+        with open(self.filename + ".tmp", 'w', encoding="utf-8") as state_output:
+            json.dump(self.data, state_output, indent=2)
+        os.replace(self.filename + ".tmp", self.filename)
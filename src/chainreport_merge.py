@@ -0,0 +1,69 @@
+"""Merge several converted chainreport files (one per account) into one time ordered chainreport file.
+
+The inputs are merged with a heap over the next row of every input, so only one row per input is
+held in memory, independent of the number of rows."""
+
+import csv
+import heapq
+
+from chainreport_converter import ChainreportConverter
+from chainreport_incremental import sortable_date
+from chainreport_reverse import reversed_csv_rows
+
+DATESTRING_CR = ChainreportConverter.DATESTRING_CR
+DESCRIPTION_CR = ChainreportConverter.DESCRIPTION_CR
+
+def _last_row(filename):
+    """Return the last row of a chainreport file or None for a file without rows"""
+    return next(reversed_csv_rows(filename, ChainreportConverter.DELIMITER_CR), None)
+
+def read_chainreport_file(filename):
+    """Yield the rows of a chainreport file oldest first (newest first files are read backwards)"""
+    with open(filename, newline='', encoding="utf-8") as csvinput:
+        reader = csv.DictReader(csvinput, delimiter=ChainreportConverter.DELIMITER_CR)
+        first_row = next(reader, None)
+        if first_row is None:
+            return
+        last_row = _last_row(filename)
+        if sortable_date(first_row[DATESTRING_CR]) <= sortable_date(last_row[DATESTRING_CR]):
+            yield first_row
+            yield from reader
+            return
+    yield from reversed_csv_rows(filename, ChainreportConverter.DELIMITER_CR)
+
+def tag_rows(rows, account):
+    """Yield the rows with the account name in front of the description"""
+    for row in rows:
+        row[DESCRIPTION_CR] = f"[{account}] {row[DESCRIPTION_CR]}" if row[DESCRIPTION_CR] else f"[{account}]"
+        yield row
+
+def _ordered(rows, name):
+    """Yield the rows, raise ValueError if they are not in time order (the merge relies on it)"""
+    previous = ""
+    for row in rows:
+        timestamp = sortable_date(row[DATESTRING_CR])
+        if timestamp < previous:
+            raise ValueError(f"{name} is not ordered by time at {row[DATESTRING_CR]}")
+        previous = timestamp
+        yield row
+
+def merge_rows(streams):
+    """Merge time ordered streams of chainreport rows (dictionaries) into one time ordered stream.
+
+    streams maps the account name to the rows of the account, e.g. read_chainreport_file(...) or the
+    rows of a conversion. Rows with the same time keep the order of the streams."""
+    return heapq.merge(*(_ordered(tag_rows(rows, account), account) for account, rows in streams.items()),
+                       key=lambda row: sortable_date(row[DATESTRING_CR]))
+
+def merge_chainreport_files(inputs, output_filename):
+    """Merge the chainreport files (dictionary account name -> filename) into one file, return the row count"""
+    streams = {account: read_chainreport_file(filename) for account, filename in inputs.items()}
+    row_count = 0
+    with open(output_filename, 'w', newline='', encoding="utf-8") as csvoutput:
+        writer = csv.DictWriter(csvoutput, delimiter=ChainreportConverter.DELIMITER_CR,
+                                fieldnames=ChainreportConverter.FIELDNAMES_CR)
+        writer.writeheader()
+        for row in merge_rows(streams):
+            writer.writerow(row)
+            row_count += 1
+    return row_count
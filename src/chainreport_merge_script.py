@@ -0,0 +1,28 @@
+"""Command line module to merge converted chainreport files of several accounts into one file"""
+
+import argparse
+from chainreport_merge import merge_chainreport_files
+
+def main():
+    """Parse the command line and merge the converted files"""
+    parser = argparse.ArgumentParser(description='ChainReport merge command line tool')
+    parser.add_argument('output_file',
+                        help='''The merged ChainReport filename (full path) -
+                        Der Name für die zusammengeführte ChainReport Datei (vollständiger Pfad)''')
+    parser.add_argument('inputs', nargs='+', metavar='ACCOUNT=FILE',
+                        help='''Account name and converted ChainReport file, e.g. Hi=hi.csv -
+                        Kontoname und konvertierte ChainReport Datei, z.B. Hi=hi.csv''')
+    args = parser.parse_args()
+
+    inputs = {}
+    for account_input in args.inputs:
+        account, separator, filename = account_input.partition("=")
+        if not separator:
+            parser.error("Expected ACCOUNT=FILE, got " + account_input)
+        inputs[account] = filename
+
+    row_count = merge_chainreport_files(inputs, args.output_file)
+    print(f"Merged {row_count} rows into {args.output_file}")
+
+if __name__ == "__main__":
+    main()
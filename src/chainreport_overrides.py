@@ -0,0 +1,100 @@
+"""Description mapping overrides of the parsers, loaded from a JSON file and reloaded when the file changes"""
+
+import functools
+import json
+import os
+import time
+
+# Seconds between two checks of the overrides file for changes
+DEFAULT_CHECK_INTERVAL = 1.0
+
+def parse_overrides(text):
+    """Return the overrides of a JSON text, raise ValueError if it is no valid overrides file.
+
+    The file maps parser names (e.g. HiParserCsv) to "types" (description -> transaction type) and "skip"
+    (descriptions to skip):
+    {"HiParserCsv": {"types": {"Crypto airdrop": "Airdrop"}, "skip": ["Vault HI weekly release"]}}"""
+    data = json.loads(text)
+    if not isinstance(data, dict):
+        raise ValueError("the overrides file must contain an object of parser names")
+    for parser_name, overrides in data.items():
+        if not isinstance(overrides, dict) or set(overrides) - {"types", "skip"}:
+            raise ValueError("the overrides of " + parser_name + " can only have 'types' and 'skip'")
+        types = overrides.get("types", {})
+        if not isinstance(types, dict) or not all(isinstance(key, str) and isinstance(value, str)
+                                                  for key, value in types.items()):
+            raise ValueError("the 'types' of " + parser_name + " must map descriptions to transaction types")
+        skip = overrides.get("skip", [])
+        if not isinstance(skip, list) or not all(isinstance(description, str) for description in skip):
+            raise ValueError("the 'skip' of " + parser_name + " must be a list of descriptions")
+    return data
+
+class DescriptionOverrides():
+    """Overrides file shared by all conversions of a process, reloaded atomically when it changes.
+
+    current() checks the file at most every check_interval seconds. A changed file is read and validated
+    completely before the (version, overrides) state is replaced in one assignment, so a conversion always sees
+    either the old or the new overrides. A file which can not be read or is invalid keeps the old overrides, the
+    problem is kept in error."""
+
+    def __init__(self, filename, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.filename = filename
+        self.check_interval = check_interval
+        self.error = None
+        self.next_check = 0.0
+        # (version of the file, overrides), the first load fails on a missing or invalid file. The version is taken
+        # before reading, a change while reading is read again with the next check.
+        self.state = (self.file_version(), self.read())
+
+    def file_version(self):
+        """Return the version of the file (modification time, size and inode)"""
+        stat = os.stat(self.filename)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def read(self):
+        """Return the overrides of the file"""
+        with open(self.filename, encoding="utf-8") as overrides_input:
+            return parse_overrides(overrides_input.read())
+
+    def current(self):
+        """Return the (version, overrides) of the file, reloaded if the file changed since the last check"""
+        now = time.monotonic()
+        if now >= self.next_check:
+            self.next_check = now + self.check_interval
+            self.reload()
+        return self.state
+
+    def reload(self):
+        """Reload the file if it changed, return True if the overrides were replaced"""
+        try:
+            version = self.file_version()
+            if version == self.state[0]:
+                return False
+            overrides = self.read()
+        except (OSError, ValueError) as error:
+            self.error = self.filename + ": " + str(error)
+            return False
+        self.error = None
+        self.state = (version, overrides)
+        return True
+
+@functools.lru_cache(maxsize=None)
+def overrides_file(filename):
+    """Return the DescriptionOverrides of a file, shared by all conversions of the process"""
+    return DescriptionOverrides(filename)
+
+def reloading_batch_parser(parser, fieldnames, overrides):
+    """Return a batch parser of the parser bound to the header and the current overrides.
+
+    Every batch checks the overrides, a new version rebinds the schema with the merged lookups. The cached dates
+    of the parser are kept, only the lookup tables are compiled again."""
+    bound = {}
+
+    def parse(rows):
+        version, current = overrides.current()
+        if version not in bound:
+            # Only the parser of the current version is kept
+            bound.clear()
+            bound[version] = parser.bind_schema(fieldnames, current.get(parser.NAME))
+        return bound[version](rows)
+    return parse
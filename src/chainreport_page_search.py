@@ -0,0 +1,81 @@
+"""Binary search for the pages of a date ordered pdf statement which contain a date range.
+
+Only the probed pages are extracted, roughly two times log2(page count), instead of every page."""
+
+def page_date_bounds(text):
+    """Return the oldest and the newest date ('YYYY-MM-DD HH:MM') of the transaction lines of a page text,
+    None for a page without transaction lines"""
+    dates = [line[:16] for line in text.split("\n") if line.startswith("20")]
+    if not dates:
+        return None
+    return min(dates), max(dates)
+
+def _first_true(predicate, start, stop):
+    """Return the first index in [start, stop) for which the (monotonic) predicate is true, stop if there is none"""
+    while start < stop:
+        middle = (start + stop) // 2
+        if predicate(middle):
+            stop = middle
+        else:
+            start = middle + 1
+    return start
+
+class PageDates():
+    """Date bounds per page, extracted on demand with the page texts kept for the conversion"""
+
+    def __init__(self, page_count, extract_page_text):
+        self.page_count = page_count
+        self.extract_page_text = extract_page_text
+        self.texts = {}
+        self.bounds = {}
+
+    def text(self, index):
+        """Return the text of the page, extract it only once"""
+        if index not in self.texts:
+            self.texts[index] = self.extract_page_text(index)
+        return self.texts[index]
+
+    def dated_bounds(self, index):
+        """Return the date bounds of the page, pages without transactions use the bounds of the next dated page"""
+        while index < self.page_count:
+            if index not in self.bounds:
+                self.bounds[index] = page_date_bounds(self.text(index))
+            if self.bounds[index]:
+                return self.bounds[index]
+            index += 1
+        return None
+
+def find_page_span(page_dates, date_from, date_to):
+    """Return the range of the pages which can contain transactions between date_from and date_to.
+
+    The bounds are inclusive ISO date prefixes (YYYY, YYYY-MM or YYYY-MM-DD), None for an open bound.
+    The pages are ordered newest first (like the Hi statement) or oldest first."""
+    page_count = page_dates.page_count
+    first_bounds = page_dates.dated_bounds(0)
+    if first_bounds is None:
+        return range(0)
+    last_bounds = first_bounds
+    for index in range(page_count - 1, -1, -1):
+        if page_dates.dated_bounds(index):
+            last_bounds = page_dates.dated_bounds(index)
+            break
+    descending = first_bounds[1] > last_bounds[0]
+
+    def newer_than_range(index):
+        bounds = page_dates.dated_bounds(index)
+        return bool(date_to) and bounds is not None and bounds[0][:len(date_to)] > date_to
+
+    def older_than_range(index):
+        bounds = page_dates.dated_bounds(index)
+        return bool(date_from) and bounds is not None and bounds[1][:len(date_from)] < date_from
+
+    # Newest first the pages start newer than the range and end older than it, oldest first the other way around
+    if descending:
+        start = _first_true(lambda index: not newer_than_range(index), 0, page_count)
+        stop = _first_true(lambda index: older_than_range(index) or page_dates.dated_bounds(index) is None,
+                           start, page_count)
+    else:
+        start = _first_true(lambda index: not older_than_range(index), 0, page_count)
+        stop = _first_true(lambda index: newer_than_range(index) or page_dates.dated_bounds(index) is None,
+                           start, page_count)
+    return range(start, stop)
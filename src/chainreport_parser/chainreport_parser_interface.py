@@ -1,6 +1,159 @@
 """Mandatory parser Interface for Chainreport to guarantee consistant data"""
 
 import abc
+import functools
+from collections import namedtuple
+from datetime import datetime
+
+class ParsedRecord(namedtuple("ParsedRecord", ["input_row", "skip", "date", "transaction_type",
+                                               "received_amount", "received_currency",
+                                               "sent_amount", "sent_currency",
+                                               "fee_amount", "fee_currency",
+                                               "order_id", "description"])):
+    """
+    Compact result of the batch parsing: the values of all getters of one input row.
+
+    The record offers the getters of the parser interface, so it can be used wherever a parser object of a
+    single row is used. Skipped rows only carry their description.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def skipped(cls, input_row, description):
+        """Return the record of a row which is skipped"""
+        return cls(input_row, True, "", "", "", "", "", "", "", "", "", description)
+
+    def check_if_skip_line(self):
+        """Return True if the row is skipped"""
+        return self.skip
+
+    def get_input_string(self):
+        """Return the input row"""
+        return self.input_row
+
+    def get_date_string(self):
+        """Return the date in Chainreport format"""
+        return self.date
+
+    def get_transaction_type(self):
+        """Return the transaction type in Chainreport format"""
+        return self.transaction_type
+
+    def get_received_amount(self):
+        """Return the amount of received coins"""
+        return self.received_amount
+
+    def get_received_currency(self):
+        """Return the currency of received coins"""
+        return self.received_currency
+
+    def get_sent_amount(self):
+        """Return the amount of sent coins"""
+        return self.sent_amount
+
+    def get_sent_currency(self):
+        """Return the currency of sent coins"""
+        return self.sent_currency
+
+    def get_transaction_fee_amount(self):
+        """Return the amount of transaction fee coins"""
+        return self.fee_amount
+
+    def get_transaction_fee_currency(self):
+        """Return the currency of transaction fee coins"""
+        return self.fee_currency
+
+    def get_order_id(self):
+        """Return the order id of the exchange"""
+        return self.order_id
+
+    def get_description(self):
+        """Return the description of the transaction"""
+        return self.description
+
+# Cached values per date part, a cache starts over once it is full
+MAX_CACHED_DATE_PARTS = 4096
+
+def _valid_minutes(hours):
+    """Return True if the text is a time of day in the form HH:MM (which is also its Chainreport format)"""
+    return (len(hours) == 5 and hours.isascii() and hours[2] == ":" and hours[:2].isdigit() and
+            hours[3:].isdigit() and hours[:2] < "24" and hours[3:] < "60")
+
+def _fraction_check(part_format):
+    """Return a check of the fractions of a second followed by literal text (e.g. %fZ), None for other formats"""
+    suffix = part_format[2:]
+    if not part_format.startswith("%f") or "%" in suffix:
+        return None
+
+    def check(part):
+        digits = part[:len(part) - len(suffix)]
+        if not (part.endswith(suffix) and 1 <= len(digits) <= 6 and digits.isascii() and digits.isdigit()):
+            raise ValueError(part)
+    return check
+
+@functools.lru_cache(maxsize=None)
+def date_converter(input_format):
+    """
+    Return a function converting the date strings of an export into the Chainreport format (dd.mm.YYYY HH:MM).
+    There is one converter per input format, so parsers and compiled specs of a format share the cached parts.
+
+    A date string is split into the day, the hours with minutes and the rest (seconds, time zone), a rest with
+    fractions of a second once more at the dot. The hours with minutes and the fractions are checked directly, so
+    they need no cache. The other parts are checked with strptime once and looked up afterwards, so the rows of an
+    export cost dictionary lookups instead of one strptime call each. Strings which do not split like the format
+    take the full strptime, invalid dates raise ValueError like strptime.
+    """
+    separator = "T" if "%dT" in input_format else " "
+    day_format, _, time_format = input_format.partition(separator)
+    rest_formats = time_format[5:].split(".", 1)
+    days = {}
+
+    def convert_full(text):
+        return datetime.strptime(text, input_format).strftime('%d.%m.%Y %H:%M')
+
+    def cached_part(cache, part, part_format, output_format):
+        value = datetime.strptime(part, part_format).strftime(output_format)
+        if len(cache) >= MAX_CACHED_DATE_PARTS:
+            cache.clear()
+        cache[part] = value
+        return value
+
+    def cached_check(part_format):
+        cache = {}
+
+        def check(part):
+            if part not in cache:
+                cached_part(cache, part, part_format, '')
+        return check
+
+    rest_checks = [_fraction_check(part_format) or cached_check(part_format) for part_format in rest_formats]
+
+    def convert(text):
+        day, _, time = text.partition(separator)
+        hours, rest = time[:5], time[5:]
+        try:
+            converted_day = days.get(day) or cached_part(days, day, day_format, '%d.%m.%Y')
+            if not _valid_minutes(hours):
+                raise ValueError(text)
+            rest_parts = rest.split(".", 1)
+            if len(rest_parts) != len(rest_formats):
+                raise ValueError(text)
+            for check, part in zip(rest_checks, rest_parts):
+                check(part)
+        except ValueError:
+            return convert_full(text)
+        return converted_day + " " + hours
+
+    return convert if time_format.startswith("%H:%M") else convert_full
+
+def schema_columns(fieldnames, alternatives):
+    """
+    Return the column used for every value of the row, detected from the header.
+
+    Exports of different versions name a column differently. For every tuple of alternative column names the
+    first one found in the header is returned, None if the header has none of them.
+    """
+    return tuple(next((column for column in columns if column in fieldnames), None) for columns in alternatives)
 
 class ChainreportParserInterface(metaclass=abc.ABCMeta):
     """Parser Interface with runtime error on missing implementation"""
@@ -46,6 +199,54 @@ class ChainreportParserInterface(metaclass=abc.ABCMeta):
                 callable(subclass.get_description) or
                 NotImplemented)
 
+    @classmethod
+    def parse_batch(cls, rows):
+        """
+        Parse a batch of input rows at once.
+
+        The default creates one parser object per row and calls its getters. Parsers override it to share the
+        lookups and the date conversion across the batch.
+
+        Parameters:
+        rows (list): The raw input rows (csv dictionaries or pdf records).
+
+        Returns:
+        list: One ParsedRecord per row, in the order of the rows.
+        """
+        return [cls(row).parsed_record() for row in rows]
+
+    @classmethod
+    def bind_schema(cls, fieldnames, overrides=None):  # pylint: disable=unused-argument
+        """
+        Return the batch parser for the export schema version of a file.
+
+        The schema version is detected once from the header of the file, the returned function parses the rows
+        of this file without probing for the columns of other versions. The default is parse_batch.
+
+        Parameters:
+        fieldnames (list): The column names of the csv header.
+        overrides (dict): Description overrides of the parser ("types" and "skip"), if the parser supports them.
+
+        Returns:
+        function: Parser of a batch of rows (list of csv dictionaries) into ParsedRecords.
+        """
+        return cls.parse_batch
+
+    def parsed_record(self):
+        """
+        Return the values of all getters as ParsedRecord.
+
+        Returns:
+        ParsedRecord: The record of the row, a skipped row only carries its description.
+        """
+        if self.check_if_skip_line():
+            return ParsedRecord.skipped(self.get_input_string(), self.get_description())
+        return ParsedRecord(self.get_input_string(), False, self.get_date_string(), self.get_transaction_type(),
+                            self.get_received_amount(), self.get_received_currency(),
+                            self.get_sent_amount(), self.get_sent_currency(),
+                            self.get_transaction_fee_amount(), self.get_transaction_fee_currency(),
+                            self.get_order_id(), self.get_description())
+
     @abc.abstractmethod
     def check_if_skip_line(self):
         """
@@ -65,6 +266,25 @@ class ChainreportParserInterface(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_input_string(self):
+        """
+        Returns the input data of the transaction.
+
+        This method should be implemented by any class that inherits from this interface.
+        It should return the raw input row (or line) the parser object was created from.
+
+        Parameters:
+        None
+
+        Returns:
+        The raw input row of the transaction.
+
+        Raises:
+        NotImplementedError: If the method is not implemented in the inheriting class.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_date_string(self):
         """
@@ -1,9 +1,9 @@
 """Parser implementation for Coinbase export file."""
 
-from datetime import datetime
-from .chainreport_parser_interface import ChainreportParserInterface
+from .chainreport_parser_interface import date_converter, schema_columns
+from .mapping_spec import SpecMappedParser
 
-class CoinbaseParserCsv(ChainreportParserInterface):
+class CoinbaseParserCsv(SpecMappedParser):
     """Extract all required information from Coinbase export file."""
 
     def __init__(self, row):
@@ -16,7 +16,7 @@ class CoinbaseParserCsv(ChainreportParserInterface):
 
         Attributes:
         input_row (dict): The original input data row.
-        date (datetime): The date of the transaction.
+        date (str): The date of the transaction in Chainreport format.
         received_amount (str): The amount of received coins.
         received_currency (str): The currency of the received coins.
         sent_amount (str): The amount of sent coins.
@@ -27,19 +27,28 @@ class CoinbaseParserCsv(ChainreportParserInterface):
         description (str): The description of the transaction.
         """
         self.input_row = row
-        self.date = datetime.strptime(self.input_row['Timestamp'], '%Y-%m-%d %H:%M:%S UTC')
+        price_column, id_column = schema_columns(row, self.SCHEMA_ALTERNATIVES)
+        self.date = self.convert_date(self.input_row['Timestamp'])
         self.received_amount = self.input_row['Quantity Transacted'].replace(".", ",")
         self.received_currency = self.input_row['Asset']
         self.sent_amount = self.input_row['Subtotal'].replace(".", ",")
-        self.sent_currency = self.input_row['Price Currency']
+        self.sent_currency = self.input_row[price_column or 'Price Currency']
         self.fee_amount = self.input_row['Fees and/or Spread'].replace(".", ",")
-        self.fee_currency = self.input_row['Price Currency']
-        self.order_id = self.input_row['ID']
+        self.fee_currency = self.sent_currency
+        self.order_id = self.input_row[id_column] if id_column else ""
         self.description = self.input_row['Transaction Type']
 
     NAME = __qualname__
     DELIMITER=","
+    # Raw columns used to filter the rows before parsing
+    DATE_FIELD = 'Timestamp'
+    DESCRIPTION_FIELD = 'Transaction Type'
+    CURRENCY_FIELDS = ['Asset', 'Price Currency', 'Spot Price Currency']
     SKIPINITIALLINES=3
+    # Columns of the price currency and the order id, older exports have a spot price currency and no id
+    SCHEMA_ALTERNATIVES = (('Price Currency', 'Spot Price Currency'), ('ID',))
+    # Converts the dates ('%Y-%m-%d %H:%M:%S UTC') with cached date parts
+    convert_date = staticmethod(date_converter('%Y-%m-%d %H:%M:%S UTC'))
     CASHBACKTRANSACTION = []
     DEPOSITTRANSACTION = ['Deposit']
     STAKINGTRANSACTION = ['Staking Income']
@@ -47,11 +56,33 @@ class CoinbaseParserCsv(ChainreportParserInterface):
     SKIPSTRINGS = []
     REFERRALSTRING = []
     TRADETRANSACTION = ['Buy']
+    TWO_LINE_TRADES = False
     PAYMENTTRANSACTION = []
     AIRDROPTRANSACTION = []
     CANCELTRANSACTION = []
     FEETRANSACTION = []
     OTHERINCOMETRANSACTION = ['Receive']
+    # Mapping of the export, the columns which differ between the export versions are bound from the header
+    SPEC = {
+        "date": ('Timestamp', '%Y-%m-%d %H:%M:%S UTC'),
+        "type_column": 'Transaction Type',
+        "skip": SKIPSTRINGS,
+        "types": [('Deposit', DEPOSITTRANSACTION),
+                  ('Withdrawal', WITHDRAWTRANSACTION),
+                  ('Trade', TRADETRANSACTION),
+                  ('Other_Income', OTHERINCOMETRANSACTION),
+                  ('Staking', STAKINGTRANSACTION)],
+        "fields": {"received_amount": 'Quantity Transacted', "received_currency": 'Asset',
+                   "fee_amount": 'Fees and/or Spread', "fee_currency": SCHEMA_ALTERNATIVES[0],
+                   "order_id": SCHEMA_ALTERNATIVES[1], "description": 'Transaction Type'},
+        "type_fields": {'Withdrawal': {"received_amount": None, "received_currency": None,
+                                       "sent_amount": {"column": 'Quantity Transacted', "prefix": "-"},
+                                       "sent_currency": 'Asset'},
+                        'Trade': {"sent_amount": {"column": 'Subtotal', "prefix": "-"},
+                                  "sent_currency": SCHEMA_ALTERNATIVES[0]}},
+        "optional": ['ID'],
+        "decimal": (".", ","),
+    }
 
     def check_if_skip_line(self):
         """
@@ -87,8 +118,8 @@ class CoinbaseParserCsv(ChainreportParserInterface):
         """
         Return datestring in Chainreport format.
 
-        This method formats the date attribute of the CoinbaseParserCsv object into a string 
-        using the strftime function with the format '%d.%m.%Y %H:%M'. This format is commonly 
+        This method returns the date attribute of the CoinbaseParserCsv object, converted into 
+        the format '%d.%m.%Y %H:%M' when the object was created. This format is commonly 
         used in the Chainreport format for dates.
 
         Parameters:
@@ -98,7 +129,7 @@ class CoinbaseParserCsv(ChainreportParserInterface):
         str: The date attribute of the CoinbaseParserCsv object formatted as a string in 
             the Chainreport format.
         """
-        return self.date.strftime('%d.%m.%Y %H:%M')
+        return self.date
 
     def get_transaction_type(self):
         """
@@ -1,9 +1,9 @@
 """Parser implementation for HI"""
 
-from datetime import datetime
-from .chainreport_parser_interface import ChainreportParserInterface
+from .chainreport_parser_interface import date_converter
+from .mapping_spec import SpecMappedParser
 
-class HiParserCsv(ChainreportParserInterface):
+class HiParserCsv(SpecMappedParser):
     """Extract all required information from Hi statement."""
 
     def __init__(self, row):
@@ -24,7 +24,13 @@ class HiParserCsv(ChainreportParserInterface):
 
     NAME = __qualname__
     DELIMITER=","
+    # Raw columns used to filter the rows before parsing
+    DATE_FIELD = 'Date'
+    DESCRIPTION_FIELD = 'Description'
+    CURRENCY_FIELDS = ['Received Currency', 'Sent Currency', 'Fee Currency']
     SKIPINITIALLINES=0
+    # Converts the dates ('%Y-%m-%d %H:%M %Z') with cached date parts
+    convert_date = staticmethod(date_converter('%Y-%m-%d %H:%M %Z'))
     CASHBACKTRANSACTION = ['HI rebate']
     DEPOSITTRANSACTION = ['Crypto deposit',
                           'crypto receive',
@@ -48,11 +54,50 @@ class HiParserCsv(ChainreportParserInterface):
     TRADETRANSACTION = ['buy Vault HI', # 1. Hi splits trade into two lines
                         'buy HI paid',  # 2. Hi splits trade into two lines
                         'Dust to HI']
+    TWO_LINE_TRADES = True # The received and the sent part of a trade are separate lines
     PAYMENTTRANSACTION = ['convert'] # Missing Euro Amount in CSV from Hi
     AIRDROPTRANSACTION = []
     CANCELTRANSACTION = ['Crypto cancel withdraw']
     OTHERINCOMETRANSACTION = ['Yields',
                               'crypto cashhash redeem']
+    # Mapping of the csv export, compiled for the file header (the value columns can be missing in the header)
+    SPEC = {
+        "date": ('Date', '%Y-%m-%d %H:%M %Z'),
+        "type_column": 'Description',
+        "strip_type": True,
+        "skip_empty": True,
+        "case": "lower",
+        "skip": SKIPSTRINGS,
+        "types": [('Cashback', CASHBACKTRANSACTION),
+                  ('Staking', STAKINGTRANSACTION),
+                  ('Deposit', DEPOSITTRANSACTION),
+                  ('Withdrawal', WITHDRAWTRANSACTION),
+                  ('Trade', TRADETRANSACTION),
+                  ('Payment', PAYMENTTRANSACTION),
+                  ('Airdrop', AIRDROPTRANSACTION),
+                  ('Cancel', CANCELTRANSACTION),
+                  ('Other income', OTHERINCOMETRANSACTION),
+                  ('Referral_Rewards', REFERRALSTRING)],
+        "fields": {"received_amount": 'Received Amount', "received_currency": 'Received Currency',
+                   "sent_amount": 'Sent Amount', "sent_currency": 'Sent Currency',
+                   "fee_amount": 'Fee Amount', "fee_currency": 'Fee Currency',
+                   "order_id": 'TxHash', "description": 'Description'},
+        "optional": ['Received Amount', 'Received Currency', 'Sent Amount', 'Sent Currency',
+                     'Fee Amount', 'Fee Currency', 'TxHash'],
+        "strip_values": True,
+        "decimal": (".", ","),
+    }
+
+    @classmethod
+    def transaction_type_lists(cls) -> dict:
+        """
+        Return the description lists per transaction type of the SPEC, in the order they are checked.
+
+        Returns:
+        --------
+        dict : The transaction type in Chainreport format mapped to its list of descriptions.
+        """
+        return dict(cls.SPEC["types"])
 
     def check_if_skip_line(self) -> bool:
         """
@@ -116,8 +161,7 @@ class HiParserCsv(ChainreportParserInterface):
         """
         if 'Date' not in self.input_row:
             raise KeyError("The 'Date' key is missing in the input row.")
-        transaction_datetime = datetime.strptime(self.input_row['Date'], '%Y-%m-%d %H:%M %Z')
-        return transaction_datetime.strftime('%d.%m.%Y %H:%M')
+        return self.convert_date(self.input_row['Date'])
 
     def get_transaction_type(self) -> str:
         """
@@ -137,20 +181,7 @@ class HiParserCsv(ChainreportParserInterface):
         if transaction_description is not None and isinstance(transaction_description, str):
             transaction_description = transaction_description.strip()
 
-        transaction_types = {
-            'Cashback': self.CASHBACKTRANSACTION,
-            'Staking': self.STAKINGTRANSACTION,
-            'Deposit': self.DEPOSITTRANSACTION,
-            'Withdrawal': self.WITHDRAWTRANSACTION,
-            'Trade': self.TRADETRANSACTION,
-            'Payment': self.PAYMENTTRANSACTION,
-            'Airdrop': self.AIRDROPTRANSACTION,
-            'Cancel': self.CANCELTRANSACTION,
-            'Other income': self.OTHERINCOMETRANSACTION,
-            'Referral_Rewards': self.REFERRALSTRING
-        }
-
-        for transaction_type, transaction_list in transaction_types.items():
+        for transaction_type, transaction_list in self.transaction_type_lists().items():
             if transaction_description.lower() in [item.lower() for item in transaction_list]:
                 return transaction_type
         return 'ERROR'
@@ -1,25 +1,48 @@
 """Parser implementation for HI"""
 
 import re
-from datetime import datetime
-from .chainreport_parser_interface import ChainreportParserInterface
+from collections import namedtuple
+from .chainreport_parser_interface import ChainreportParserInterface, ParsedRecord, date_converter
+
+# Compact transaction line of the statement as found by HiParserPdf.scan_page
+HiPdfRecord = namedtuple("HiPdfRecord", ["line", "date", "description", "amount", "currency"])
 
 class HiParserPdf(ChainreportParserInterface):
     """Extract all required information from Hi statement."""
 
+    # One transaction line, used with re.MULTILINE on the whole page text
+    # Use the 20th century for selection, dont expect hi to be around after 2100 ;)
+    LINE_PATTERN = re.compile(r'^(?P<date>20\d*-\d+-\d+[^\S\n]\d+:\d+[^\S\n][UTC]+) (?P<description>[/a-zA-Z ()]+) '
+                              r'(?P<amount>-*\d*\.*\d*) (?P<currency>\w+)$', re.MULTILINE)
+
     def __init__(self, line):
-        self.input_line = line
-        # pylint: disable=line-too-long
-        pattern = re.compile(r'(?P<date>\d+-\d+-\d+\s\d+\d+:\d+\s[UTC]+) (?P<description>[/a-zA-Z ()]+) (?P<amount>-*[\d]*[.]*[\d]*) (?P<currency>[\w]+$)')
-        for data in re.finditer(pattern, line):
-            self.date = data.group('date')
-            self.description = data.group('description')
-            self.amount = data.group('amount').replace(".", ",")
-            self.currency = data.group('currency')
+        """Take a record of scan_page or a single statement line"""
+        record = line if isinstance(line, HiPdfRecord) else self.parse_line(line)
+        self.input_line = record.line
+        self.date = record.date
+        self.description = record.description
+        self.amount = record.amount.replace(".", ",")
+        self.currency = record.currency
+
+    @classmethod
+    def scan_page(cls, text):
+        """Yield the transaction records of a page text, the other lines of the page are skipped by the scan"""
+        for data in cls.LINE_PATTERN.finditer(text):
+            yield HiPdfRecord._make((data.group(0),) + data.groups())
+
+    @classmethod
+    def parse_line(cls, line):
+        """Return the record of a single statement line (empty fields if it is no transaction line)"""
+        data = cls.LINE_PATTERN.search(line)
+        if data:
+            return HiPdfRecord._make((data.group(0),) + data.groups())
+        return HiPdfRecord(line, "", "", "", "")
 
     # pylint: disable=duplicate-code
     NAME = __qualname__
     SKIPINITIALLINES=0
+    # Converts the statement dates ('%Y-%m-%d %H:%M %Z') with cached date parts
+    convert_date = staticmethod(date_converter('%Y-%m-%d %H:%M %Z'))
     CASHBACKTRANSACTION = ['HI rebate']
     DEPOSITTRANSACTION = ['Crypto deposit',
                           'crypto receive',
@@ -42,11 +65,40 @@ class HiParserPdf(ChainreportParserInterface):
     TRADETRANSACTION = ['buy Vault HI', # 1. Hi splits trade into two lines
                         'buy HI paid',  # 2. Hi splits trade into two lines
                         'Dust to HI']
+    TWO_LINE_TRADES = True # The received and the sent part of a trade are separate lines
     PAYMENTTRANSACTION = ['convert']
     AIRDROPTRANSACTION = []
     CANCELTRANSACTION = ['Crypto cancel withdraw']
     OTHERINCOMETRANSACTION = ['Yields',
                               'crypto cashhash redeem']
+    # Transaction type per description for parse_batch, in the order of get_transaction_type (the first type wins)
+    TRANSACTION_TYPES = {description: transaction_type for transaction_type, descriptions in reversed((
+        ('Cashback', CASHBACKTRANSACTION), ('Staking', STAKINGTRANSACTION), ('Deposit', DEPOSITTRANSACTION),
+        ('Withdrawal', WITHDRAWTRANSACTION), ('Referral_Rewards', REFERRALSTRING), ('Trade', TRADETRANSACTION),
+        ('Payment', PAYMENTTRANSACTION), ('Airdrop', AIRDROPTRANSACTION), ('Other_Income', OTHERINCOMETRANSACTION)))
+                         for description in descriptions}
+
+    @classmethod
+    def parse_batch(cls, rows):
+        """Parse a batch of scan_page records (or statement lines) into ParsedRecords, without parser objects"""
+        skip_strings = cls.SKIPSTRINGS
+        transaction_types = cls.TRANSACTION_TYPES
+        convert_date = cls.convert_date
+        records = []
+        for record in rows:
+            line, date, description, amount, currency = (record if isinstance(record, HiPdfRecord)
+                                                         else cls.parse_line(record))
+            if description in skip_strings:
+                records.append(ParsedRecord.skipped(line, description))
+                continue
+            amount = amount.replace(".", ",")
+            if amount.startswith("-"):
+                values = ("", "", amount.lstrip("-"), currency)
+            else:
+                values = (amount, currency, "", "")
+            records.append(ParsedRecord(line, False, convert_date(date), transaction_types.get(description, 'ERROR'),
+                                        *values, "", "", "", description))
+        return records
 
     def check_if_skip_line(self):
         """Return true, if the line should be skipped
@@ -59,8 +111,7 @@ class HiParserPdf(ChainreportParserInterface):
 
     def get_date_string(self):
         """Return datestring in Chainreport format"""
-        transaction_time = datetime.strptime(self.date, '%Y-%m-%d %H:%M %Z')
-        return transaction_time.strftime('%d.%m.%Y %H:%M')
+        return self.convert_date(self.date)
 
     def get_transaction_type(self):
         """Return transaction type in Chainreport format"""
@@ -0,0 +1,270 @@
+"""Declarative exchange mappings, compiled into batch row converters"""
+
+import functools
+import operator
+from collections import namedtuple
+from .chainreport_parser_interface import ChainreportParserInterface, ParsedRecord, date_converter
+
+# Values of a record after the date and the transaction type, in the order of ParsedRecord
+RECORD_FIELDS = ["received_amount", "received_currency", "sent_amount", "sent_currency",
+                 "fee_amount", "fee_currency", "order_id", "description"]
+
+# Case folding of the transaction type lookup
+CASE_FOLDING = {None: None, "lower": str.lower, "upper": str.upper}
+
+def _header_column(columns, fieldnames):
+    """Return the column of the header for a column name or a tuple of alternative names (the first found wins),
+    None if the header has none of them"""
+    if isinstance(columns, str):
+        columns = (columns,)
+    for column in columns:
+        if column in fieldnames:
+            return column
+    return None
+
+def _reader(columns):
+    """Return a function reading the values of the columns of a row as tuple"""
+    if len(columns) == 1:
+        column = columns[0]
+        return lambda row: (row[column],)
+    if not columns:
+        return lambda _row: ()
+    return operator.itemgetter(*columns)
+
+# Layout of record values: reader of the columns, positions of the amounts, (position, prefix) pairs of the read
+# values and (position, value) pairs of the constants inserted afterwards
+FieldLayout = namedtuple("FieldLayout", "read amounts prefixes constants")
+
+def _field_layout(rules, fields, spec, fieldnames):
+    """Compile the rules of the record values into a FieldLayout"""
+    columns, amounts, prefixes, constants = [], [], [], []
+    for position, field in enumerate(fields):
+        rule = rules.get(field)
+        if isinstance(rule, dict) and "constant" in rule:
+            constants.append((position, rule["constant"]))
+            continue
+        names, prefix = (rule["column"], rule.get("prefix", "")) if isinstance(rule, dict) else (rule, "")
+        column = _header_column(names, fieldnames) if names else None
+        if column is None:
+            alternatives = [names] if isinstance(names, str) else list(names or [])
+            if not alternatives or set(alternatives) & set(spec.get("optional", [])):
+                constants.append((position, ""))
+                continue
+            column = alternatives[0]
+        if field.endswith("_amount") and spec.get("decimal"):
+            amounts.append(len(columns))
+        if prefix:
+            prefixes.append((len(columns), prefix))
+        columns.append(column)
+    return FieldLayout(_reader(columns), amounts, prefixes, constants)
+
+def _layout_values(layout, row, strip, decimal):
+    """Return the record values of a row with a FieldLayout"""
+    values = list(map(str.strip, layout.read(row))) if strip else list(layout.read(row))
+    for position in layout.amounts:
+        values[position] = values[position].replace(*decimal)
+    for position, prefix in layout.prefixes:
+        values[position] = prefix + values[position]
+    for position, constant in layout.constants:
+        values.insert(position, constant)
+    return values
+
+def _lookups(spec, overrides):
+    """Return the description to transaction type dictionary (the first type of a description wins) and the
+    descriptions to skip of the spec, with the overrides merged in"""
+    fold = CASE_FOLDING[spec.get("case")]
+    transaction_types = {}
+    for transaction_type, descriptions in spec["types"]:
+        for description in descriptions:
+            transaction_types.setdefault(fold(description) if fold else description, transaction_type)
+    skip = set(spec.get("skip", []))
+    if overrides:
+        for description, transaction_type in overrides.get("types", {}).items():
+            transaction_types[fold(description) if fold else description] = transaction_type
+            skip.discard(description)
+        skip.update(overrides.get("skip", []))
+    return transaction_types, frozenset(skip)
+
+def compile_spec(spec, fieldnames, fallback, overrides=None):
+    """
+    Compile a mapping spec for the header of a file into a batch parser.
+
+    The columns, the lookups and the layout of the record values are resolved once, the returned function only
+    reads the values of each row. Rows with missing values (None) which can not be converted are handed to
+    fallback, which returns their record.
+
+    Parameters:
+    spec (dict): The mapping spec of the exchange, see the SPEC of the parsers. Keys:
+        date: (column, input date format)
+        type_column: column of the transaction description, matched against skip and types
+        strip_type: strip the description before matching, skip_empty: skip rows with empty description
+        case: None, "lower" or "upper" for a case insensitive type lookup
+        skip: descriptions of the rows to skip
+        types: (transaction type, descriptions) pairs, the first type of a description wins
+        fields: rule per record value (RECORD_FIELDS), type_fields: rules per transaction type replacing them.
+            A rule is None (empty), a column, a tuple of alternative columns, {"column": ..., "prefix": ...}
+            or {"constant": ...}
+        optional: columns which are empty if they are missing in the header
+        strip_values: strip all values, decimal: (decimal point, replacement) of the amounts
+    fieldnames (list): The column names of the csv header.
+    fallback (function): Returns the record of a row with missing values.
+    overrides (dict): Additional description mappings merged into the lookups: "types" maps descriptions to
+        transaction types (they win over the spec and are no longer skipped), "skip" lists descriptions to skip.
+
+    Returns:
+    function: Parser of a batch of rows (list of csv dictionaries) into ParsedRecords.
+    """
+    date_column, date_format = spec["date"]
+    convert_date = date_converter(date_format)
+    type_column = spec["type_column"]
+    strip_type = spec.get("strip_type", False)
+    fold = CASE_FOLDING[spec.get("case")]
+    skip_empty = spec.get("skip_empty", False)
+    transaction_types, skip = _lookups(spec, overrides)
+
+    strip = spec.get("strip_values", False)
+    point, comma = spec.get("decimal") or (".", ".")
+    default_layout = _field_layout(spec["fields"], RECORD_FIELDS, spec, fieldnames)
+    type_layouts = {transaction_type: _field_layout(dict(spec["fields"], **rules), RECORD_FIELDS, spec, fieldnames)
+                    for transaction_type, rules in spec.get("type_fields", {}).items()}
+    description_layout = _field_layout(spec["fields"], ["description"], spec, fieldnames)
+
+    def parse(rows):
+        records = []
+        for row in rows:
+            try:
+                key = row[type_column].strip() if strip_type else row[type_column]
+                if key in skip or (skip_empty and key == ""):
+                    records.append(ParsedRecord.skipped(row, _layout_values(description_layout, row, strip,
+                                                                            (point, comma))[0]))
+                    continue
+                transaction_type = transaction_types.get(fold(key) if fold else key, 'ERROR')
+                # Inlined _layout_values of the transaction type
+                read, amounts, prefixes, constants = type_layouts.get(transaction_type, default_layout)
+                values = list(map(str.strip, read(row))) if strip else list(read(row))
+                for position in amounts:
+                    values[position] = values[position].replace(point, comma)
+                for position, prefix in prefixes:
+                    values[position] = prefix + values[position]
+                for position, constant in constants:
+                    values.insert(position, constant)
+                records.append(ParsedRecord(row, False, convert_date(row[date_column]), transaction_type, *values))
+            except (AttributeError, TypeError):
+                # Missing values (None) of short rows
+                records.append(fallback(row))
+        return records
+    return parse
+
+class SpecMappedParser(ChainreportParserInterface):  # pylint: disable=abstract-method
+    """Parser with a mapping SPEC, the batches of a file are parsed by the compiled spec"""
+
+    SPEC = None
+
+    @classmethod
+    def bind_schema(cls, fieldnames, overrides=None):
+        """
+        Return the batch parser of the compiled SPEC for the file header.
+
+        Rows with missing values take the getters of a parser object, so they fail or default like before.
+
+        Parameters:
+        fieldnames (list): The column names of the csv header.
+        overrides (dict): Description overrides merged into the lookups of the spec, see compile_spec.
+
+        Returns:
+        function: Parser of a batch of rows into ParsedRecords.
+        """
+        return compile_spec(cls.SPEC, fieldnames, lambda row: cls(row).parsed_record(), overrides)
+
+class SpecParser(SpecMappedParser):
+    """Parser of an exchange described by its SPEC only, see spec_parser"""
+
+    def __init__(self, row):
+        """Parse a single row with the spec compiled for its columns, compiled once per header"""
+        self.record = _single_row_parser(type(self), tuple(row))([row])[0]
+
+    @staticmethod
+    def missing_value(row):
+        """Report a row with missing values"""
+        raise KeyError("missing value in row " + str(row))
+
+    @classmethod
+    def bind_schema(cls, fieldnames, overrides=None):
+        """Return the batch parser of the compiled SPEC for the file header, rows with missing values fail"""
+        return compile_spec(cls.SPEC, fieldnames, cls.missing_value, overrides)
+
+    def check_if_skip_line(self):
+        """Return true, if the line should be skipped"""
+        return self.record.check_if_skip_line()
+
+    def get_input_string(self):
+        """Return the input data we are using"""
+        return self.record.get_input_string()
+
+    def get_date_string(self):
+        """Return datestring in Chainreport format"""
+        return self.record.get_date_string()
+
+    def get_transaction_type(self):
+        """Return transaction type in Chainreport format"""
+        return self.record.get_transaction_type()
+
+    def get_received_amount(self):
+        """Return amount of received coins"""
+        return self.record.get_received_amount()
+
+    def get_received_currency(self):
+        """Return currency of received coins"""
+        return self.record.get_received_currency()
+
+    def get_sent_amount(self):
+        """Return amount of sent coins"""
+        return self.record.get_sent_amount()
+
+    def get_sent_currency(self):
+        """Return currency of sent coins"""
+        return self.record.get_sent_currency()
+
+    def get_transaction_fee_amount(self):
+        """Return amount of transaction fee coins"""
+        return self.record.get_transaction_fee_amount()
+
+    def get_transaction_fee_currency(self):
+        """Return currency of transaction fee coins"""
+        return self.record.get_transaction_fee_currency()
+
+    def get_order_id(self):
+        """Return order id of the exchange"""
+        return self.record.get_order_id()
+
+    def get_description(self):
+        """Return description of the transaction"""
+        return self.record.get_description()
+
+@functools.lru_cache(maxsize=None)
+def _single_row_parser(parser, fieldnames):
+    """Return the batch parser of a SpecParser class for the header, shared by the single rows of the header"""
+    return compile_spec(parser.SPEC, list(fieldnames), parser.missing_value)
+
+def spec_parser(name, spec):
+    """
+    Return a parser class for an exchange described by a mapping spec only.
+
+    Besides the keys of compile_spec the spec can give the csv delimiter, skip_initial_lines, the currency_columns
+    used by the row filter and the transaction semantics: the descriptions of the trades (two_line_trades if their
+    legs are separate rows), the withdrawals and the cancels of withdrawals.
+    """
+    return type(name, (SpecParser,), {
+        "NAME": name,
+        "SPEC": spec,
+        "DELIMITER": spec.get("delimiter", ","),
+        "SKIPINITIALLINES": spec.get("skip_initial_lines", 0),
+        "DATE_FIELD": spec["date"][0],
+        "DESCRIPTION_FIELD": spec["type_column"],
+        "CURRENCY_FIELDS": spec.get("currency_columns", []),
+        "SKIPSTRINGS": spec.get("skip", []),
+        "TRADETRANSACTION": spec.get("trades", []),
+        "TWO_LINE_TRADES": spec.get("two_line_trades", False),
+        "WITHDRAWTRANSACTION": spec.get("withdrawals", []),
+        "CANCELTRANSACTION": spec.get("cancels", []),
+    })
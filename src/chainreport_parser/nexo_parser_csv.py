@@ -1,9 +1,9 @@
 """Parser implementation for Nexo"""
 
-from datetime import datetime
-from .chainreport_parser_interface import ChainreportParserInterface
+from .chainreport_parser_interface import date_converter
+from .mapping_spec import SpecMappedParser
 
-class NexoParserCsv(ChainreportParserInterface):
+class NexoParserCsv(SpecMappedParser):
     """Extract all required information from Nexo csv."""
 
     def __init__(self, row):
@@ -11,7 +11,13 @@ class NexoParserCsv(ChainreportParserInterface):
 
     NAME = __qualname__
     DELIMITER=","
+    # Raw columns used to filter the rows before parsing
+    DATE_FIELD = 'Date / Time (UTC)'
+    DESCRIPTION_FIELD = 'Type'
+    CURRENCY_FIELDS = ['Input Currency', 'Output Currency']
     SKIPINITIALLINES=0
+    # Converts the dates ('%Y-%m-%d %H:%M:%S') with cached date parts
+    convert_date = staticmethod(date_converter('%Y-%m-%d %H:%M:%S'))
     CASHBACKTRANSACTION = ['Exchange Cashback']
     DEPOSITTRANSACTION = ['Deposit To Exchange',
                           'Top up Crypto']
@@ -27,12 +33,33 @@ class NexoParserCsv(ChainreportParserInterface):
                    'Credit Card Fiatx Refund']
     REFERRALSTRING = []  #unknown
     TRADETRANSACTION = ['Exchange']
+    TWO_LINE_TRADES = False
     PAYMENTTRANSACTION = ['Withdraw Exchanged']
     AIRDROPTRANSACTION = [] #unknown
     CANCELTRANSACTION = [] #unknown
     OTHERINCOME = ['Referral Bonus']
 
     POSSIBLE_OUTPUT = PAYMENTTRANSACTION + TRADETRANSACTION + WITHDRAWTRANSACTION
+    # Mapping of the export, trades receive the output and the possible outputs send the input
+    SPEC = {
+        "date": ('Date / Time (UTC)', '%Y-%m-%d %H:%M:%S'),
+        "type_column": 'Type',
+        "skip": SKIPSTRINGS,
+        "types": [('Cashback', CASHBACKTRANSACTION), ('Staking', STAKINGTRANSACTION),
+                  ('Deposit', DEPOSITTRANSACTION), ('Withdrawal', WITHDRAWTRANSACTION),
+                  ('Referral_Rewards', REFERRALSTRING), ('Trade', TRADETRANSACTION),
+                  ('Payment', PAYMENTTRANSACTION), ('Airdrop', AIRDROPTRANSACTION),
+                  ('Lending', LENDINGTRANSACTION), ('Other_Income', OTHERINCOME)],
+        "fields": {"received_amount": 'Input Amount', "received_currency": 'Input Currency',
+                   "order_id": 'Transaction', "description": 'Details'},
+        "type_fields": {'Trade': {"received_amount": 'Output Amount', "received_currency": 'Output Currency',
+                                  "sent_amount": 'Input Amount', "sent_currency": 'Input Currency'},
+                        'Payment': {"received_amount": None, "received_currency": None,
+                                    "sent_amount": 'Input Amount', "sent_currency": 'Input Currency'},
+                        'Withdrawal': {"received_amount": None, "received_currency": None,
+                                       "sent_amount": 'Input Amount', "sent_currency": 'Input Currency'}},
+        "decimal": (".", ","),
+    }
 
     def check_if_skip_line(self):
         """Return true, if the line should be skipped
@@ -45,8 +72,7 @@ class NexoParserCsv(ChainreportParserInterface):
 
     def get_date_string(self):
         """Return datestring in Chainreport format"""
-        transaction_time = datetime.strptime(self.input_row['Date / Time (UTC)'], '%Y-%m-%d %H:%M:%S')
-        return transaction_time.strftime('%d.%m.%Y %H:%M')
+        return self.convert_date(self.input_row['Date / Time (UTC)'])
 
     def get_transaction_type(self):
         """Return transaction type in Chainreport format"""
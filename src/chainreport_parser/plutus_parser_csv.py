@@ -1,9 +1,9 @@
 """Parser implementation for HI"""
 
-from datetime import datetime
-from .chainreport_parser_interface import ChainreportParserInterface
+from .chainreport_parser_interface import date_converter
+from .mapping_spec import SpecMappedParser
 
-class PlutusParserCsv(ChainreportParserInterface):
+class PlutusParserCsv(SpecMappedParser):
     """Extract all required information from Plutus Rewards file."""
 
     def __init__(self, row):
@@ -23,7 +23,17 @@ class PlutusParserCsv(ChainreportParserInterface):
 
     NAME = __qualname__
     DELIMITER="|"
+    # Raw columns used to filter the rows before parsing
+    DATE_FIELD = 'createdAt'
+    DESCRIPTION_FIELD = 'type'
+    CURRENCY_FIELDS = [] # Rewards are always PLU, the currency is filtered after parsing
     SKIPINITIALLINES=0
+    # Converts the dates ('%Y-%m-%dT%H:%M:%S.%fZ') with cached date parts
+    convert_date = staticmethod(date_converter('%Y-%m-%dT%H:%M:%S.%fZ'))
+    # Columns of the amount, the order id and the description in the two export versions, the first one wins
+    SCHEMA_ALTERNATIVES = (('amount', 'reward_plu_value'),
+                           ('statement_id', 'exchange_rate_id'),
+                           ('reference_type', 'description'))
     CASHBACKTRANSACTION = ['DAILY_REBATE_DISTRIBUTION',
                            'REBATE_BONUS']   # user for manual rebates (positive & negative)
     DEPOSITTRANSACTION = []
@@ -32,9 +42,24 @@ class PlutusParserCsv(ChainreportParserInterface):
     SKIPSTRINGS = []
     REFERRALSTRING = []
     TRADETRANSACTION = []
+    TWO_LINE_TRADES = False
     PAYMENTTRANSACTION = []
     AIRDROPTRANSACTION = []
     CANCELTRANSACTION = []
+    # Mapping of the rewards export, the columns of the export version are bound from the header
+    SPEC = {
+        "date": ('createdAt', '%Y-%m-%dT%H:%M:%S.%fZ'),
+        "type_column": 'type',
+        "strip_type": True,
+        "skip_empty": True,
+        "case": "upper",
+        "skip": SKIPSTRINGS,
+        "types": [('Cashback', CASHBACKTRANSACTION)],
+        "fields": {"received_amount": SCHEMA_ALTERNATIVES[0], "received_currency": {"constant": "PLU"},
+                   "order_id": SCHEMA_ALTERNATIVES[1], "description": SCHEMA_ALTERNATIVES[2]},
+        "strip_values": True,
+        "decimal": (".", ","),
+    }
 
     def check_if_skip_line(self) -> bool:
         """
@@ -102,8 +127,7 @@ class PlutusParserCsv(ChainreportParserInterface):
              If 'createdAt' or 'date' is not present, returns an empty string.
         """
         if 'createdAt' in self.input_row:
-            transaction_time = datetime.strptime(self.input_row['createdAt'], '%Y-%m-%dT%H:%M:%S.%fZ')
-            return transaction_time.strftime('%d.%m.%Y %H:%M')
+            return self.convert_date(self.input_row['createdAt'])
         raise KeyError("missing required field 'createdAt'")
 
     def get_transaction_type(self) -> str:
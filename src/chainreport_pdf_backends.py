@@ -0,0 +1,233 @@
+"""Interchangeable pdf text extraction backends, one per supported pdf library.
+
+Every backend opens a pdf file and returns the text of single pages. Only the libraries which are
+installed can be used, PyPDF2 (part of the requirements) is the default."""
+
+import importlib
+
+# The default library is imported with the module, so a conversion only opens the file
+import PyPDF2
+
+DEFAULT_BACKEND = "PyPDF2"
+
+def _import(module_name):
+    """Return the imported module or None if the library is not installed"""
+    if module_name == PyPDF2.__name__:
+        return PyPDF2
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        return None
+
+class PdfBackend():
+    """Text of the pages of one pdf file"""
+
+    NAME = ""
+    MODULE = ""
+
+    @classmethod
+    def is_available(cls):
+        """Return True if the library of the backend is installed"""
+        return _import(cls.MODULE) is not None
+
+    def __init__(self, filename, streaming=False):
+        self.filename = filename
+        # Streaming: load one page at a time and release it after its text was extracted
+        self.streaming = streaming
+        self.module = _import(self.MODULE)
+        self.document = self.open(self.module, filename)
+
+    def open(self, module, filename):
+        """Return the opened document of the library"""
+        raise NotImplementedError
+
+    def page_count(self):
+        """Return the number of pages"""
+        raise NotImplementedError
+
+    def page_text(self, index):
+        """Return the text of the page, one text line per line"""
+        raise NotImplementedError
+
+    def close(self):
+        """Release the document"""
+        self.document = None
+
+class PyPDF2Backend(PdfBackend):
+    """PyPDF2 (pure python)"""
+
+    NAME = "PyPDF2"
+    MODULE = "PyPDF2"
+    # Page attributes a page inherits from the page tree
+    INHERITABLE = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+    def __init__(self, filename, streaming=False):
+        self.pdf_file = None
+        self.page_references = None
+        super().__init__(filename, streaming)
+
+    def open(self, module, filename):
+        if not self.streaming:
+            return module.PdfReader(filename)
+        # Read from the open file instead of a copy of the whole file in memory
+        self.pdf_file = open(filename, 'rb')  # pylint: disable=consider-using-with
+        reader = module.PdfReader(self.pdf_file)
+        if self._has_streaming_internals(module, reader):
+            self.page_references = self._page_references(reader)
+        return reader
+
+    # Tested with PyPDF2 3.0.1, versions without the internals fall back to the pages of the reader
+    @staticmethod
+    def _has_streaming_internals(module, reader):
+        """Return True if the library has the internals for loading single pages, which are not part of its
+        public interface. Without them the pages are read with the reader, only from the open file."""
+        return (isinstance(getattr(reader, "resolved_objects", None), dict) and hasattr(module, "PageObject")
+                and hasattr(getattr(module, "generic", None), "NameObject"))
+
+    def _page_references(self, reader):
+        """Walk the page tree and keep only the page references with the inherited attributes,
+        instead of the parsed page objects of the whole document"""
+        page_references = []
+        stack = [(reader.trailer["/Root"].get_object()["/Pages"], {})]
+        while stack:
+            reference, inherited = stack.pop()
+            node = reference.get_object()
+            inherited = dict(inherited, **{key: node[key] for key in self.INHERITABLE if key in node})
+            if "/Kids" in node:
+                stack.extend((kid, inherited) for kid in reversed(node["/Kids"]))
+            else:
+                page_references.append((reference, inherited))
+            reader.resolved_objects.clear()
+        return page_references
+
+    def page_count(self):
+        if self.page_references is not None:
+            return len(self.page_references)
+        return len(self.document.pages)
+
+    def page_text(self, index):
+        if self.page_references is None:
+            return self.document.pages[index].extract_text()
+        reference, inherited = self.page_references[index]
+        page = self.module.PageObject(self.document, reference)
+        page.update(reference.get_object())
+        for key, value in inherited.items():
+            if key not in page:
+                page[self.module.generic.NameObject(key)] = value
+        text = page.extract_text()
+        # Drop the parsed objects of the page, they are read again from the file if needed
+        self.document.resolved_objects.clear()
+        return text
+
+    def close(self):
+        if self.streaming:
+            self.pdf_file.close()
+        super().close()
+
+class PypdfBackend(PyPDF2Backend):
+    """pypdf, the successor of PyPDF2 with the same interface (pure python)"""
+
+    NAME = "pypdf"
+    MODULE = "pypdf"
+
+class PyMuPDFBackend(PdfBackend):
+    """PyMuPDF (MuPDF bindings)"""
+
+    NAME = "PyMuPDF"
+    MODULE = "fitz"
+
+    def open(self, module, filename):
+        return module.open(filename)
+
+    def page_count(self):
+        return self.document.page_count
+
+    def page_text(self, index):
+        return self.document[index].get_text()
+
+    def close(self):
+        self.document.close()
+        super().close()
+
+class Pypdfium2Backend(PdfBackend):
+    """pypdfium2 (PDFium bindings)"""
+
+    NAME = "pypdfium2"
+    MODULE = "pypdfium2"
+
+    def open(self, module, filename):
+        return module.PdfDocument(filename)
+
+    def page_count(self):
+        return len(self.document)
+
+    def page_text(self, index):
+        page = self.document[index]
+        text_page = page.get_textpage()
+        text = text_page.get_text_range()
+        text_page.close()
+        page.close()
+        # PDFium ends the lines with \r\n
+        return text.replace("\r\n", "\n")
+
+    def close(self):
+        self.document.close()
+        super().close()
+
+class PdfminerBackend(PdfBackend):
+    """pdfminer.six (pure python, layout analysis)"""
+
+    NAME = "pdfminer"
+    MODULE = "pdfminer.high_level"
+
+    def __init__(self, filename, streaming=False):
+        self.pdf_file = None
+        self.page_layouts = []
+        super().__init__(filename, streaming)
+
+    def open(self, module, filename):
+        # One parse of the document, the layouts of the pages are analysed in order when their text is needed
+        self.pdf_file = open(filename, 'rb')  # pylint: disable=consider-using-with
+        return module.extract_pages(self.pdf_file)
+
+    def page_count(self):
+        pdfpage = _import("pdfminer.pdfpage")
+        with open(self.filename, 'rb') as pdf_input:
+            return sum(1 for _ in pdfpage.PDFPage.get_pages(pdf_input))
+
+    def page_text(self, index):
+        while len(self.page_layouts) <= index:
+            self.page_layouts.append(next(self.document))
+        return "".join(self._layout_text(self.page_layouts[index], _import("pdfminer.layout"))) + "\f"
+
+    def _layout_text(self, item, layout):
+        """Yield the text of the layout item like the text converter of pdfminer"""
+        if isinstance(item, layout.LTContainer):
+            for child in item:
+                yield from self._layout_text(child, layout)
+        elif isinstance(item, layout.LTText):
+            yield item.get_text()
+        if isinstance(item, layout.LTTextBox):
+            yield "\n"
+
+    def close(self):
+        self.pdf_file.close()
+        self.page_layouts = []
+        super().close()
+
+BACKENDS = {backend.NAME: backend for backend in [PyPDF2Backend, PypdfBackend, PyMuPDFBackend,
+                                                  Pypdfium2Backend, PdfminerBackend]}
+
+def available_backends():
+    """Return the names of the backends with an installed library"""
+    return [name for name, backend in BACKENDS.items() if backend.is_available()]
+
+def open_backend(name, filename, streaming=False):
+    """Return the opened backend, raise ValueError for unknown or not installed backends.
+    With streaming the backends which support it load and release one page at a time."""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError("Unknown pdf backend " + name + ", supported: " + ", ".join(BACKENDS))
+    if not BACKENDS[name].is_available():
+        raise ValueError("The library of the pdf backend " + name + " is not installed")
+    return BACKENDS[name](filename, streaming)
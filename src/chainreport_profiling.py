@@ -0,0 +1,55 @@
+"""Profiling of a single conversion run to analyse slow exports"""
+
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+
+class ConversionProfiler():
+    """Record a cProfile profile and a sampled stack profile of one function call.
+
+    The cProfile data is written as pstats file (readable with pstats, snakeviz, ...),
+    the sampled stacks are written in the collapsed format used by flamegraph.pl and speedscope."""
+
+    def __init__(self, output_prefix, interval=0.001):
+        self.output_prefix = output_prefix
+        self.interval = interval
+        self.profile = cProfile.Profile()
+        self.stacks = Counter()
+
+    def run(self, function, *args, **kwargs):
+        """Call the function with the given arguments while profiling it and return the result"""
+        stop_event = threading.Event()
+        sampler = threading.Thread(target=self._sample, args=(threading.get_ident(), stop_event), daemon=True)
+        sampler.start()
+        self.profile.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.profile.disable()
+            stop_event.set()
+            sampler.join()
+
+    def _sample(self, thread_id, stop_event):
+        """Periodically record the current call stack of the profiled thread"""
+        while not stop_event.wait(self.interval):
+            # pylint: disable=protected-access
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def write(self):
+        """Write the pstats and the collapsed stack file next to the output and return both filenames"""
+        pstats_filename = self.output_prefix + ".pstats"
+        collapsed_filename = self.output_prefix + ".collapsed.txt"
+        self.profile.dump_stats(pstats_filename)
+        with open(collapsed_filename, 'w', encoding="utf-8") as collapsed_output:
+            for stack, count in self.stacks.most_common():
+                collapsed_output.write(stack + " " + str(count) + "\n")
+        return [pstats_filename, collapsed_filename]
@@ -0,0 +1,60 @@
+"""Read text and csv files backwards, so newest-first files can be streamed oldest first.
+
+The file is memory mapped and the line ends are searched from the end of the file, so only the
+pages of the currently read block are loaded, independent of the file size. Quoted csv fields
+containing line breaks are not supported in backwards reading."""
+
+import csv
+import mmap
+import os
+
+def reversed_lines(filename, start=0):
+    """Yield the lines (bytes without line end) from the end of the file back to the offset start"""
+    if os.path.getsize(filename) <= start:
+        return
+    with open(filename, 'rb') as input_file:
+        with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            end = len(mapped)
+            while end > start:
+                line_start = mapped.rfind(b"\n", start, end - 1) + 1
+                if line_start == 0:
+                    line_start = start
+                line = mapped[line_start:end].rstrip(b"\r\n")
+                if line:
+                    yield line
+                end = line_start
+
+def header_end(filename, skip_lines=0):
+    """Return the offset behind the header line (after skip_lines leading lines)"""
+    with open(filename, 'rb') as input_file:
+        for _ in range(skip_lines + 1):
+            input_file.readline()
+        return input_file.tell()
+
+def csv_fieldnames(filename, delimiter, skip_lines=0, encoding="utf-8"):
+    """Return the column names of the csv header (after skip_lines leading lines), an empty list without header"""
+    with open(filename, newline='', encoding=encoding) as csv_input:
+        for _ in range(skip_lines):
+            csv_input.readline()
+        return next(csv.reader(csv_input, delimiter=delimiter), [])
+
+def reversed_csv_rows(filename, delimiter, skip_lines=0, encoding="utf-8"):
+    """Yield the rows of a csv file as dictionaries from the last row to the first one. Like csv.DictReader the
+    missing values of short rows are None and the additional values of long rows are listed under the key None"""
+    fieldnames = csv_fieldnames(filename, delimiter, skip_lines, encoding)
+    if not fieldnames:
+        return
+    field_count = len(fieldnames)
+    # utf-8-sig: an optional byte order mark belongs to the header, which is not read backwards
+    encoding = "utf-8" if encoding == "utf-8-sig" else encoding
+    for line in reversed_lines(filename, header_end(filename, skip_lines)):
+        values = next(csv.reader([line.decode(encoding)], delimiter=delimiter), [])
+        if not values:
+            continue
+        row = dict(zip(fieldnames, values))
+        if len(values) > field_count:
+            row[None] = values[field_count:]
+        elif len(values) < field_count:
+            for fieldname in fieldnames[len(values):]:
+                row[fieldname] = None
+        yield row
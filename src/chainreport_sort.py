@@ -0,0 +1,99 @@
+"""External sort of chainreport rows by time with a bounded memory budget.
+
+The rows are collected in memory until the budget is reached, then the sorted run is spilled to a
+temporary file. At the end the runs are merged, rows with the same time keep their written order."""
+
+import csv
+import heapq
+import os
+import sys
+import tempfile
+
+from chainreport_incremental import sortable_date
+
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+# Maximum number of runs merged at once, more runs are merged in several passes
+MAX_MERGE_FILES = 64
+
+class ExternalSorter():
+    """Sort chainreport rows (dictionaries) by their date column.
+
+    writerow() has the signature of csv.DictWriter.writerow, so the sorter can replace the writer
+    of a conversion. sorted_rows() yields the rows in time order, close() removes the run files."""
+
+    def __init__(self, fieldnames, date_field, memory_budget=DEFAULT_MEMORY_BUDGET, directory=None):
+        self.fieldnames = fieldnames
+        self.date_index = fieldnames.index(date_field)
+        self.memory_budget = memory_budget
+        self.directory = tempfile.mkdtemp(prefix="chainreport-sort-", dir=directory)
+        self.buffer = []
+        self.buffer_size = 0
+        self.runs = []
+        self.spilled_runs = 0
+
+    def writerow(self, row):
+        """Add a row, spill the buffer to a run file if the memory budget is reached"""
+        values = [row.get(fieldname, "") for fieldname in self.fieldnames]
+        self.buffer.append((sortable_date(values[self.date_index]), values))
+        self.buffer_size += sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+        if self.buffer_size >= self.memory_budget:
+            self._spill()
+
+    def _new_run(self):
+        """Return the name of a new empty run file"""
+        run_file, run_filename = tempfile.mkstemp(suffix=".csv", dir=self.directory)
+        os.close(run_file)
+        self.runs.append(run_filename)
+        return run_filename
+
+    def _spill(self):
+        """Write the sorted buffer as run file (the sort is stable, equal times keep their order)"""
+        if not self.buffer:
+            return
+        self.buffer.sort(key=lambda entry: entry[0])
+        with open(self._new_run(), 'w', newline='', encoding="utf-8") as run_output:
+            csv.writer(run_output).writerows(values for _, values in self.buffer)
+        self.spilled_runs += 1
+        self.buffer = []
+        self.buffer_size = 0
+
+    def _read_run(self, run_filename):
+        """Yield the (sort key, values) entries of a run file"""
+        with open(run_filename, newline='', encoding="utf-8") as run_input:
+            for values in csv.reader(run_input):
+                yield sortable_date(values[self.date_index]), values
+
+    def _merge_runs(self, runs):
+        """Merge the run files, runs are ordered by creation so equal times keep their order"""
+        return heapq.merge(*(self._read_run(run) for run in runs), key=lambda entry: entry[0])
+
+    def sorted_rows(self):
+        """Yield all written rows as dictionaries in time order"""
+        if not self.runs:
+            # Everything fits into the memory budget, no run files needed
+            self.buffer.sort(key=lambda entry: entry[0])
+            entries = self.buffer
+        else:
+            self._spill()
+            while len(self.runs) > MAX_MERGE_FILES:
+                runs = self.runs[:MAX_MERGE_FILES]
+                self.runs = self.runs[MAX_MERGE_FILES:]
+                merged_entries = self._merge_runs(runs)
+                # The merged run is added last, so move it to the position of the merged runs
+                with open(self._new_run(), 'w', newline='', encoding="utf-8") as run_output:
+                    csv.writer(run_output).writerows(values for _, values in merged_entries)
+                self.runs.insert(0, self.runs.pop())
+                for run in runs:
+                    os.remove(run)
+            entries = self._merge_runs(self.runs)
+        for _, values in entries:
+            yield dict(zip(self.fieldnames, values))
+
+    def close(self):
+        """Remove the run files"""
+        for run in self.runs:
+            if os.path.exists(run):
+                os.remove(run)
+        self.runs = []
+        self.buffer = []
+        os.rmdir(self.directory)
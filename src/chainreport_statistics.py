@@ -0,0 +1,87 @@
+"""Machine readable export of the conversion statistics (JSON and Prometheus text format)"""
+
+import json
+import sys
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, the peak resident memory is reported as None there
+    resource = None
+
+def get_process_peak_rss():
+    """Return the peak resident memory of the current process in bytes (None if unknown).
+
+    This is the peak over the lifetime of the process, not of a single conversion: in a long running
+    process (e.g. the app) a conversion reports the peak of the largest conversion so far."""
+    if resource is None:
+        return None
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    if sys.platform != "darwin":
+        peak_memory *= 1024
+    return peak_memory
+
+def write_json(statistics, filename):
+    """Write the statistics dictionary as JSON file, use '-' for stdout"""
+    if filename == "-":
+        json.dump(statistics, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write("\n")
+        return
+    with open(filename, 'w', encoding="utf-8") as json_output:
+        json.dump(statistics, json_output, indent=2, sort_keys=True)
+        json_output.write("\n")
+
+def _escape_label(value):
+    """Escape a label value according to the Prometheus text format"""
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(labels):
+    """Return the labels as Prometheus label string"""
+    return "{" + ",".join(name + "=\"" + _escape_label(value) + "\"" for name, value in labels.items()) + "}"
+
+# Metric name, statistics key, metric type and help text of the plain values
+PROMETHEUS_VALUES = [
+    ("chainreport_input_lines_total", "input_linecount", "counter", "Number of read input lines"),
+    ("chainreport_output_lines_total", "output_linecount", "counter", "Number of written chainreport lines"),
+    ("chainreport_ignored_lines_total", "ignored", "counter", "Number of skipped input lines"),
+    ("chainreport_filtered_lines_total", "filtered", "counter", "Number of input lines outside of the filters"),
+    ("chainreport_warnings_total", "warnings", "counter", "Number of warnings"),
+    ("chainreport_errors_total", "errors", "counter", "Number of errors"),
+    ("chainreport_elapsed_seconds", "elapsed_seconds", "gauge", "Duration of the conversion"),
+    ("chainreport_rows_per_second", "rows_per_second", "gauge", "Read input lines per second"),
+    ("chainreport_process_peak_rss_bytes", "process_peak_rss_bytes", "gauge",
+     "Peak resident memory of the process over its lifetime")
+]
+
+# Metric name, statistics key, label name and help text of the counted values
+PROMETHEUS_COUNTS = [
+    ("chainreport_transactions_total", "transaction_types", "type",
+     "Number of written chainreport lines per transaction type"),
+    ("chainreport_currency_lines_total", "currencies", "currency",
+     "Number of written chainreport lines per currency"),
+    ("chainreport_skipped_lines_total", "skipped_descriptions", "description",
+     "Number of skipped input lines per description")
+]
+
+def format_prometheus(statistics):
+    """Return the statistics in the Prometheus text exposition format"""
+    base_labels = {"parser": statistics.get("parser", "")}
+    lines = []
+    for name, key, metric_type, help_text in PROMETHEUS_VALUES:
+        if statistics.get(key) is None:
+            continue
+        lines.append("# HELP " + name + " " + help_text)
+        lines.append("# TYPE " + name + " " + metric_type)
+        lines.append(name + _format_labels(base_labels) + " " + str(statistics[key]))
+    for name, key, label, help_text in PROMETHEUS_COUNTS:
+        lines.append("# HELP " + name + " " + help_text)
+        lines.append("# TYPE " + name + " counter")
+        for value, count in sorted(statistics.get(key, {}).items()):
+            lines.append(name + _format_labels(dict(base_labels, **{label: value})) + " " + str(count))
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(statistics, filename):
+    """Write the statistics as Prometheus text format file (e.g. for the node exporter textfile collector)"""
+    with open(filename, 'w', encoding="utf-8") as prometheus_output:
+        prometheus_output.write(format_prometheus(statistics))
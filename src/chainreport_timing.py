@@ -0,0 +1,91 @@
+"""Optional stage timers for the conversion pipeline"""
+
+import time
+
+class StageTimer():
+    """Accumulate the time and the number of calls per conversion stage.
+
+    A disabled timer returns the wrapped functions and iterables unchanged,
+    so the conversion loop runs exactly as without any instrumentation.
+    Stages may be nested (e.g. classify within assemble), the time of the inner
+    stage is not counted again for the outer one, so the stages add up to the total."""
+
+    STAGES = ["read", "parse", "classify", "assemble", "write"]
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.seconds = dict.fromkeys(self.STAGES, 0.0)
+        self.counts = dict.fromkeys(self.STAGES, 0)
+        # Time of the nested stages, one entry per running measurement
+        self.nested = []
+
+    def wrap(self, stage, function):
+        """Return function, measured as part of the given stage if the timer is enabled"""
+        if not self.enabled:
+            return function
+
+        def timed_function(*args, **kwargs):
+            self._start()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._stop(stage)
+        return timed_function
+
+    def wrap_generator(self, stage, function):
+        """Return the generator function, measured as part of the given stage if the timer is enabled.
+        The measured function returns the list of the generated items, so the time spent by the consumer
+        of the items is not part of the stage"""
+        if not self.enabled:
+            return function
+        return self.wrap(stage, lambda *args, **kwargs: list(function(*args, **kwargs)))
+
+    def iterate(self, stage, iterable):
+        """Return iterable, with every step measured as part of the given stage if the timer is enabled"""
+        if not self.enabled:
+            return iterable
+        return self._timed_iterator(stage, iterable)
+
+    def _timed_iterator(self, stage, iterable):
+        """Generator measuring the time spent to fetch each item of the iterable"""
+        iterator = iter(iterable)
+        while True:
+            # The iterator itself marks the end, it is no item of the iterable
+            item = iterator
+            self._start()
+            try:
+                item = next(iterator, iterator)
+            finally:
+                self._stop(stage, counted=item is not iterator)
+            if item is iterator:
+                return
+            yield item
+
+    def _start(self):
+        """Start a measurement"""
+        self.nested.append(time.perf_counter())
+        self.nested.append(0.0)
+
+    def _stop(self, stage, counted=True):
+        """Stop the last started measurement and add its time without the nested stages to the stage"""
+        nested = self.nested.pop()
+        elapsed = time.perf_counter() - self.nested.pop()
+        self.seconds[stage] += elapsed - nested
+        self.counts[stage] += counted
+        if self.nested:
+            self.nested[-1] += elapsed
+
+    def as_dict(self):
+        """Return the measured data as {stage: {"seconds": float, "count": int}}"""
+        return {stage: {"seconds": self.seconds[stage], "count": self.counts[stage]}
+                for stage in self.STAGES}
+
+    def summary(self):
+        """Return a printable table of the measured stages"""
+        total = sum(self.seconds.values())
+        lines = ["Stage        Seconds    Share     Count"]
+        for stage in self.STAGES:
+            share = self.seconds[stage] / total * 100 if total else 0.0
+            lines.append(f"{stage:<10} {self.seconds[stage]:>9.3f} {share:>7.1f}% {self.counts[stage]:>9}")
+        lines.append(f"{'total':<10} {total:>9.3f}")
+        return "\n".join(lines)
@@ -0,0 +1,26 @@
+import pytest
+from benchmarks.generators import EXPORTS, hi_csv_rows, hi_pdf_lines
+from chainreport_converter import ChainreportConverter
+
+class TestBenchmarkGenerators:
+
+    # The same seed creates the same rows, another seed creates other rows
+    def test_generators_are_deterministic(self):
+        assert list(hi_csv_rows(50, seed=1)) == list(hi_csv_rows(50, seed=1))
+        assert list(hi_csv_rows(50, seed=1)) != list(hi_csv_rows(50, seed=2))
+
+    # The exact number of rows is generated
+    def test_generators_create_requested_row_count(self):
+        assert len(list(hi_pdf_lines(123))) == 123
+
+    # Every generated export is converted without errors
+    @pytest.mark.parametrize("name", list(EXPORTS))
+    def test_generated_exports_convert_without_errors(self, name, tmp_path):
+        parsertype, suffix, writer = EXPORTS[name]
+        input_file = str(tmp_path / ("input" + suffix))
+        writer(input_file, 300)
+        converter = ChainreportConverter(parsertype, input_file, str(tmp_path / "chainreport.csv"))
+        converter.convert()
+        assert converter.statistics["input_linecount"] == 300
+        assert converter.statistics["errors"] == 0
+        assert converter.statistics["output_linecount"] > 0
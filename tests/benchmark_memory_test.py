@@ -0,0 +1,18 @@
+from benchmarks.generators import write_nexo_csv
+from benchmarks.memory_benchmark import is_flat, measure_memory
+
+class TestMemoryBenchmark:
+
+    # The peak memory and the allocation sites of a conversion are reported
+    def test_measure_memory(self, tmp_path):
+        input_file = str(tmp_path / "nexo.csv")
+        write_nexo_csv(input_file, 2000)
+        result = measure_memory("Nexo", input_file, str(tmp_path / "chainreport.csv"), top=3)
+        assert result["rows"] == 2000
+        assert result["peak_memory_bytes"] > 0
+        assert len(result["top_sites"]) <= 3
+
+    # The memory is flat, if the largest input needs less than flat_factor times the smallest input
+    def test_is_flat(self):
+        assert is_flat([{"peak_memory_bytes": 100}, {"peak_memory_bytes": 150}], 2.0)
+        assert not is_flat([{"peak_memory_bytes": 100}, {"peak_memory_bytes": 250}], 2.0)
@@ -0,0 +1,131 @@
+import PyPDF2
+import pytest
+
+from benchmarks.generators import hi_pdf_lines, write_hi_pdf, write_pdf
+from benchmarks.pdf_backend_benchmark import benchmark_backend, fastest_correct, line_accuracy
+from chainreport_converter import ChainreportConverter
+from chainreport_pdf_backends import BACKENDS, PdfBackend, available_backends, open_backend
+
+class FakeBackend(PdfBackend):
+    """Pages of a text file separated by form feeds, the library is any installed module"""
+
+    NAME = "fake"
+    MODULE = "json"
+
+    def open(self, module, filename):
+        with open(filename, encoding="utf-8") as text_input:
+            return text_input.read().split("\f")
+
+    def page_count(self):
+        return len(self.document)
+
+    def page_text(self, index):
+        return self.document[index]
+
+class MissingBackend(FakeBackend):
+    """Backend of a library which is not installed"""
+
+    NAME = "missing"
+    MODULE = "chainreport_missing_pdf_library"
+
+class TestPdfBackends:
+
+    # Every installed backend reads the pages of a generated statement
+    @pytest.mark.parametrize("backend_name", available_backends())
+    def test_page_text(self, tmp_path, backend_name):
+        lines = list(hi_pdf_lines(150))
+        write_pdf(str(tmp_path / "hi.pdf"), lines)
+        document = open_backend(backend_name, str(tmp_path / "hi.pdf"))
+        assert document.page_count() == 3
+        assert lines[0] in document.page_text(0)
+        document.close()
+
+    # pdfminer parses the document once and returns the page texts of its extract_text in any order
+    def test_pdfminer_single_parse(self, tmp_path, monkeypatch):
+        high_level = pytest.importorskip("pdfminer.high_level")
+        write_pdf(str(tmp_path / "hi.pdf"), list(hi_pdf_lines(300)))
+        expected = [high_level.extract_text(str(tmp_path / "hi.pdf"), page_numbers=[index]) for index in range(6)]
+        monkeypatch.delattr(high_level, "extract_text")
+        document = open_backend("pdfminer", str(tmp_path / "hi.pdf"))
+        assert [document.page_text(index) for index in (3, 0, 5, 1, 2, 4)] == [expected[index] for index in (3, 0, 5, 1, 2, 4)]
+        assert len(document.page_layouts) == 6
+        document.close()
+
+    # A registered backend is opened by its name and converts like the default backend
+    def test_fake_backend(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(BACKENDS, FakeBackend.NAME, FakeBackend)
+        write_hi_pdf(str(tmp_path / "hi.pdf"), 300)
+        document = open_backend("PyPDF2", str(tmp_path / "hi.pdf"))
+        pages = [document.page_text(index) for index in range(document.page_count())]
+        document.close()
+        (tmp_path / "fake.pdf").write_text("\f".join(pages), encoding="utf-8")
+        fake = open_backend("fake", str(tmp_path / "fake.pdf"))
+        assert isinstance(fake, FakeBackend)
+        assert [fake.page_text(index) for index in range(fake.page_count())] == pages
+        assert "fake" in available_backends()
+        ChainreportConverter("Hi", str(tmp_path / "hi.pdf"), str(tmp_path / "default.csv")).convert()
+        ChainreportConverter("Hi", str(tmp_path / "fake.pdf"), str(tmp_path / "fake.csv"),
+                             {"pdf_backend": "fake"}).convert()
+        assert (tmp_path / "default.csv").read_bytes() == (tmp_path / "fake.csv").read_bytes()
+
+    # Backends without installed library are rejected
+    def test_missing_library(self, tmp_path, monkeypatch):
+        monkeypatch.setitem(BACKENDS, MissingBackend.NAME, MissingBackend)
+        assert "missing" not in available_backends()
+        with pytest.raises(ValueError):
+            open_backend("missing", str(tmp_path / "hi.pdf"))
+
+    # Unknown backends are rejected
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            open_backend("unknown", str(tmp_path / "hi.pdf"))
+
+class TestPdfBackendBenchmark:
+
+    # The default backend extracts all generated lines unchanged
+    def test_benchmark_backend(self, tmp_path):
+        lines = list(hi_pdf_lines(500))
+        write_pdf(str(tmp_path / "hi.pdf"), lines)
+        result = benchmark_backend("PyPDF2", str(tmp_path / "hi.pdf"), lines, repeat=1)
+        assert result["accuracy"] == 1.0
+        assert fastest_correct([result, {"backend": "other", "lines_per_second": 1e9, "accuracy": 0.5}]) == "PyPDF2"
+
+    # The accuracy counts missing and changed lines
+    def test_line_accuracy(self):
+        assert line_accuracy(["a", "b", "b", "c"], ["a", "b", "x"]) == 0.5
+
+class TestPdfStreaming:
+
+    # Streaming returns the same page texts as the normal mode
+    def test_streaming_page_text(self, tmp_path):
+        write_pdf(str(tmp_path / "hi.pdf"), list(hi_pdf_lines(300)))
+        document = open_backend("PyPDF2", str(tmp_path / "hi.pdf"))
+        streamed = open_backend("PyPDF2", str(tmp_path / "hi.pdf"), streaming=True)
+        assert streamed.page_count() == document.page_count() == 6
+        for index in range(document.page_count()):
+            assert streamed.page_text(index) == document.page_text(index)
+        assert not streamed.document.resolved_objects
+        streamed.close()
+        document.close()
+
+    # Without the internals of the library for single pages streaming falls back to the pages of the reader
+    def test_streaming_without_internals(self, tmp_path, monkeypatch):
+        write_pdf(str(tmp_path / "hi.pdf"), list(hi_pdf_lines(300)))
+        document = open_backend("PyPDF2", str(tmp_path / "hi.pdf"))
+        monkeypatch.delattr(PyPDF2, "PageObject")
+        streamed = open_backend("PyPDF2", str(tmp_path / "hi.pdf"), streaming=True)
+        assert streamed.page_references is None
+        assert streamed.page_count() == document.page_count() == 6
+        for index in range(document.page_count()):
+            assert streamed.page_text(index) == document.page_text(index)
+        streamed.close()
+        assert streamed.pdf_file.closed
+        document.close()
+
+    # The streamed conversion writes the same chainreport file
+    def test_streaming_conversion(self, tmp_path):
+        write_hi_pdf(str(tmp_path / "hi.pdf"), 1000)
+        ChainreportConverter("Hi", str(tmp_path / "hi.pdf"), str(tmp_path / "normal.csv")).convert()
+        ChainreportConverter("Hi", str(tmp_path / "hi.pdf"), str(tmp_path / "streamed.csv"),
+                             {"pdf_streaming": True}).convert()
+        assert (tmp_path / "normal.csv").read_bytes() == (tmp_path / "streamed.csv").read_bytes()
@@ -0,0 +1,31 @@
+from benchmarks.regression import compare
+
+BASELINE = {"rows": 1000, "parsers": {"nexo": {"normalized_rows_per_second": 1000.0,
+                                               "peak_memory_bytes": 1000}}}
+
+def current_result(normalized_rows_per_second, peak_memory_bytes):
+    return {"rows": 1000, "parsers": {"nexo": {"normalized_rows_per_second": normalized_rows_per_second,
+                                               "peak_memory_bytes": peak_memory_bytes}}}
+
+class TestRegressionCompare:
+
+    # Results within the tolerance are accepted
+    def test_within_tolerance(self):
+        assert not compare(current_result(800.0, 1150), BASELINE, 0.25, 0.2)
+
+    # A throughput loss beyond the tolerance is reported
+    def test_throughput_regression(self):
+        regressions = compare(current_result(700.0, 1000), BASELINE, 0.25, 0.2)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("nexo: normalized throughput")
+
+    # A memory growth beyond the tolerance is reported
+    def test_memory_regression(self):
+        regressions = compare(current_result(1000.0, 1300), BASELINE, 0.25, 0.2)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("nexo: peak memory")
+
+    # Parsers without baseline are ignored
+    def test_unknown_parser_is_ignored(self):
+        assert not compare({"parsers": {"new": {"normalized_rows_per_second": 1.0, "peak_memory_bytes": 1}}},
+                           BASELINE, 0.25, 0.2)
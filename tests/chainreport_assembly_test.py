@@ -0,0 +1,253 @@
+import csv
+
+import pytest
+
+from benchmarks.generators import COINBASE_CSV_HEADER, COINBASE_PREAMBLE, HI_CSV_HEADER, write_csv
+from chainreport_assembly import AssemblyEvents, TradePairer, TransactionAssembler, date_minutes, normalized_amount
+from chainreport_converter import ChainreportConverter
+from chainreport_parser.hi_parser_csv import HiParserCsv
+
+def hi_row(date, description, amount, currency, txhash='tx'):
+    if amount.startswith("-"):
+        return [date, description, '', '', amount[1:], currency, '', '', txhash]
+    return [date, description, amount, currency, '', '', '', '', txhash]
+
+def hi_leg(date, amount, currency, description='buy HI paid', txhash='tx'):
+    return HiParserCsv(dict(zip(HI_CSV_HEADER, hi_row(date, description, amount, currency, txhash))))
+
+def read_output(filename):
+    with open(filename, newline='', encoding="utf-8") as csvinput:
+        return list(csv.DictReader(csvinput, delimiter=';'))
+
+class TestTradePairer:
+
+    # The two legs of a trade are paired, independent of the order of sent and received leg
+    def test_pair_legs(self):
+        unmatched = []
+        pairer = TradePairer(unmatched.append)
+        sent = hi_leg('2023-01-01 10:00 UTC', '-10', 'USDT')
+        received = hi_leg('2023-01-01 10:00 UTC', '100', 'HI')
+        assert pairer.add(sent) is None
+        assert pairer.add(received) == (sent, received)
+        pairer.flush()
+        assert not unmatched
+
+    # Trades of the same minute are paired by their order id, without order ids in the order of arrival
+    def test_same_minute(self):
+        unmatched = []
+        pairer = TradePairer(unmatched.append)
+        first_sent = hi_leg('2023-01-01 10:00 UTC', '-10', 'USDT', txhash='a')
+        second_sent = hi_leg('2023-01-01 10:00 UTC', '-20', 'EUR', txhash='b')
+        assert pairer.add(first_sent) is None and pairer.add(second_sent) is None
+        second_received = hi_leg('2023-01-01 10:00 UTC', '200', 'BTC', txhash='b')
+        assert pairer.add(second_received) == (second_sent, second_received)
+        first_received = hi_leg('2023-01-01 10:00 UTC', '100', 'HI', txhash='a')
+        assert pairer.add(first_received) == (first_sent, first_received)
+        legs = [hi_leg('2023-01-01 10:00 UTC', amount, 'HI', txhash='') for amount in ['-1', '-2', '3']]
+        assert pairer.add(legs[0]) is None and pairer.add(legs[1]) is None
+        assert pairer.add(legs[2]) == (legs[0], legs[2])
+        pairer.flush()
+        assert unmatched == [legs[1]]
+
+    # Interleaved trades are paired by their timestamp instead of their position
+    def test_interleaved_trades(self):
+        pairer = TradePairer(None)
+        first_sent = hi_leg('2023-01-01 10:00 UTC', '-10', 'USDT')
+        second_sent = hi_leg('2023-01-01 11:00 UTC', '-20', 'USDT')
+        second_received = hi_leg('2023-01-01 11:00 UTC', '200', 'HI')
+        first_received = hi_leg('2023-01-01 10:00 UTC', '100', 'HI')
+        assert pairer.add(first_sent) is None
+        assert pairer.add(second_sent) is None
+        assert pairer.add(second_received) == (second_sent, second_received)
+        assert pairer.add(first_received) == (first_sent, first_received)
+
+    # Two legs of the same direction are no trade, both stay open
+    def test_same_direction(self):
+        unmatched = []
+        pairer = TradePairer(unmatched.append)
+        first = hi_leg('2023-01-01 10:00 UTC', '-10', 'USDT')
+        second = hi_leg('2023-01-01 10:00 UTC', '-20', 'USDT')
+        pairer.add(first)
+        assert pairer.add(second) is None
+        pairer.flush()
+        assert unmatched == [first, second]
+
+    # The oldest open leg is given up once the window is full
+    def test_window_eviction(self):
+        unmatched = []
+        pairer = TradePairer(unmatched.append, window=2)
+        legs = [hi_leg('2023-01-01 10:0' + str(minute) + ' UTC', '-10', 'USDT') for minute in range(3)]
+        for leg in legs:
+            assert pairer.add(leg) is None
+        assert unmatched == [legs[0]]
+        # The counterpart of the given up leg comes too late
+        late = hi_leg('2023-01-01 10:00 UTC', '100', 'HI')
+        assert pairer.add(late) is None
+        pairer.flush()
+        assert unmatched == [legs[0], legs[1], legs[2], late]
+
+def withdrawal(date, amount, currency):
+    return hi_leg(date, '-' + amount, currency, 'Crypto withdraw')
+
+def cancel(date, amount, currency):
+    return hi_leg(date, amount, currency, 'Crypto cancel withdraw')
+
+def deposit(date):
+    return hi_leg(date, '1', 'HI', 'Crypto deposit')
+
+def undated(line):
+    return line.parsed_record()._replace(date='')
+
+class RowBuilder:
+
+    def output_row(self, line):
+        return {'Zeitpunkt': line.get_date_string(), 'Beschreibung': line.get_description(),
+                'Anzahl': line.get_received_amount() or line.get_sent_amount()}
+
+    def trade_row(self, first, second):
+        return {'Zeitpunkt': first.get_date_string(), 'Beschreibung': first.get_description() + " + " +
+                second.get_description(), 'Anzahl': first.get_received_amount() or second.get_received_amount()}
+
+def assembler(events=None, window_minutes=60):
+    events = events or AssemblyEvents(lambda line: None, lambda line: None, lambda line: None)
+    return TransactionAssembler(HiParserCsv, RowBuilder(), events, window_minutes)
+
+def assembled_lines(lines, window_minutes=60, reverse=False):
+    return [line for _, line in assembler(window_minutes=window_minutes).assemble(lines, reverse)]
+
+class TestWithdrawalMatcher:
+
+    # The minutes of a chainreport date
+    def test_date_minutes(self):
+        assert date_minutes('02.01.2023 00:00') - date_minutes('01.01.2023 23:59') == 1
+        assert normalized_amount('-0,00') == ''
+        assert normalized_amount(' -1,50') == '1,50'
+
+    # The cancel drops the withdrawal with its currency, not the last withdrawal
+    def test_cancel_matches_currency_and_amount(self):
+        btc = withdrawal('2023-01-01 10:00 UTC', '1', 'BTC')
+        eth = withdrawal('2023-01-01 10:01 UTC', '2', 'ETH')
+        assert assembled_lines([btc, eth, cancel('2023-01-01 10:02 UTC', '1', 'BTC')]) == [eth]
+
+    # The cancel can come before the withdrawal (newest first input)
+    def test_cancel_before_withdrawal(self):
+        lines = [cancel('2023-01-01 10:02 UTC', '1', 'BTC'), withdrawal('2023-01-01 10:00 UTC', '1', 'BTC')]
+        assert not assembled_lines(lines)
+
+    # A cancel outside of the time window does not drop the withdrawal
+    def test_window(self):
+        btc = withdrawal('2023-01-01 10:00 UTC', '1', 'BTC')
+        assert assembled_lines([btc, cancel('2023-01-01 11:00 UTC', '1', 'BTC')], window_minutes=30) == [btc]
+
+    # Lines without date leave the window unchanged, an undated withdrawal or cancel only takes a waiting counterpart
+    def test_empty_date(self):
+        btc = withdrawal('2023-01-01 10:00 UTC', '1', 'BTC')
+        undated_deposit = undated(deposit('2023-01-01 10:30 UTC'))
+        undated_eth = undated(withdrawal('2023-01-01 10:30 UTC', '2', 'ETH'))
+        lines = [btc, undated_deposit, undated_eth, undated(cancel('2023-01-01 10:30 UTC', '1', 'BTC')),
+                 undated(cancel('2023-01-01 10:30 UTC', '3', 'HI'))]
+        assert assembled_lines(lines, window_minutes=30) == [undated_deposit, undated_eth]
+        assert date_minutes('') is None and date_minutes('31.02.2023 10:00') is None
+
+    # A zero amount matches any amount of the currency, other amounts do not match
+    def test_amount(self):
+        zero = withdrawal('2023-01-01 10:00 UTC', '0', 'BTC')
+        other = withdrawal('2023-01-01 10:01 UTC', '2', 'BTC')
+        assert assembled_lines([zero, other, cancel('2023-01-01 10:02 UTC', '1', 'BTC')]) == [other]
+
+class TestTransactionAssembler:
+
+    # Lines behind a waiting withdrawal keep their place, the released withdrawal is reported once it was yielded
+    def test_order_kept(self):
+        events = []
+        stage = assembler(AssemblyEvents(lambda line: events.append(("skipped", line)),
+                                         lambda line: events.append(("unmatched", line)),
+                                         lambda line: events.append(("released", line))))
+        first = deposit('2023-01-01 09:00 UTC')
+        btc = withdrawal('2023-01-01 10:00 UTC', '1', 'BTC')
+        second = deposit('2023-01-01 10:30 UTC')
+        third = deposit('2023-01-01 12:00 UTC')
+        assert [line for _, line in stage.feed(first)] == [first]
+        assert not list(stage.feed(btc))
+        assert not list(stage.feed(second))
+        # The time window passed, the withdrawal is released in front of the held line
+        items = stage.feed(third)
+        assert next(items)[1] is btc
+        assert not events
+        assert [line for _, line in items] == [second, third]
+        assert events == [("released", btc)]
+        assert not list(stage.finish())
+
+    # Skipped lines and trade legs without counterpart are reported
+    def test_events(self):
+        events = []
+        stage = assembler(AssemblyEvents(lambda line: events.append(("skipped", line)),
+                                         lambda line: events.append(("unmatched", line)),
+                                         lambda line: events.append(("released", line))))
+        skipped = hi_leg('2023-01-01 09:00 UTC', '1', 'HI', 'Vault HI daily release')
+        leg = hi_leg('2023-01-01 10:00 UTC', '-10', 'USDT')
+        assert not list(stage.assemble([skipped, leg]))
+        assert events == [("skipped", skipped), ("unmatched", leg)]
+
+    # The legs of a trade are combined in input order, also when the input is read backwards
+    @pytest.mark.parametrize("reverse", [False, True])
+    def test_trade(self, reverse):
+        paid = hi_leg('2023-01-01 10:00 UTC', '-10', 'USDT')
+        bought = hi_leg('2023-01-01 10:00 UTC', '100', 'HI', 'buy Vault HI')
+        lines = [bought, paid] if reverse else [paid, bought]
+        rows = [row for row, _ in assembler().assemble(lines, reverse)]
+        assert rows == [{'Zeitpunkt': '01.01.2023 10:00', 'Beschreibung': 'buy HI paid + buy Vault HI',
+                         'Anzahl': '100'}]
+
+class TestTradeConversion:
+
+    # A row between the two legs of a trade no longer breaks the trade
+    def test_row_between_legs(self, tmp_path):
+        write_csv(str(tmp_path / "hi.csv"), HI_CSV_HEADER, [
+            hi_row('2023-01-01 10:00 UTC', 'buy HI paid', '-10', 'USDT'),
+            hi_row('2023-01-01 10:00 UTC', 'Crypto deposit', '1', 'HI'),
+            hi_row('2023-01-01 10:00 UTC', 'buy HI paid', '100', 'HI')])
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "out.csv"))
+        converter.convert()
+        rows = read_output(str(tmp_path / "out.csv"))
+        trades = [row for row in rows if row["Transaktions Typ"] == "Trade"]
+        assert len(trades) == 1
+        assert (trades[0]["Anzahl Eingang"], trades[0]["Währung Eingang"]) == ("100", "HI")
+        assert (trades[0]["Anzahl Ausgang"], trades[0]["Währung Ausgang"]) == ("10", "USDT")
+        assert converter.statistics["errors"] == 0
+
+    # A leg without counterpart is reported as error at the end
+    def test_unmatched_leg(self, tmp_path):
+        write_csv(str(tmp_path / "hi.csv"), HI_CSV_HEADER, [
+            hi_row('2023-01-01 10:00 UTC', 'buy HI paid', '-10', 'USDT'),
+            hi_row('2023-01-01 11:00 UTC', 'buy HI paid', '100', 'HI')])
+        messages = []
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "out.csv"))
+        converter.convert(messages.append)
+        assert converter.statistics["errors"] == 2
+        assert sum("only had 1 line" in message for message in messages) == 2
+
+    # A cancelled withdrawal of another currency no longer drops the withdrawal in front of the cancel
+    def test_cancel_of_other_withdrawal(self, tmp_path):
+        write_csv(str(tmp_path / "hi.csv"), HI_CSV_HEADER, [
+            hi_row('2023-01-01 10:02 UTC', 'Crypto withdraw', '-2', 'ETH'),
+            hi_row('2023-01-01 10:01 UTC', 'Crypto cancel withdraw', '1', 'BTC'),
+            hi_row('2023-01-01 10:00 UTC', 'Crypto withdraw', '-1', 'BTC')])
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "out.csv"))
+        converter.convert()
+        rows = read_output(str(tmp_path / "out.csv"))
+        assert [(row["Anzahl Ausgang"], row["Währung Ausgang"]) for row in rows] == [("2", "ETH")]
+
+    # Coinbase has no cancel transaction, its withdrawals are written in the order of the input (the converter held
+    # a withdrawal back until the next withdrawal or the end of the input before)
+    def test_coinbase_withdrawal_order(self, tmp_path):
+        write_csv(str(tmp_path / "coinbase.csv"), COINBASE_CSV_HEADER, [
+            ['1', '2023-01-01 10:00:00 UTC', 'Send', 'BTC', '1', 'EUR', '20000', '20000', '20000', '0', ''],
+            ['2', '2023-01-01 11:00:00 UTC', 'Staking Income', 'ETH', '2', 'EUR', '1000', '2000', '2000', '0', ''],
+            ['3', '2023-01-01 12:00:00 UTC', 'Send', 'SOL', '3', 'EUR', '10', '30', '30', '0', ''],
+            ['4', '2023-01-01 13:00:00 UTC', 'Receive', 'ADA', '4', 'EUR', '1', '4', '4', '0', '']],
+                  preamble=COINBASE_PREAMBLE)
+        converter = ChainreportConverter("Coinbase", str(tmp_path / "coinbase.csv"), str(tmp_path / "out.csv"))
+        converter.convert()
+        rows = read_output(str(tmp_path / "out.csv"))
+        assert [row["Transaktions Typ"] for row in rows] == ["Withdrawal", "Staking", "Withdrawal", "Other_Income"]
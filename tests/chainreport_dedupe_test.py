@@ -0,0 +1,80 @@
+import sqlite3
+
+import pytest
+
+from benchmarks.generators import NEXO_CSV_HEADER, nexo_csv_rows, write_csv
+from chainreport_converter import ChainreportConverter
+from chainreport_dedupe import BloomFilter, DedupeIndex, row_key
+
+class TestBloomFilter:
+
+    # Added keys are always found, the false positive rate stays close to the configured rate
+    def test_added_keys_are_found(self):
+        bloom_filter = BloomFilter.for_capacity(1000, 0.01)
+        for index in range(1000):
+            bloom_filter.add(str(index).encode())
+        assert all(str(index).encode() in bloom_filter for index in range(1000))
+        false_positives = sum(str(index).encode() in bloom_filter for index in range(1000, 11000))
+        assert false_positives < 300
+
+class TestDedupeIndex:
+
+    # Keys are new only once, also after reopening the index and growing the bloom filter
+    def test_add_detects_duplicates(self, tmp_path):
+        index = DedupeIndex(str(tmp_path / "account.index"), capacity=10)
+        assert all(index.add(str(key).encode()) for key in range(50))
+        assert not index.add(b"3")
+        index.close()
+        index = DedupeIndex(str(tmp_path / "account.index"))
+        assert not index.add(b"49")
+        assert index.add(b"50")
+        index.close()
+
+    # Rows with order id are identified by the order id, other rows by their content
+    def test_row_key(self):
+        values = ["01.01.2024 10:00", "Deposit", "1", "BTC", "", "", "", "", "", "Crypto deposit"]
+        assert row_key("abc", values) == row_key("abc", values[:8] + ["x"] * 2)
+        assert row_key("", values) != row_key("", values[:4] + ["x"] * 6)
+
+    # Send-only rows of the same order and minute are distinct, if their sent amounts or fees differ
+    def test_send_only_rows(self):
+        withdrawal = ["01.01.2024 10:00", "Withdrawal", "", "", "1", "BTC", "0,1", "BTC", "abc", "Withdrawal"]
+        fee = ["01.01.2024 10:00", "Withdrawal", "", "", "0,5", "BTC", "", "", "abc", "Withdrawal"]
+        assert row_key("abc", withdrawal) != row_key("abc", fee)
+        assert row_key("abc", withdrawal) != row_key("abc", withdrawal[:6] + ["0,2", "BTC"] + withdrawal[8:])
+
+    # Rows of overlapping exports are written only once
+    def test_overlapping_exports(self, tmp_path):
+        rows = list(nexo_csv_rows(300))
+        write_csv(str(tmp_path / "first.csv"), NEXO_CSV_HEADER, rows[:200])
+        write_csv(str(tmp_path / "second.csv"), NEXO_CSV_HEADER, rows[100:])
+        written = 0
+        for name in ["first", "second"]:
+            converter = ChainreportConverter("Nexo", str(tmp_path / (name + ".csv")),
+                                             str(tmp_path / (name + ".out.csv")),
+                                             {"dedupe_index": str(tmp_path / "nexo.index")})
+            converter.convert()
+            written += converter.statistics["output_linecount"]
+        write_csv(str(tmp_path / "all.csv"), NEXO_CSV_HEADER, rows)
+        converter = ChainreportConverter("Nexo", str(tmp_path / "all.csv"), str(tmp_path / "all.out.csv"))
+        converter.convert()
+        assert written == converter.statistics["output_linecount"]
+
+    # A failed conversion closes the index without keeping its keys, the next conversion writes all rows again
+    def test_failed_conversion(self, tmp_path):
+        write_csv(str(tmp_path / "nexo.csv"), NEXO_CSV_HEADER, nexo_csv_rows(100))
+        options = {"dedupe_index": str(tmp_path / "nexo.index")}
+        converter = ChainreportConverter("Nexo", str(tmp_path / "nexo.csv"), str(tmp_path / "out.csv"), options)
+        original_write_rows = converter.write_rows
+        def failing_write_rows(csv_writer, items, events):
+            original_write_rows(csv_writer, items, events)
+            raise OSError("disk full")
+        converter.write_rows = failing_write_rows
+        with pytest.raises(OSError):
+            converter.convert()
+        with pytest.raises(sqlite3.ProgrammingError):
+            converter.dedupe_index.add(b"key")
+        retry = ChainreportConverter("Nexo", str(tmp_path / "nexo.csv"), str(tmp_path / "out.csv"), options)
+        retry.convert()
+        assert retry.statistics["duplicates"] == 0
+        assert retry.statistics["output_linecount"] == converter.statistics["output_linecount"] > 0
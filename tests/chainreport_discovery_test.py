@@ -0,0 +1,63 @@
+import json
+
+from benchmarks.generators import HI_CSV_HEADER, write_csv
+from chainreport_converter import ChainreportConverter
+from chainreport_discovery import UnknownDescriptions
+
+class TestUnknownDescriptions:
+
+    # Occurrences are counted per description with the earliest and latest date, also for unordered input
+    def test_counts_and_dates(self):
+        report = UnknownDescriptions()
+        for line, date_string in enumerate(['05.01.2023 10:00', '01.02.2022 09:00', '31.12.2023 23:59']):
+            report.add('Crypto airdrop', date_string, line, {"line": line})
+        report.add('Card cashback', '01.01.2023 10:00', 3, {"line": 3})
+        result = report.as_dict()
+        assert list(result) == ['Crypto airdrop', 'Card cashback']
+        assert (result['Crypto airdrop']["count"], result['Crypto airdrop']["first"],
+                result['Crypto airdrop']["last"]) == (3, '01.02.2022 09:00', '31.12.2023 23:59')
+        assert result['Card cashback']["samples"] == [{"line": 3, "input": "{'line': 3}"}]
+        json.dumps(result)
+
+    # The reservoir keeps sample_size samples, all occurrences have the same chance
+    def test_reservoir_sampling(self):
+        chosen = [0] * 20
+        for seed in range(500):
+            report = UnknownDescriptions(sample_size=2, seed=seed)
+            for line in range(20):
+                report.add('Crypto airdrop', '01.01.2023 10:00', line, line)
+            samples = report.groups['Crypto airdrop']["samples"]
+            assert len(samples) == 2
+            for line, _ in samples:
+                chosen[line] += 1
+        assert min(chosen) > 20 and max(chosen) < 90
+
+    # The summary lists the most frequent descriptions only
+    def test_summary(self):
+        report = UnknownDescriptions()
+        for index in range(30):
+            for line in range(index + 1):
+                report.add('description ' + str(index), '01.01.2023 10:00', line, line)
+        lines = report.summary(logged_descriptions=2).split("\n")
+        assert lines[0] == "Unknown descriptions (30) - Please report them:"
+        assert lines[1] == "'description 29': 30 lines from 01.01.2023 10:00 to 01.01.2023 10:00"
+        assert lines[-1] == "... and 28 more descriptions"
+        assert len(lines) == 1 + 2 * 4 + 1
+
+class TestConverterDiscovery:
+
+    # Many rows of an unknown description give one log message and a report in the statistics
+    def test_convert(self, tmp_path):
+        rows = [['2023-01-' + str(day % 28 + 1).zfill(2) + ' 10:00 UTC', 'Crypto airdrop', '1', 'HI', '', '', '', '',
+                 'tx' + str(day)] for day in range(1000)]
+        write_csv(str(tmp_path / "hi.csv"), HI_CSV_HEADER, rows)
+        messages = []
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "out.csv"))
+        converter.convert(messages.append)
+        assert converter.statistics["errors"] == 1000
+        report = converter.statistics["unknown_descriptions"]
+        assert list(report) == ['Crypto airdrop']
+        assert (report['Crypto airdrop']["count"], report['Crypto airdrop']["first"],
+                report['Crypto airdrop']["last"]) == (1000, '01.01.2023 10:00', '28.01.2023 10:00')
+        assert len(report['Crypto airdrop']["samples"]) == 3
+        assert sum("Crypto airdrop" in message for message in messages) == 1
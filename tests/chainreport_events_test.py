@@ -0,0 +1,70 @@
+import json
+
+from benchmarks.generators import HI_CSV_HEADER, write_csv
+from chainreport_converter import ChainreportConverter
+from chainreport_events import EventLog
+from chainreport_parser.hi_parser_csv import HiParserCsv
+
+def hi_row(date, description, amount, currency):
+    return [date, description, amount, currency, '', '', '', '', 'tx']
+
+def hi_line(day):
+    return HiParserCsv(dict(zip(HI_CSV_HEADER, hi_row('2023-01-' + str(day).zfill(2) + ' 10:00 UTC',
+                                                      'buy HI paid', '-10', 'USDT'))))
+
+class TestEventLog:
+
+    # The first events of a category are logged, the others are counted and sampled
+    def test_limit(self):
+        messages = []
+        events = EventLog(messages.append, limit=2)
+        for day in range(1, 11):
+            events.event("unmatched_leg", day, "A multi-line transaction only had 1 line", hi_line(day))
+        events.event("zero_amount", 11, "The amount is 0 in the export file.", hi_line(11))
+        assert [message.split("\n")[0] for message in messages] == [
+            "Please fix the line 1. A multi-line transaction only had 1 line",
+            "Please fix the line 2. A multi-line transaction only had 1 line",
+            "Further 'unmatched_leg' events are only counted, see the summary",
+            "Please fix the line 11. The amount is 0 in the export file."]
+        result = events.as_dict()
+        assert (result["unmatched_leg"]["count"], result["unmatched_leg"]["first"],
+                result["unmatched_leg"]["last"]) == (10, '01.01.2023 10:00', '10.01.2023 10:00')
+        summary = events.summary().split("\n")
+        assert summary[1] == "unmatched_leg: 10 lines from 01.01.2023 10:00 to 10.01.2023 10:00"
+        assert summary[-1] == "zero_amount: 1 lines from 11.01.2023 10:00 to 11.01.2023 10:00"
+        assert len(summary) == 1 + 1 + 3 + 1
+
+    # The error file gets every event, also the ones only written
+    def test_error_file(self, tmp_path):
+        events = EventLog(None, limit=1, error_filename=str(tmp_path / "errors.jsonl"))
+        for day in range(1, 6):
+            events.event("unmatched_leg", day, "A multi-line transaction only had 1 line", hi_line(day))
+        events.write("unknown_description", 6, "The description is unknown.", hi_line(6))
+        events.close()
+        with open(tmp_path / "errors.jsonl", encoding="utf-8") as error_input:
+            written = [json.loads(line) for line in error_input]
+        assert [event["category"] for event in written] == ["unmatched_leg"] * 5 + ["unknown_description"]
+        assert written[0]["line"] == 1 and written[0]["date"] == '01.01.2023 10:00'
+        assert "buy HI paid" in written[0]["input"]
+        assert events.as_dict()["unmatched_leg"]["count"] == 5
+
+class TestConverterEvents:
+
+    # Unmatched legs are logged up to the limit and summarized at the end, the error file gets all of them
+    def test_convert(self, tmp_path):
+        rows = [hi_row('2023-01-01 ' + str(hour).zfill(2) + ':00 UTC', 'buy HI paid', '-10', 'USDT')
+                for hour in range(20)]
+        rows.append(hi_row('2023-01-02 10:00 UTC', 'Crypto airdrop', '1', 'HI'))
+        write_csv(str(tmp_path / "hi.csv"), HI_CSV_HEADER, rows)
+        messages = []
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "out.csv"),
+                                         {"log_limit": 3, "error_file": str(tmp_path / "errors.jsonl")})
+        converter.convert(messages.append)
+        assert converter.statistics["errors"] == 21
+        assert converter.statistics["events"]["unmatched_leg"]["count"] == 20
+        assert sum("only had 1 line" in message for message in messages) == 3
+        assert sum(message.startswith("Errors and warnings per category:") for message in messages) == 1
+        with open(tmp_path / "errors.jsonl", encoding="utf-8") as error_input:
+            categories = [json.loads(line)["category"] for line in error_input]
+        assert sorted(set(categories)) == ["unknown_description", "unmatched_leg"]
+        assert len(categories) == 21
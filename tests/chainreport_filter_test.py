@@ -0,0 +1,97 @@
+import csv
+
+import pytest
+
+from benchmarks.generators import COINBASE_CSV_HEADER, COINBASE_PREAMBLE, EXPORTS, write_csv
+from chainreport_converter import ChainreportConverter
+from chainreport_filter import build_row_filter, in_date_range, parse_currencies, parse_date_bound
+from chainreport_incremental import sortable_date
+from chainreport_parser.hi_parser_csv import HiParserCsv
+from chainreport_parser.hi_parser_pdf import HiParserPdf
+
+def read_output(filename):
+    with open(filename, newline='', encoding="utf-8") as csvinput:
+        return list(csv.DictReader(csvinput, delimiter=';'))
+
+def row_currencies(row):
+    return {row["Währung Eingang"], row["Währung Ausgang"], row["Währung Transaktionsgebühr"]}
+
+class TestRowFilter:
+
+    # Date bounds are compared as prefixes, so a year or a month can be used as bound
+    def test_in_date_range(self):
+        assert in_date_range("2023-01-01 00:00 UTC", "2023", "2023")
+        assert in_date_range("2023-12-31T23:59:00.000Z", "2023-12", "2023-12-31")
+        assert not in_date_range("2022-12-31 23:59:59", "2023", None)
+        assert not in_date_range("2024-01-01 00:00:00", None, "2023")
+        with pytest.raises(ValueError):
+            parse_date_bound("31.12.2023")
+        assert parse_currencies("btc, eth,") == {"BTC", "ETH"}
+
+    # Pdf records are filtered by date and currency, the trade legs pass the currency filter
+    def test_pdf_record_filter(self):
+        accepts = build_row_filter(None, "pdf", {"date_from": "2023", "date_to": None, "currencies": {"BTC"}},
+                                   ["buy HI paid"])
+        assert accepts(HiParserPdf.parse_line("2023-05-01 10:00 UTC Crypto deposit 0.5 BTC"))
+        assert not accepts(HiParserPdf.parse_line("2022-05-01 10:00 UTC Crypto deposit 0.5 BTC"))
+        assert not accepts(HiParserPdf.parse_line("2023-05-01 10:00 UTC HI rebate 1.5 HI"))
+        assert accepts(HiParserPdf.parse_line("2023-05-01 10:00 UTC buy HI paid -10 USDT"))
+
+class TestConverterFilter:
+
+    # The filtered conversion writes exactly the rows of the full conversion inside the filter
+    @pytest.mark.parametrize("name", EXPORTS)
+    def test_filtered_conversion(self, tmp_path, name):
+        parsertype, extension, writer = EXPORTS[name]
+        input_file = str(tmp_path / ("input" + extension))
+        writer(input_file, 2000)
+        ChainreportConverter(parsertype, input_file, str(tmp_path / "full.csv")).convert()
+        full = read_output(str(tmp_path / "full.csv"))
+        currency = sorted(row_currencies(full[len(full) // 2]) - {""})[0]
+        date = sortable_date(full[len(full) // 2]["Zeitpunkt"])
+        options = {"date_from": date[:7], "date_to": date[:10], "currencies": {currency}}
+        converter = ChainreportConverter(parsertype, input_file, str(tmp_path / "filtered.csv"), options)
+        converter.convert()
+        expected = [row for row in full if in_date_range(sortable_date(row["Zeitpunkt"]), date[:7], date[:10])
+                    and currency in row_currencies(row)]
+        assert expected
+        # Pending withdrawals are written when the next withdrawal comes, so only the set of rows is equal
+        assert sorted(read_output(str(tmp_path / "filtered.csv")), key=lambda row: tuple(row.values())) == sorted(
+            expected, key=lambda row: tuple(row.values()))
+        assert converter.statistics["filtered"] > 0
+
+    # Rows outside of the date range are not parsed
+    def test_no_parser_objects_for_filtered_rows(self, tmp_path, monkeypatch):
+        EXPORTS["hi-csv"][2](str(tmp_path / "hi.csv"), 2000)
+        created = []
+        original_bind_schema = HiParserCsv.bind_schema
+
+        def counting_bind_schema(fieldnames):
+            parse_batch = original_bind_schema(fieldnames)
+
+            def counting_parse_batch(rows):
+                created.extend(rows)
+                return parse_batch(rows)
+            return counting_parse_batch
+        monkeypatch.setattr(HiParserCsv, "bind_schema", counting_bind_schema)
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "out.csv"),
+                                         {"date_from": "2024-12-20", "date_to": "2024-12-20"})
+        converter.convert()
+        assert created
+        assert all(row["Date"].startswith("2024-12-20") for row in created)
+        assert converter.statistics["filtered"] + len(created) == 2000
+
+    # Older Coinbase exports have the price currency in the 'Spot Price Currency' column
+    def test_coinbase_spot_price_currency(self, tmp_path):
+        header = ['Spot Price Currency' if column == 'Price Currency' else column
+                  for column in COINBASE_CSV_HEADER if column != 'ID']
+        write_csv(str(tmp_path / "coinbase.csv"), header, [
+            ['2023-01-01 10:00:00 UTC', 'Buy', 'BTC', '1', 'EUR', '20000', '20000', '20010', '10', ''],
+            ['2023-01-01 11:00:00 UTC', 'Staking Income', 'ETH', '2', 'EUR', '1000', '2000', '2000', '0', '']],
+                  preamble=COINBASE_PREAMBLE)
+        converter = ChainreportConverter("Coinbase", str(tmp_path / "coinbase.csv"), str(tmp_path / "out.csv"),
+                                         {"currencies": {"EUR"}})
+        converter.convert()
+        rows = read_output(str(tmp_path / "out.csv"))
+        assert [row["Transaktions Typ"] for row in rows] == ["Trade", "Staking"]
+        assert all("EUR" in row_currencies(row) for row in rows)
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+from benchmarks.generators import (COINBASE_CSV_HEADER, COINBASE_PREAMBLE, HI_CSV_HEADER,
+                                   coinbase_csv_rows, hi_csv_rows, write_csv)
+from chainreport_converter import ChainreportConverter
+from chainreport_incremental import IncrementalState, sortable_date
+
+def convert(parsertype, input_file, output_file, incremental=True):
+    converter = ChainreportConverter(parsertype, str(input_file), str(output_file), {"incremental": incremental})
+    converter.convert()
+    return converter.statistics
+
+class TestIncrementalConversion:
+
+    # Rows appended to the export are converted without reading the known prefix again
+    def test_appended_rows_skip_the_known_prefix(self, tmp_path):
+        rows = list(coinbase_csv_rows(100))
+        input_file, output_file = tmp_path / "coinbase.csv", tmp_path / "chainreport.csv"
+        write_csv(str(input_file), COINBASE_CSV_HEADER, rows[:60], preamble=COINBASE_PREAMBLE)
+        assert convert("Coinbase", input_file, output_file)["output_linecount"] == 60
+        write_csv(str(input_file), COINBASE_CSV_HEADER, rows, preamble=COINBASE_PREAMBLE)
+        statistics = convert("Coinbase", input_file, output_file)
+        assert statistics["input_linecount"] == 40
+        assert statistics["resumed_at_byte"] > 0
+        convert("Coinbase", input_file, tmp_path / "full.csv", incremental=False)
+        # Pending withdrawals are written at the end of each run, so only the order may differ
+        assert (sorted(output_file.read_text(encoding="utf-8").splitlines()) ==
+                sorted((tmp_path / "full.csv").read_text(encoding="utf-8").splitlines()))
+
+    # New rows at the top of a newest-first export are found via the newest known timestamp
+    def test_prepended_rows_are_filtered_by_timestamp(self, tmp_path):
+        rows = list(hi_csv_rows(200))
+        input_file, output_file = tmp_path / "hi.csv", tmp_path / "chainreport.csv"
+        write_csv(str(input_file), HI_CSV_HEADER, rows[50:])
+        convert("Hi", input_file, output_file)
+        write_csv(str(input_file), HI_CSV_HEADER, rows)
+        statistics = convert("Hi", input_file, output_file)
+        assert statistics["already_converted"] > 0
+        assert "resumed_at_byte" not in statistics
+        convert("Hi", input_file, tmp_path / "full.csv", incremental=False)
+        assert (sorted(output_file.read_text(encoding="utf-8").splitlines()) ==
+                sorted((tmp_path / "full.csv").read_text(encoding="utf-8").splitlines()))
+
+    # An unchanged export does not add any rows
+    def test_unchanged_export_adds_nothing(self, tmp_path):
+        input_file, output_file = tmp_path / "hi.csv", tmp_path / "chainreport.csv"
+        write_csv(str(input_file), HI_CSV_HEADER, hi_csv_rows(50))
+        convert("Hi", input_file, output_file)
+        content = output_file.read_text(encoding="utf-8")
+        assert convert("Hi", input_file, output_file)["output_linecount"] == 0
+        assert output_file.read_text(encoding="utf-8") == content
+
+    # Rows dropped by the currency filter do not advance the newest converted transaction
+    def test_filtered_rows_keep_the_state(self, tmp_path):
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "chainreport.csv"),
+                                         {"currencies": {"BTC"}})
+        converter.incremental_state = IncrementalState(str(tmp_path / "state.json"), "HiParserCsv")
+        written = []
+        writer = SimpleNamespace(writerow=written.append)
+        row = dict.fromkeys(ChainreportConverter.FIELDNAMES_CR, "")
+        btc_row = dict(row, **{"Zeitpunkt": "01.01.2024 10:00", "Währung Eingang": "BTC"})
+        eth_row = dict(row, **{"Zeitpunkt": "02.01.2024 10:00", "Währung Eingang": "ETH"})
+        assert converter.write_output_row(writer, btc_row)
+        assert not converter.write_output_row(writer, eth_row)
+        assert written == [btc_row]
+        assert converter.incremental_state.data["last_timestamp"] == "2024-01-01 10:00"
+
+class TestIncrementalState:
+
+    # The chainreport date is converted into a sortable date
+    def test_sortable_date(self):
+        assert sortable_date("31.12.2023 23:59") == "2023-12-31 23:59"
+
+    # Transactions in the minute of the newest known transaction are identified by the order id
+    def test_is_new_with_same_timestamp(self, tmp_path):
+        state = IncrementalState(str(tmp_path / "state.json"), "HiParserCsv",
+                                 {"last_timestamp": "2023-12-31 23:59", "last_order_ids": ["a"]})
+        assert state.is_new("01.01.2024 00:00", "")
+        assert not state.is_new("30.12.2023 10:00", "b")
+        assert not state.is_new("31.12.2023 23:59", "a")
+        assert not state.is_new("31.12.2023 23:59", "")
+        assert state.is_new("31.12.2023 23:59", "b")
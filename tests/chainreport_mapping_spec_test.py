@@ -0,0 +1,94 @@
+import pytest
+
+from benchmarks.generators import HI_CSV_HEADER, hi_csv_rows
+from chainreport_parser.hi_parser_csv import HiParserCsv
+from chainreport_parser import mapping_spec
+from chainreport_parser.mapping_spec import compile_spec, spec_parser
+
+# Exchange described by its spec only: signed amounts in one column, trades in one row
+EXAMPLE_SPEC = {
+    "date": ('time', '%Y-%m-%d %H:%M:%S'),
+    "type_column": 'kind',
+    "case": "lower",
+    "skip": ['internal transfer'],
+    "types": [('Deposit', ['deposit']), ('Trade', ['swap']), ('Withdrawal', ['payout'])],
+    "fields": {"received_amount": 'amount', "received_currency": 'coin',
+               "fee_amount": 'fee', "fee_currency": {"constant": "EUR"},
+               "order_id": ('tx', 'reference'), "description": 'kind'},
+    "type_fields": {'Trade': {"sent_amount": 'paid', "sent_currency": 'paid coin'},
+                    'Withdrawal': {"received_amount": None, "received_currency": None,
+                                   "sent_amount": {"column": 'amount', "prefix": "-"}, "sent_currency": 'coin'}},
+    "optional": ['fee'],
+    "strip_values": True,
+    "decimal": (".", ","),
+    "delimiter": ";",
+    "withdrawals": ['payout'],
+}
+EXAMPLE_HEADER = ['time', 'kind', 'amount', 'coin', 'paid', 'paid coin', 'reference']
+
+def example_row(kind, amount, coin, paid="", paid_coin=""):
+    return dict(zip(EXAMPLE_HEADER, ['2023-01-01 10:00:00', kind, amount, coin, paid, paid_coin, ' ref ']))
+
+class TestCompileSpec:
+
+    # The rules of the transaction type replace the default rules, optional columns missing in the header are empty
+    def test_record_values(self):
+        parse = compile_spec(EXAMPLE_SPEC, EXAMPLE_HEADER, None)
+        deposit, swap, payout, unknown = parse([example_row('Deposit', ' 1.5', 'BTC'),
+                                                example_row('swap', '2', 'ETH', '3000.25', 'USDT'),
+                                                example_row('payout', '0.5', 'BTC'),
+                                                example_row('airdrop', '1', 'HI')])
+        assert deposit[1:] == (False, '01.01.2023 10:00', 'Deposit', '1,5', 'BTC', '', '', '', 'EUR', 'ref',
+                               'Deposit')
+        assert (swap.get_transaction_type(), swap.get_sent_amount(), swap.get_sent_currency()) == (
+            'Trade', '3000,25', 'USDT')
+        assert (payout.get_received_amount(), payout.get_sent_amount(), payout.get_sent_currency()) == (
+            '', '-0,5', 'BTC')
+        assert unknown.get_transaction_type() == 'ERROR'
+
+    # Skipped rows only carry their description, rows with missing values take the fallback
+    def test_skip_and_fallback(self):
+        parse = compile_spec(EXAMPLE_SPEC, EXAMPLE_HEADER, lambda row: "fallback")
+        short_row = dict(example_row('deposit', '1', 'BTC'), coin=None)
+        skipped, fallback = parse([example_row('internal transfer', '1', 'BTC'), short_row])
+        assert skipped.check_if_skip_line()
+        assert skipped.get_description() == 'internal transfer'
+        assert fallback == "fallback"
+
+    # The compiled spec of the Hi parser gives the values of its getters
+    def test_hi_spec(self):
+        rows = [dict(zip(HI_CSV_HEADER, row)) for row in hi_csv_rows(300)]
+        records = compile_spec(HiParserCsv.SPEC, HI_CSV_HEADER, None)(rows)
+        assert records == [HiParserCsv(row).parsed_record() for row in rows]
+
+class TestSpecParser:
+
+    # A parser class is created from the spec, its objects use the compiled spec
+    def test_parser_class(self):
+        parser = spec_parser("ExampleParserCsv", EXAMPLE_SPEC)
+        assert (parser.NAME, parser.DELIMITER, parser.DATE_FIELD, parser.DESCRIPTION_FIELD) == (
+            "ExampleParserCsv", ";", 'time', 'kind')
+        assert parser.WITHDRAWTRANSACTION == ['payout'] and not parser.TWO_LINE_TRADES
+        line = parser(example_row('payout', '0.5', 'BTC'))
+        assert (line.get_date_string(), line.get_transaction_type(), line.get_sent_amount()) == (
+            '01.01.2023 10:00', 'Withdrawal', '-0,5')
+        assert parser.bind_schema(EXAMPLE_HEADER)([example_row('payout', '0.5', 'BTC')]) == [line.record]
+
+    # Rows with missing values are reported
+    def test_missing_value(self):
+        parser = spec_parser("ExampleParserCsv", EXAMPLE_SPEC)
+        with pytest.raises(KeyError):
+            parser(dict(example_row('deposit', '1', 'BTC'), amount=None))
+
+    # Single rows compile the spec once per header
+    def test_single_rows(self, monkeypatch):
+        parser = spec_parser("ExampleParserCsv", EXAMPLE_SPEC)
+        compiled = []
+        def counting_compile_spec(*arguments):
+            compiled.append(arguments[1])
+            return compile_spec(*arguments)
+        monkeypatch.setattr(mapping_spec, "compile_spec", counting_compile_spec)
+        lines = [parser(example_row('deposit', str(amount), 'BTC')) for amount in range(1, 4)]
+        assert [line.get_received_amount() for line in lines] == ['1', '2', '3']
+        parser(dict(example_row('deposit', '1', 'BTC'), fee='0.1'))
+        assert compiled == [EXAMPLE_HEADER, EXAMPLE_HEADER + ['fee']]
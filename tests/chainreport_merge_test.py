@@ -0,0 +1,37 @@
+import csv
+
+import pytest
+
+from chainreport_converter import ChainreportConverter
+from chainreport_merge import merge_chainreport_files, merge_rows, read_chainreport_file
+
+def write_chainreport(filename, dates):
+    with open(filename, 'w', newline='', encoding="utf-8") as csvoutput:
+        writer = csv.DictWriter(csvoutput, delimiter=';', fieldnames=ChainreportConverter.FIELDNAMES_CR)
+        writer.writeheader()
+        for index, date in enumerate(dates):
+            writer.writerow({ChainreportConverter.DATESTRING_CR: date,
+                             ChainreportConverter.TRANSACTIONTYP_CR: "Deposit",
+                             ChainreportConverter.DESCRIPTION_CR: f"row {index}"})
+
+class TestMerge:
+
+    # Ascending and descending files are merged into one ascending file tagged with the account
+    def test_merge_files(self, tmp_path):
+        write_chainreport(str(tmp_path / "a.csv"), ["01.01.2023 10:00", "05.02.2023 09:00", "01.01.2024 00:00"])
+        write_chainreport(str(tmp_path / "b.csv"), ["31.12.2023 23:59", "01.02.2023 12:00", "01.01.2023 10:00"])
+        row_count = merge_chainreport_files({"A": str(tmp_path / "a.csv"), "B": str(tmp_path / "b.csv")},
+                                            str(tmp_path / "merged.csv"))
+        assert row_count == 6
+        rows = list(read_chainreport_file(str(tmp_path / "merged.csv")))
+        assert [(row["Zeitpunkt"], row["Beschreibung"]) for row in rows] == [
+            ("01.01.2023 10:00", "[A] row 0"), ("01.01.2023 10:00", "[B] row 2"),
+            ("01.02.2023 12:00", "[B] row 1"), ("05.02.2023 09:00", "[A] row 1"),
+            ("31.12.2023 23:59", "[B] row 0"), ("01.01.2024 00:00", "[A] row 2")]
+
+    # Unordered input is rejected instead of silently producing an unordered result
+    def test_unordered_stream(self):
+        rows = [{"Zeitpunkt": "02.01.2023 10:00", "Beschreibung": ""},
+                {"Zeitpunkt": "01.01.2023 10:00", "Beschreibung": ""}]
+        with pytest.raises(ValueError):
+            list(merge_rows({"A": rows}))
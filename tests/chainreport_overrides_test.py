@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.generators import HI_CSV_HEADER, write_csv
+from chainreport_converter import ChainreportConverter
+from chainreport_overrides import DescriptionOverrides, parse_overrides, reloading_batch_parser
+from chainreport_parser.hi_parser_csv import HiParserCsv
+
+def hi_row(description):
+    return dict(zip(HI_CSV_HEADER, ['2023-01-01 10:00 UTC', description, '1', 'HI', '', '', '', '', 'tx']))
+
+def write_overrides(filename, overrides):
+    with open(filename, "w", encoding="utf-8") as overrides_output:
+        json.dump(overrides, overrides_output)
+
+class TestParseOverrides:
+
+    # Types map descriptions to transaction types, skip lists descriptions
+    def test_valid(self):
+        text = '{"HiParserCsv": {"types": {"Crypto airdrop": "Airdrop"}, "skip": ["Crypto deposit"]}}'
+        assert parse_overrides(text) == {"HiParserCsv": {"types": {"Crypto airdrop": "Airdrop"},
+                                                         "skip": ["Crypto deposit"]}}
+
+    # Anything else is reported as ValueError
+    @pytest.mark.parametrize("text", ['[]', '{"HiParserCsv": []}', '{"HiParserCsv": {"other": {}}}',
+                                      '{"HiParserCsv": {"types": {"Crypto airdrop": 1}}}',
+                                      '{"HiParserCsv": {"skip": "Crypto deposit"}}', '{"HiParserCsv": '])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_overrides(text)
+
+class TestDescriptionOverrides:
+
+    # A changed file replaces the overrides, an invalid file keeps them and records the error
+    def test_reload(self, tmp_path):
+        filename = str(tmp_path / "overrides.json")
+        write_overrides(filename, {"HiParserCsv": {"skip": ["Crypto deposit"]}})
+        overrides = DescriptionOverrides(filename, check_interval=0)
+        version, current = overrides.current()
+        assert current == {"HiParserCsv": {"skip": ["Crypto deposit"]}}
+        assert overrides.current()[0] == version
+
+        write_overrides(filename, {"HiParserCsv": {"types": {"Crypto airdrop": "Airdrop"}}})
+        version, current = overrides.current()
+        assert current == {"HiParserCsv": {"types": {"Crypto airdrop": "Airdrop"}}}
+
+        with open(filename, "w", encoding="utf-8") as overrides_output:
+            overrides_output.write('{"HiParserCsv": ')
+        assert overrides.current() == (version, current)
+        assert overrides.error.startswith(filename)
+
+        os.remove(filename)
+        assert overrides.current() == (version, current)
+        assert overrides.error is not None
+
+    # The first load fails on a missing file
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(OSError):
+            DescriptionOverrides(str(tmp_path / "missing.json"))
+
+    # The batch parser is bound again with the merged lookups, once per version of the file
+    def test_reloading_batch_parser(self, tmp_path):
+        filename = str(tmp_path / "overrides.json")
+        write_overrides(filename, {})
+        overrides = DescriptionOverrides(filename, check_interval=0)
+        parse = reloading_batch_parser(HiParserCsv, HI_CSV_HEADER, overrides)
+        rows = [hi_row('Crypto airdrop'), hi_row('Crypto deposit'), hi_row('Vault HI daily release')]
+        assert [record.get_transaction_type() for record in parse(rows)] == ['ERROR', 'Deposit', '']
+
+        write_overrides(filename, {"HiParserCsv": {"types": {"Crypto airdrop": "Airdrop",
+                                                             "Vault HI daily release": "Staking"},
+                                                   "skip": ["Crypto deposit"]}})
+        airdrop, deposit, release = parse(rows)
+        assert (airdrop.get_transaction_type(), release.get_transaction_type()) == ('Airdrop', 'Staking')
+        assert deposit.check_if_skip_line()
+
+class TestConverterOverrides:
+
+    # Descriptions unknown to the parser are converted with the overrides file
+    def test_convert(self, tmp_path):
+        rows = [['2023-01-01 10:00 UTC', 'Crypto airdrop', '1', 'HI', '', '', '', '', 'tx']]
+        write_csv(str(tmp_path / "hi.csv"), HI_CSV_HEADER, rows)
+        filename = str(tmp_path / "overrides.json")
+        write_overrides(filename, {"HiParserCsv": {"types": {"Crypto airdrop": "Airdrop"}}})
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "out.csv"),
+                                         {"description_overrides": filename})
+        converter.convert()
+        assert converter.statistics["errors"] == 0
+        assert converter.statistics["overrides_error"] is None
+        with open(tmp_path / "out.csv", encoding="utf-8") as output:
+            assert ";Airdrop;1;HI;" in output.read()
@@ -0,0 +1,61 @@
+import csv
+
+import pytest
+
+from benchmarks.generators import write_hi_pdf
+from chainreport_converter import ChainreportConverter
+from chainreport_page_search import PageDates, find_page_span
+
+def make_pages(days, descending):
+    # One page per day with three transactions, a cover page in front and a summary page at the end
+    pages = ["Statement"]
+    for day in (reversed(days) if descending else days):
+        lines = [f"2023-{day} {hour:02d}:00 UTC HI rebate 1 HI" for hour in (8, 12, 16)]
+        pages.append("Header\n" + "\n".join(reversed(lines) if descending else lines))
+    pages.append("Summary")
+    return pages
+
+def read_output(filename):
+    with open(filename, newline='', encoding="utf-8") as csvinput:
+        return list(csv.DictReader(csvinput, delimiter=';'))
+
+class TestFindPageSpan:
+
+    # The span holds exactly the pages of the range, only a few pages are extracted
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_span(self, descending):
+        days = [f"{month:02d}-{day:02d}" for month in range(1, 13) for day in range(1, 29)]
+        pages = make_pages(days, descending)
+        extracted = []
+
+        def extract(index):
+            extracted.append(index)
+            return pages[index]
+        page_dates = PageDates(len(pages), extract)
+        span = find_page_span(page_dates, "2023-03", "2023-04-10")
+        selected = [day for index in span for day in [pages[index].split("\n")[1][5:10]] if "UTC" in pages[index]]
+        assert sorted(selected) == [day for day in days if "03-01" <= day <= "04-10"]
+        assert len(set(extracted)) < 30
+
+    # Ranges outside of the statement give an empty span
+    def test_empty_span(self):
+        pages = make_pages(["01-01", "01-02"], True)
+        assert len(find_page_span(PageDates(len(pages), pages.__getitem__), "2024", None)) == 0
+        assert len(find_page_span(PageDates(len(pages), pages.__getitem__), None, "2022")) == 0
+
+class TestConverterPageSearch:
+
+    # Only the pages of the date range are converted, with the same rows as the filtered full conversion
+    def test_pdf_date_range(self, tmp_path):
+        write_hi_pdf(str(tmp_path / "hi.pdf"), 3000)
+        options = {"date_from": "2024-12-10", "date_to": "2024-12-12"}
+        ChainreportConverter("Hi", str(tmp_path / "hi.pdf"), str(tmp_path / "full.csv"),
+                             {"date_from": None, "date_to": None}).convert()
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.pdf"), str(tmp_path / "span.csv"), options)
+        converter.convert()
+        assert converter.statistics["skipped_pages"] > 0
+        expected = [row for row in read_output(str(tmp_path / "full.csv"))
+                    if "10.12.2024" <= row["Zeitpunkt"][:10] <= "12.12.2024"]
+        assert expected
+        key = lambda row: tuple(row.values())
+        assert sorted(read_output(str(tmp_path / "span.csv")), key=key) == sorted(expected, key=key)
@@ -0,0 +1,140 @@
+from datetime import datetime
+
+import pytest
+
+from benchmarks.generators import (COINBASE_CSV_HEADER, HI_CSV_HEADER, NEXO_CSV_HEADER, PLUTUS_CSV_HEADER,
+                                   coinbase_csv_rows, hi_csv_rows, hi_pdf_lines, nexo_csv_rows, plutus_csv_rows)
+from chainreport_parser.chainreport_parser_interface import ParsedRecord, date_converter, schema_columns
+from chainreport_parser.coinbase import CoinbaseParserCsv
+from chainreport_parser.hi_parser_csv import HiParserCsv
+from chainreport_parser.hi_parser_pdf import HiParserPdf
+from chainreport_parser.nexo_parser_csv import NexoParserCsv
+from chainreport_parser.plutus_parser_csv import PlutusParserCsv
+
+GETTERS = ['check_if_skip_line', 'get_input_string', 'get_date_string', 'get_transaction_type',
+           'get_received_amount', 'get_received_currency', 'get_sent_amount', 'get_sent_currency',
+           'get_transaction_fee_amount', 'get_transaction_fee_currency', 'get_order_id', 'get_description']
+
+PARSERS = {
+    "hi": (HiParserCsv, HI_CSV_HEADER, hi_csv_rows),
+    "nexo": (NexoParserCsv, NEXO_CSV_HEADER, nexo_csv_rows),
+    "plutus": (PlutusParserCsv, PLUTUS_CSV_HEADER, plutus_csv_rows),
+    "coinbase": (CoinbaseParserCsv, COINBASE_CSV_HEADER, coinbase_csv_rows),
+}
+
+def getter_values(line):
+    if line.check_if_skip_line():
+        return (True, line.get_input_string())
+    # Empty values are None or an empty string, both are written as empty csv field
+    return tuple("" if value is None else value for value in (getattr(line, getter)() for getter in GETTERS))
+
+class TestDateConverter:
+
+    # The cached conversion gives the same result as strptime, also for repeated date parts
+    @pytest.mark.parametrize("input_format,text", [
+        ('%Y-%m-%d %H:%M %Z', '2024-02-29 23:59 UTC'),
+        ('%Y-%m-%d %H:%M:%S UTC', '2023-01-01 00:05:59 UTC'),
+        ('%Y-%m-%d %H:%M:%S', '2023-12-31 12:00:01'),
+        ('%Y-%m-%dT%H:%M:%S.%fZ', '2023-06-15T08:30:00.123Z'),
+        ('%Y-%m-%dT%H:%M:%S.%fZ', '2023-06-15T08:30:00.123456Z'),
+        ('%Y-%m-%d %H:%M:%S', '2023-12-31 7:05:01')])
+    def test_same_as_strptime(self, input_format, text):
+        convert = date_converter(input_format)
+        expected = datetime.strptime(text, input_format).strftime('%d.%m.%Y %H:%M')
+        assert convert(text) == expected
+        assert convert(text) == expected
+
+    # Invalid fractions of a second raise ValueError like strptime
+    @pytest.mark.parametrize("text", ['2023-06-15T08:30:00.Z', '2023-06-15T08:30:00.1234567Z',
+                                      '2023-06-15T08:30:00.12X', '2023-06-15T08:30:00.123'])
+    def test_invalid_fraction(self, text):
+        with pytest.raises(ValueError):
+            date_converter('%Y-%m-%dT%H:%M:%S.%fZ')(text)
+
+    # Invalid dates raise ValueError like strptime, also after a valid date of the same day
+    def test_invalid_date(self):
+        convert = date_converter('%Y-%m-%d %H:%M:%S')
+        assert convert('2023-02-28 10:00:00') == '28.02.2023 10:00'
+        for text in ['2023-02-29 10:00:00', '2023-02-28 24:00:00', '2023-02-28 10:60:00', '2023-02-28 1a:00:00',
+                     '2023-02-28 10:00:61', 'malformed date']:
+            with pytest.raises(ValueError):
+                convert(text)
+
+class TestParseBatch:
+
+    # The batch gives the same values as the getters of the parser objects, also when bound to the header
+    @pytest.mark.parametrize("name", PARSERS)
+    @pytest.mark.parametrize("bound", [False, True])
+    def test_same_as_getters(self, name, bound):
+        parser, header, rows = PARSERS[name]
+        batch = [dict(zip(header, row)) for row in rows(500)]
+        records = parser.bind_schema(header)(batch) if bound else parser.parse_batch(batch)
+        assert len(records) == len(batch)
+        assert [getter_values(record) for record in records] == [getter_values(parser(row)) for row in batch]
+
+    # The records of a pdf statement give the values of the getters, without a parser object per record
+    def test_hi_pdf(self, monkeypatch):
+        records = list(HiParserPdf.scan_page("\n".join(hi_pdf_lines(500))))
+        expected = [getter_values(HiParserPdf(record)) for record in records]
+        def no_parser_object(*_):
+            raise AssertionError("parser object created")
+        monkeypatch.setattr(HiParserPdf, "__init__", no_parser_object)
+        parsed = HiParserPdf.parse_batch(records)
+        assert [getter_values(record) for record in parsed] == expected
+        assert any(record.check_if_skip_line() for record in parsed)
+
+    # Skipped rows are kept in place, only their input is known
+    def test_skipped_rows(self):
+        rows = [dict(zip(HI_CSV_HEADER, ['2023-01-01 10:00 UTC', description, '1', 'HI', '', '', '', '', 'tx']))
+                for description in ['Vault HI daily release', 'Crypto deposit', 'Unknown description']]
+        records = HiParserCsv.parse_batch(rows)
+        assert [record.check_if_skip_line() for record in records] == [True, False, False]
+        assert records[0] == ParsedRecord.skipped(rows[0], 'Vault HI daily release')
+        assert records[1].get_transaction_type() == 'Deposit'
+        assert records[2].get_transaction_type() == 'ERROR'
+
+def renamed(header, rows, names):
+    return [{names.get(column, column): value for column, value in zip(header, row)} for row in rows]
+
+class TestBindSchema:
+
+    # The first column of the alternatives found in the header is used
+    def test_schema_columns(self):
+        assert schema_columns(['amount', 'reward_plu_value', 'description'],
+                              [('amount', 'reward_plu_value'), ('reference_type', 'description'), ('id',)]) == (
+                                  'amount', 'description', None)
+
+    # The other Plutus export version is bound from its header like the first one
+    def test_plutus_versions(self):
+        names = {'reward_plu_value': 'amount', 'statement_id': 'exchange_rate_id', 'description': 'reference_type'}
+        batch = renamed(PLUTUS_CSV_HEADER, plutus_csv_rows(100), names)
+        records = PlutusParserCsv.bind_schema(list(batch[0]))(batch)
+        assert [getter_values(record) for record in records] == [getter_values(PlutusParserCsv(row))
+                                                                 for row in batch]
+        assert records[0].get_received_amount() == batch[0]['amount'].replace(".", ",")
+        assert records[0].get_order_id() == batch[0]['exchange_rate_id']
+
+    # Plutus rows with missing values take the parser object, which reports them
+    def test_plutus_missing_value(self):
+        batch = [dict(zip(PLUTUS_CSV_HEADER, row)) for row in plutus_csv_rows(2)]
+        batch[1]['statement_id'] = None
+        with pytest.raises(KeyError):
+            PlutusParserCsv.bind_schema(PLUTUS_CSV_HEADER)(batch)
+
+    # Older Coinbase exports have a spot price currency and no id column
+    def test_coinbase_versions(self):
+        batch = renamed(COINBASE_CSV_HEADER, coinbase_csv_rows(100), {'Price Currency': 'Spot Price Currency'})
+        for row in batch:
+            del row['ID']
+        records = CoinbaseParserCsv.bind_schema(list(batch[0]))(batch)
+        assert [getter_values(record) for record in records] == [getter_values(CoinbaseParserCsv(row))
+                                                                 for row in batch]
+        assert {record.get_order_id() for record in records} == {""}
+        assert {record.get_transaction_fee_currency() for record in records} == {"EUR"}
+
+    # Columns missing in the Hi header are empty
+    def test_hi_without_fee_columns(self):
+        header = HI_CSV_HEADER[:6]
+        batch = [dict(zip(header, row)) for row in hi_csv_rows(100)]
+        records = HiParserCsv.bind_schema(header)(batch)
+        assert [getter_values(record) for record in records] == [getter_values(HiParserCsv(row)) for row in batch]
@@ -0,0 +1,24 @@
+import pstats
+from chainreport_profiling import ConversionProfiler
+
+def busy_function(count):
+    return sum(str(value).count("1") for value in range(count))
+
+class TestConversionProfiler:
+
+    # The profiled function result is passed through
+    def test_run_returns_function_result(self, tmp_path):
+        profiler = ConversionProfiler(str(tmp_path / "output.csv"))
+        assert profiler.run(busy_function, 1000) == busy_function(1000)
+
+    # The pstats and the collapsed stack file are written next to the output
+    def test_write_creates_pstats_and_collapsed_file(self, tmp_path):
+        profiler = ConversionProfiler(str(tmp_path / "output.csv"), interval=0.0001)
+        profiler.run(busy_function, 200000)
+        pstats_filename, collapsed_filename = profiler.write()
+        assert pstats_filename == str(tmp_path / "output.csv.pstats")
+        assert "busy_function" in str(pstats.Stats(pstats_filename).stats)
+        with open(collapsed_filename, encoding="utf-8") as collapsed_input:
+            lines = collapsed_input.read().splitlines()
+        assert lines
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
@@ -0,0 +1,80 @@
+import csv
+
+import pytest
+
+from benchmarks.generators import HI_CSV_HEADER, hi_csv_rows, write_csv, write_hi_csv, write_hi_pdf, write_nexo_csv
+from chainreport_converter import ChainreportConverter
+from chainreport_incremental import sortable_date
+from chainreport_reverse import reversed_csv_rows, reversed_lines
+
+def read_output(filename):
+    with open(filename, newline='', encoding="utf-8") as csvinput:
+        return list(csv.DictReader(csvinput, delimiter=';'))
+
+def row_sort_key(row):
+    return tuple(row.values())
+
+class TestReverse:
+
+    # Lines are read from the end of the file back to the start offset, with and without final line end
+    def test_reversed_lines(self, tmp_path):
+        (tmp_path / "lines.txt").write_bytes(b"header\r\nfirst\r\nsecond\r\nthird")
+        assert list(reversed_lines(str(tmp_path / "lines.txt"))) == [b"third", b"second", b"first", b"header"]
+        assert list(reversed_lines(str(tmp_path / "lines.txt"), 8)) == [b"third", b"second", b"first"]
+
+    # Short and long rows are read like csv.DictReader reads them
+    def test_reversed_csv_rows(self, tmp_path):
+        (tmp_path / "rows.csv").write_text("a,b,c\n1,2,3\n4\n5,6,7,8\n", encoding="utf-8")
+        with open(tmp_path / "rows.csv", newline='', encoding="utf-8") as csvinput:
+            forward = list(csv.DictReader(csvinput))
+        assert list(reversed_csv_rows(str(tmp_path / "rows.csv"), ",")) == forward[::-1]
+        assert forward[1] == {"a": "4", "b": None, "c": None}
+        assert forward[2] == {"a": "5", "b": "6", "c": "7", None: ["8"]}
+
+class TestChronologicalConversion:
+
+    # Newest first exports are read backwards, the rows equal the normal conversion in time order
+    @pytest.mark.parametrize("parsertype, extension, writer", [("Hi", ".csv", write_hi_csv),
+                                                               ("Hi", ".pdf", write_hi_pdf),
+                                                               ("Nexo", ".csv", write_nexo_csv)])
+    def test_reversed_input(self, tmp_path, parsertype, extension, writer):
+        input_file = str(tmp_path / ("input" + extension))
+        writer(input_file, 1000)
+        normal = ChainreportConverter(parsertype, input_file, str(tmp_path / "normal.csv"))
+        normal.convert()
+        converter = ChainreportConverter(parsertype, input_file, str(tmp_path / "chronological.csv"),
+                                         {"chronological": True})
+        converter.convert()
+        assert converter.statistics["reversed_input"]
+        rows = read_output(str(tmp_path / "chronological.csv"))
+        dates = [sortable_date(row["Zeitpunkt"]) for row in rows]
+        assert dates == sorted(dates)
+        assert sorted(rows, key=row_sort_key) == sorted(read_output(str(tmp_path / "normal.csv")), key=row_sort_key)
+        for key in ["input_linecount", "output_linecount", "errors", "warnings"]:
+            assert converter.statistics[key] == normal.statistics[key]
+
+    # Oldest first exports are converted as usual
+    def test_ascending_input(self, tmp_path):
+        write_csv(str(tmp_path / "hi.csv"), HI_CSV_HEADER, reversed(list(hi_csv_rows(200))))
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "out.csv"),
+                                         {"chronological": True})
+        converter.convert()
+        assert "reversed_input" not in converter.statistics
+
+    # A short row gets the missing columns as None like in the forward conversion, as last row (the first row
+    # read backwards) it does not change the columns of the schema
+    @pytest.mark.parametrize("position", [0, 100, 199])
+    def test_short_row(self, tmp_path, position):
+        rows = list(hi_csv_rows(200))
+        rows[position] = rows[position][:4]
+        write_csv(str(tmp_path / "hi.csv"), HI_CSV_HEADER, rows)
+        normal = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "normal.csv"))
+        normal.convert()
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "chronological.csv"),
+                                         {"chronological": True})
+        converter.convert()
+        assert converter.statistics["reversed_input"]
+        chronological = read_output(str(tmp_path / "chronological.csv"))
+        assert sorted(chronological, key=row_sort_key) == sorted(read_output(str(tmp_path / "normal.csv")),
+                                                                 key=row_sort_key)
+        assert sum(bool(row["Oder-ID der Exchange"]) for row in chronological) > len(chronological) // 2
@@ -0,0 +1,58 @@
+import csv
+
+import pytest
+
+from benchmarks.generators import write_hi_csv
+from chainreport_converter import ChainreportConverter
+from chainreport_incremental import sortable_date
+from chainreport_sort import ExternalSorter
+
+def read_output(filename):
+    with open(filename, newline='', encoding="utf-8") as csvinput:
+        return list(csv.DictReader(csvinput, delimiter=';'))
+
+class TestExternalSorter:
+
+    # Rows are sorted through several spilled runs, equal times keep their written order
+    def test_sort_with_runs(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("chainreport_sort.MAX_MERGE_FILES", 3)
+        sorter = ExternalSorter(["Zeitpunkt", "Beschreibung"], "Zeitpunkt", 2000, str(tmp_path))
+        dates = [f"{day:02d}.0{month}.2023 10:00" for day in range(28, 0, -1) for month in (3, 1, 2)]
+        for index, date in enumerate(dates):
+            sorter.writerow({"Zeitpunkt": date, "Beschreibung": str(index)})
+        rows = list(sorter.sorted_rows())
+        assert sorter.spilled_runs > 3
+        sorter.close()
+        assert [row["Zeitpunkt"] for row in rows] == sorted(dates, key=sortable_date)
+        assert [row["Beschreibung"] for row in rows] == sorted(
+            (str(index) for index in range(len(dates))), key=lambda index: sortable_date(dates[int(index)]))
+        assert not list(tmp_path.iterdir())
+
+class TestConverterSort:
+
+    # The newest first Hi export is written oldest first with the same rows as without sorting
+    def test_sorted_conversion(self, tmp_path):
+        write_hi_csv(str(tmp_path / "hi.csv"), 2000)
+        ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "plain.csv")).convert()
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "sorted.csv"),
+                                         {"sort": True, "sort_memory": 50000})
+        converter.convert()
+        assert converter.statistics["sort_runs"] > 1
+        plain = read_output(str(tmp_path / "plain.csv"))
+        ordered = read_output(str(tmp_path / "sorted.csv"))
+        assert ordered == sorted(plain, key=lambda row: sortable_date(row["Zeitpunkt"]))
+
+    # A failing conversion removes the spilled runs and the temporary directory as well
+    def test_failed_conversion(self, tmp_path):
+        write_hi_csv(str(tmp_path / "hi.csv"), 2000)
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "sorted.csv"),
+                                         {"sort": True, "sort_memory": 50000})
+        def failing_write_rows(csv_writer, items, _events):
+            for output_row, _ in items:
+                csv_writer.writerow(output_row)
+            assert csv_writer.spilled_runs > 1
+            raise OSError("disk full")
+        converter.write_rows = failing_write_rows
+        with pytest.raises(OSError):
+            converter.convert()
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["hi.csv", "sorted.csv"]
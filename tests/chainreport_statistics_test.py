@@ -0,0 +1,49 @@
+import json
+from chainreport_converter import ChainreportConverter
+from chainreport_statistics import format_prometheus, write_json
+
+HI_CSV = """Date,Description,Received Amount,Received Currency,Sent Amount,Sent Currency,Fee Amount,Fee Currency,TxHash
+2023-01-03 10:00 UTC,Crypto deposit,1.5,BTC,,,,,abc
+2023-01-02 10:00 UTC,buy Vault HI,100,HI,,,,,
+2023-01-02 10:00 UTC,buy HI paid,,,10,USDT,,,
+2023-01-01 10:00 UTC,Card consume,,,10,EUR,,,
+2023-01-01 08:00 UTC,HI rebate,1,HI,,,,,
+"""
+
+def convert_hi_csv(tmp_path):
+    input_file = tmp_path / "hi.csv"
+    input_file.write_text(HI_CSV, encoding="utf-8")
+    converter = ChainreportConverter("Hi", str(input_file), str(tmp_path / "chainreport.csv"))
+    converter.convert()
+    return converter.statistics
+
+class TestConversionStatistics:
+
+    # The statistics contain the counts per transaction type, currency and skipped description
+    def test_statistics_contain_counts(self, tmp_path):
+        statistics = convert_hi_csv(tmp_path)
+        assert statistics["input_linecount"] == 5
+        assert statistics["output_linecount"] == 3
+        assert statistics["transaction_types"] == {"Deposit": 1, "Trade": 1, "Cashback": 1}
+        assert statistics["currencies"] == {"BTC": 1, "HI": 2, "USDT": 1}
+        assert statistics["skipped_descriptions"] == {"Card consume": 1}
+        assert statistics["parser"] == "HiParserCsv"
+        assert statistics["elapsed_seconds"] > 0
+        assert statistics["rows_per_second"] > 0
+
+    # The statistics can be written as JSON
+    def test_write_json(self, tmp_path):
+        statistics = convert_hi_csv(tmp_path)
+        write_json(statistics, str(tmp_path / "statistics.json"))
+        loaded = json.loads((tmp_path / "statistics.json").read_text(encoding="utf-8"))
+        assert loaded["transaction_types"]["Trade"] == 1
+
+    # The Prometheus output contains labeled counters and escapes the label values
+    def test_format_prometheus(self):
+        output = format_prometheus({"parser": "HiParserCsv", "input_linecount": 3,
+                                    "process_peak_rss_bytes": None,
+                                    "skipped_descriptions": {"Card \"consume\"": 2}})
+        assert 'chainreport_input_lines_total{parser="HiParserCsv"} 3' in output
+        assert "chainreport_process_peak_rss_bytes" not in output
+        assert ('chainreport_skipped_lines_total{parser="HiParserCsv",description="Card \\"consume\\""} 2'
+                in output)
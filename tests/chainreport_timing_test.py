@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from benchmarks.generators import write_hi_csv
+from chainreport_converter import ChainreportConverter
+from chainreport_timing import StageTimer
+
+class TestStageTimer:
+
+    # A disabled timer returns the original objects without any wrapper
+    def test_disabled_timer_returns_unchanged_objects(self):
+        timer = StageTimer()
+        function = len
+        iterable = [1, 2, 3]
+        assert timer.wrap("parse", function) is function
+        assert timer.iterate("read", iterable) is iterable
+
+    # An enabled timer counts every call of the wrapped function
+    def test_enabled_timer_counts_calls(self):
+        timer = StageTimer(True)
+        wrapped = timer.wrap("parse", len)
+        assert wrapped("abc") == 3
+        assert wrapped("") == 0
+        assert timer.as_dict()["parse"]["count"] == 2
+        assert timer.as_dict()["parse"]["seconds"] >= 0.0
+
+    # An enabled timer counts every item of the iterable
+    def test_enabled_timer_counts_items(self):
+        timer = StageTimer(True)
+        assert list(timer.iterate("read", "abcd")) == ["a", "b", "c", "d"]
+        assert timer.as_dict()["read"]["count"] == 4
+
+    # Exceptions are passed through and the call is still counted
+    def test_enabled_timer_passes_exceptions(self):
+        timer = StageTimer(True)
+        wrapped = timer.wrap("parse", int)
+        with pytest.raises(ValueError):
+            wrapped("no number")
+        assert timer.as_dict()["parse"]["count"] == 1
+
+    # The time of a nested stage is not counted again for the outer stage
+    def test_nested_stages(self):
+        timer = StageTimer(True)
+        classify = timer.wrap("classify", lambda: time.sleep(0.02))
+        assemble = timer.wrap_generator("assemble", lambda: (classify() for _ in range(2)))
+        assert assemble() == [None, None]
+        stages = timer.as_dict()
+        assert (stages["assemble"]["count"], stages["classify"]["count"]) == (1, 2)
+        assert stages["classify"]["seconds"] >= 0.04
+        assert stages["assemble"]["seconds"] < 0.02
+
+    # The summary contains all stages
+    def test_summary_contains_all_stages(self):
+        summary = StageTimer(True).summary()
+        for stage in StageTimer.STAGES:
+            assert stage in summary
+
+class TestConverterStages:
+
+    # Every input line is assembled once and every written row is written once
+    def test_stage_counts(self, tmp_path):
+        write_hi_csv(str(tmp_path / "hi.csv"), 200)
+        converter = ChainreportConverter("Hi", str(tmp_path / "hi.csv"), str(tmp_path / "out.csv"),
+                                         {"timing": True})
+        converter.convert()
+        stages = converter.statistics["stages"]
+        assert stages["read"]["count"] == converter.statistics["input_linecount"]
+        assert stages["classify"]["count"] == converter.statistics["input_linecount"]
+        # One call per input line and one at the end of the input
+        assert stages["assemble"]["count"] == converter.statistics["input_linecount"] + 1
+        assert stages["write"]["count"] == converter.statistics["output_linecount"]
@@ -0,0 +1,35 @@
+from src.chainreport_parser.hi_parser_pdf import HiParserPdf
+
+PAGE_TEXT = """Hi statement
+Date Description Amount Currency
+2023-05-01 10:00 UTC Crypto deposit 0.5 BTC
+2023-05-01 11:00 UTC buy Vault HI 726.57 HI
+2023-05-01 11:00 UTC buy Vault HI -77.42 USDT
+2023 summary without transaction
+Page 1 of 2"""
+
+class TestScanPage:
+
+    # One scan returns only the transaction lines as records
+    def test_scan_page(self):
+        records = list(HiParserPdf.scan_page(PAGE_TEXT))
+        assert [record.line for record in records] == PAGE_TEXT.split("\n")[2:5]
+        assert records[2].date == "2023-05-01 11:00 UTC"
+        assert records[2].description == "buy Vault HI"
+        assert records[2].amount == "-77.42"
+        assert records[2].currency == "USDT"
+
+    # Records and single lines give the same parser content
+    def test_record_and_line(self):
+        for record in HiParserPdf.scan_page(PAGE_TEXT):
+            from_record = HiParserPdf(record)
+            from_line = HiParserPdf(record.line)
+            assert from_record.get_date_string() == from_line.get_date_string() == "01.05.2023 " + record.date[11:16]
+            assert from_record.get_sent_amount() == from_line.get_sent_amount()
+            assert from_record.get_received_currency() == from_line.get_received_currency()
+
+    # Lines which are no transaction lines give an empty description instead of missing attributes
+    def test_no_transaction_line(self):
+        parser = HiParserPdf("2023 summary without transaction")
+        assert parser.get_description() == ""
+        assert parser.get_transaction_type() == "ERROR"